@@ -0,0 +1,191 @@
+"""
+Append-only JSONL persistence for agent history.
+
+One record per line: a header, one 'step' record per AgentHistory as steps complete, and a 'usage'
+record when the run ends. Writing a step costs one small append instead of re-serializing the whole
+history, and HistoryLog reads steps lazily by index (only line offsets are scanned up front), so
+rerunning a long history streams it step by step.
+"""
+
+import json
+import logging
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any, overload
+
+from aeternus.agent.views import AgentHistory, AgentHistoryList, AgentOutput
+from aeternus.tokens.views import UsageSummary
+
+logger = logging.getLogger(__name__)
+
+HISTORY_LOG_FORMAT = 'aeternus-history'
+HISTORY_LOG_VERSION = 1
+
+# Records are written with 'type' as the first key, so step lines are recognized without parsing them
+_STEP_PREFIX = b'{"type": "step"'
+
+
+def _dumps(record: dict[str, Any]) -> str:
+	return json.dumps(record) + '\n'
+
+
+class HistoryLogWriter:
+	"""Appends AgentHistory items to a JSONL history file, one line per step."""
+
+	def __init__(self, path: str | Path, sensitive_data: dict[str, str | dict[str, str]] | None = None, overwrite: bool = False):
+		self.path = Path(path)
+		self.sensitive_data = sensitive_data
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+
+		is_new = overwrite or not self.path.exists() or self.path.stat().st_size == 0
+		self._file = open(self.path, 'w' if overwrite else 'a', encoding='utf-8')
+		if is_new:
+			self._write({'type': 'header', 'format': HISTORY_LOG_FORMAT, 'version': HISTORY_LOG_VERSION})
+
+	def _write(self, record: dict[str, Any]) -> None:
+		self._file.write(_dumps(record))
+		# Flushed per record so a crashed run still leaves every completed step on disk
+		self._file.flush()
+
+	def append(self, item: AgentHistory) -> None:
+		self._write({'type': 'step', 'data': item.model_dump(sensitive_data=self.sensitive_data)})
+
+	def write_usage(self, usage: UsageSummary | None) -> None:
+		if usage is not None:
+			self._write({'type': 'usage', 'data': usage.model_dump(mode='json')})
+
+	def close(self) -> None:
+		if not self._file.closed:
+			self._file.close()
+
+	def __enter__(self) -> 'HistoryLogWriter':
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+
+class HistoryLog(Sequence[AgentHistory]):
+	"""Lazy, random-access view of a JSONL history file.
+
+	Only line offsets are kept in memory; steps are parsed into AgentHistory on access, with a small
+	LRU of recently parsed steps. Call refresh() to pick up steps appended since opening (e.g. to follow
+	a running agent).
+	"""
+
+	def __init__(self, path: str | Path, output_model: type[AgentOutput], cache_size: int = 32):
+		self.path = Path(path)
+		self.output_model = output_model
+		self.cache_size = cache_size
+		self._offsets = array('Q')
+		self._scanned_to = 0
+		self._usage: UsageSummary | None = None
+		self._cache: OrderedDict[int, AgentHistory] = OrderedDict()
+		self.refresh()
+
+	def refresh(self) -> None:
+		"""Index lines appended since the last scan. A partially written last line is left for the next call."""
+		with open(self.path, 'rb') as f:
+			f.seek(self._scanned_to)
+			offset = self._scanned_to
+			for line in f:
+				if not line.endswith(b'\n'):
+					break
+				if line.startswith(_STEP_PREFIX):
+					self._offsets.append(offset)
+				elif line.strip():
+					self._read_meta_record(line)
+				offset += len(line)
+			self._scanned_to = offset
+
+	def _read_meta_record(self, line: bytes) -> None:
+		try:
+			record = json.loads(line)
+		except ValueError:
+			logger.warning(f'Skipping unreadable line in history log {self.path}')
+			return
+		if record.get('type') == 'header' and record.get('version', 1) > HISTORY_LOG_VERSION:
+			raise ValueError(f'History log {self.path} has version {record["version"]}, newest supported is {HISTORY_LOG_VERSION}')
+		if record.get('type') == 'usage':
+			self._usage = UsageSummary.model_validate(record['data'])
+
+	def _parse(self, line: bytes) -> AgentHistory:
+		return AgentHistory.load_from_dict(json.loads(line)['data'], self.output_model)
+
+	@property
+	def usage(self) -> UsageSummary | None:
+		return self._usage
+
+	def __len__(self) -> int:
+		return len(self._offsets)
+
+	@overload
+	def __getitem__(self, index: int) -> AgentHistory: ...
+
+	@overload
+	def __getitem__(self, index: slice) -> list[AgentHistory]: ...
+
+	def __getitem__(self, index: int | slice) -> AgentHistory | list[AgentHistory]:
+		if isinstance(index, slice):
+			return [self[i] for i in range(*index.indices(len(self)))]
+
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError('history step index out of range')
+
+		cached = self._cache.get(index)
+		if cached is not None:
+			self._cache.move_to_end(index)
+			return cached
+
+		with open(self.path, 'rb') as f:
+			f.seek(self._offsets[index])
+			item = self._parse(f.readline())
+
+		self._cache[index] = item
+		while len(self._cache) > self.cache_size:
+			self._cache.popitem(last=False)
+		return item
+
+	def __iter__(self) -> Iterator[AgentHistory]:
+		"""Stream steps in order with one sequential read, without filling the cache."""
+		if not self._offsets:
+			return
+		count = len(self._offsets)
+		with open(self.path, 'rb') as f:
+			f.seek(self._offsets[0])
+			seen = 0
+			for line in f:
+				if seen == count:
+					break
+				if line.startswith(_STEP_PREFIX):
+					seen += 1
+					yield self._parse(line)
+
+	def to_history_list(self) -> AgentHistoryList:
+		"""Load every step into a regular AgentHistoryList."""
+		return AgentHistoryList(history=list(self), usage=self._usage)
+
+
+def convert_json_history_to_jsonl(json_path: str | Path, jsonl_path: str | Path | None = None) -> Path:
+	"""Convert a history saved by AgentHistoryList.save_to_file() (JSON) to the JSONL format.
+
+	Records are copied as plain dicts, no models are built. Returns the path of the JSONL file
+	(next to the JSON file with a .jsonl suffix by default).
+	"""
+	json_path = Path(json_path)
+	target = Path(jsonl_path) if jsonl_path else json_path.with_suffix('.jsonl')
+	with open(json_path, encoding='utf-8') as f:
+		data = json.load(f)
+
+	target.parent.mkdir(parents=True, exist_ok=True)
+	with open(target, 'w', encoding='utf-8') as f:
+		f.write(_dumps({'type': 'header', 'format': HISTORY_LOG_FORMAT, 'version': HISTORY_LOG_VERSION}))
+		for step in data.get('history', []):
+			f.write(_dumps({'type': 'step', 'data': step}))
+		if data.get('usage'):
+			f.write(_dumps({'type': 'usage', 'data': data['usage']}))
+	return target
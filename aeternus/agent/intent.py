@@ -1,14 +1,25 @@
 
+import asyncio
+import json
+import logging
+import math
+import re
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from pathlib import Path
+from typing import Iterable, Optional
 from pydantic import BaseModel, Field
 
 from aeternus.llm.base import BaseChatModel
 from aeternus.llm.messages import UserMessage, SystemMessage
 
+logger = logging.getLogger(__name__)
+
 class IntentType(str, Enum):
     RESEARCH = "research"
-    EXECUTION = "execution" 
+    EXECUTION = "execution"
     PLANNING = "planning"
     NAVIGATION = "navigation"
     GENERAL = "general"
@@ -18,19 +29,306 @@ class IntentAnalysis(BaseModel):
     confidence: float
     reasoning: str
     suggested_steps: Optional[list[str]] = Field(default_factory=list)
+    # Which tier decided: "rules", "model", "llm", "default" (no LLM and the model was unsure), "fallback"
+    source: str = "llm"
+
+class _LLMIntentAnalysis(BaseModel):
+    """Structured output schema for the LLM tier."""
+    intent: IntentType
+    confidence: float = Field(ge=0.0, le=1.0)
+    reasoning: str
+    suggested_steps: list[str] = Field(default_factory=list)
+
+
+_URL = r"(?:https?://\S+|(?:www\.)?[\w-]+(?:\.[\w-]+)*\.[a-z]{2,}(?:[/?#]\S*)?)"
+_NAVIGATION_RE = re.compile(rf"^(?:please\s+)?(?:go to|open|navigate to|visit|load|browse to|take me to)?\s*{_URL}\s*[.!]?$", re.IGNORECASE)
+_PLANNING_RE = re.compile(
+    r"^(?:please\s+)?(?:(?:create|make|draft|write|give me|come up with)\s+(?:a|an|me a)?\s*(?:\w+\s+)?(?:plan|strategy|roadmap|itinerary|schedule|outline)"
+    r"|plan\b|how should i\b|help me plan\b)",
+    re.IGNORECASE,
+)
+_EXECUTION_RE = re.compile(
+    r"\b(?:book|buy|purchase|order|checkout|add to (?:cart|basket)|fill (?:out|in)|submit|sign (?:up|in)|log ?in|register|"
+    r"click|download|upload|send|post|reply|apply|reserve|subscribe|unsubscribe|cancel|delete|install|pay)\b",
+    re.IGNORECASE,
+)
+_RESEARCH_RE = re.compile(
+    r"^(?:please\s+)?(?:what|who|when|where|which|why|how (?:much|many|does|do|is|are|to)|is there|are there|find|search|look up|"
+    r"compare|research|summari[sz]e|tell me about|list|explain|get (?:me )?the (?:latest|current|price|news))\b",
+    re.IGNORECASE,
+)
+
+# Small seed set so the local model is useful before any tasks have been logged
+_SEED_EXAMPLES: list[tuple[str, IntentType]] = [
+    ("go to github.com", IntentType.NAVIGATION),
+    ("open https://news.ycombinator.com", IntentType.NAVIGATION),
+    ("navigate to the python docs homepage", IntentType.NAVIGATION),
+    ("visit the amazon website", IntentType.NAVIGATION),
+    ("take me to my gmail inbox", IntentType.NAVIGATION),
+    ("open the settings page of my github account", IntentType.NAVIGATION),
+    ("find the cheapest flight from london to paris next week", IntentType.RESEARCH),
+    ("what is the population of canada", IntentType.RESEARCH),
+    ("compare the iphone 15 and pixel 8 cameras", IntentType.RESEARCH),
+    ("search for reviews of the best noise cancelling headphones", IntentType.RESEARCH),
+    ("look up the latest news about the stock market", IntentType.RESEARCH),
+    ("summarize the top posts on hacker news today", IntentType.RESEARCH),
+    ("who won the champions league in 2023", IntentType.RESEARCH),
+    ("get the current price of bitcoin", IntentType.RESEARCH),
+    ("research open source vector databases and their tradeoffs", IntentType.RESEARCH),
+    ("book a table for two at an italian restaurant tonight", IntentType.EXECUTION),
+    ("buy a pack of aa batteries on amazon", IntentType.EXECUTION),
+    ("fill out the contact form on example.com with my details", IntentType.EXECUTION),
+    ("sign up for the newsletter using my email", IntentType.EXECUTION),
+    ("log in to my account and download the latest invoice", IntentType.EXECUTION),
+    ("add the blue shirt in size m to the cart and checkout", IntentType.EXECUTION),
+    ("submit my application for the software engineer job", IntentType.EXECUTION),
+    ("send a message to john on linkedin", IntentType.EXECUTION),
+    ("reserve a hotel room in berlin for friday", IntentType.EXECUTION),
+    ("create a plan for learning rust in three months", IntentType.PLANNING),
+    ("make a travel itinerary for a week in japan", IntentType.PLANNING),
+    ("draft a strategy to grow my blog traffic", IntentType.PLANNING),
+    ("help me plan a birthday party for my daughter", IntentType.PLANNING),
+    ("outline the steps to launch a small online store", IntentType.PLANNING),
+    ("how should i prepare for a system design interview", IntentType.PLANNING),
+    ("hello", IntentType.GENERAL),
+    ("thanks, that is all", IntentType.GENERAL),
+    ("tell me a joke", IntentType.GENERAL),
+    ("translate this sentence to french", IntentType.GENERAL),
+    ("write a short poem about the sea", IntentType.GENERAL),
+]
+
+
+def normalize_task(task: str) -> str:
+    """Lowercase and collapse whitespace, the cache key for classification decisions."""
+    return " ".join(task.lower().split())
+
+
+def classify_with_rules(task: str) -> Optional[IntentAnalysis]:
+    """
+    Decide obvious tasks with regexes. Returns None when no rule fires or the cues conflict.
+    """
+    text = task.strip()
+    if _NAVIGATION_RE.match(text):
+        return IntentAnalysis(intent=IntentType.NAVIGATION, confidence=0.97, reasoning="Task is a bare URL or a go-to URL command", source="rules")
+
+    execution = bool(_EXECUTION_RE.search(text))
+    if _PLANNING_RE.match(text) and not execution:
+        return IntentAnalysis(intent=IntentType.PLANNING, confidence=0.9, reasoning="Task asks for a plan or strategy", source="rules")
+    if _RESEARCH_RE.match(text) and not execution:
+        return IntentAnalysis(intent=IntentType.RESEARCH, confidence=0.9, reasoning="Task is a question or information lookup", source="rules")
+    if execution and not _RESEARCH_RE.match(text) and not _PLANNING_RE.match(text):
+        return IntentAnalysis(intent=IntentType.EXECUTION, confidence=0.88, reasoning="Task contains an action verb", source="rules")
+    return None
+
+
+class HashedNgramModel:
+    """
+    Multinomial logistic regression over hashed word 1-2 grams and character 3-grams.
+
+    Weights are sparse dicts, so the model stays small and pure Python; prediction is a few hundred dict lookups.
+    """
+
+    def __init__(self, classes: Optional[list[IntentType]] = None, n_features: int = 1 << 18):
+        self.classes = classes or list(IntentType)
+        self.n_features = n_features
+        self.bias = [0.0] * len(self.classes)
+        self.weights: list[dict[int, float]] = [{} for _ in self.classes]
+
+    def features(self, text: str) -> dict[int, float]:
+        words = re.findall(r"\w+|[^\w\s]", normalize_task(text))
+        grams = [f"w:{w}" for w in words]
+        grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        grams.append(f"s:{words[0]}" if words else "s:")
+        for w in words:
+            padded = f" {w} "
+            grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+
+        counts: dict[int, float] = {}
+        for gram in grams:
+            index = zlib.crc32(gram.encode()) % self.n_features
+            counts[index] = counts.get(index, 0.0) + 1.0
+        # L2-normalize so long tasks do not get overconfident
+        norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+        return {i: v / norm for i, v in counts.items()}
+
+    def _probabilities(self, features: dict[int, float]) -> list[float]:
+        logits = [
+            bias + sum(weights.get(i, 0.0) * v for i, v in features.items())
+            for bias, weights in zip(self.bias, self.weights)
+        ]
+        peak = max(logits)
+        exps = [math.exp(logit - peak) for logit in logits]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    def predict_proba(self, text: str) -> dict[IntentType, float]:
+        return dict(zip(self.classes, self._probabilities(self.features(text))))
+
+    def predict(self, text: str) -> tuple[IntentType, float]:
+        probabilities = self._probabilities(self.features(text))
+        best = max(range(len(self.classes)), key=probabilities.__getitem__)
+        return self.classes[best], probabilities[best]
+
+    def fit(self, examples: Iterable[tuple[str, IntentType]], epochs: int = 20, learning_rate: float = 0.5, l2: float = 1e-4) -> "HashedNgramModel":
+        """Train with plain SGD on (task, intent) pairs, continuing from the current weights."""
+        data = [(self.features(text), self.classes.index(IntentType(intent))) for text, intent in examples]
+        for epoch in range(epochs):
+            rate = learning_rate / (1 + epoch * 0.1)
+            for features, label in data:
+                probabilities = self._probabilities(features)
+                for c, weights in enumerate(self.weights):
+                    gradient = probabilities[c] - (1.0 if c == label else 0.0)
+                    self.bias[c] -= rate * gradient
+                    for i, v in features.items():
+                        weights[i] = weights.get(i, 0.0) * (1 - rate * l2) - rate * gradient * v
+        return self
+
+    def save(self, path: str | Path) -> None:
+        data = {
+            "classes": [c.value for c in self.classes],
+            "n_features": self.n_features,
+            "bias": self.bias,
+            # Tiny weights do not change predictions, dropping them keeps the file small
+            "weights": [{str(i): round(w, 5) for i, w in weights.items() if abs(w) > 1e-4} for weights in self.weights],
+        }
+        Path(path).write_text(json.dumps(data))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "HashedNgramModel":
+        data = json.loads(Path(path).read_text())
+        model = cls([IntentType(c) for c in data["classes"]], data["n_features"])
+        model.bias = data["bias"]
+        model.weights = [{int(i): w for i, w in weights.items()} for weights in data["weights"]]
+        return model
+
+
+def load_logged_tasks(path: str | Path) -> list[tuple[str, IntentType]]:
+    """Read (task, intent) training pairs from a decision log written by IntentClassifier(log_path=...)."""
+    examples = []
+    for line in Path(path).read_text().splitlines():
+        try:
+            record = json.loads(line)
+            examples.append((record["task"], IntentType(record["intent"])))
+        except (ValueError, KeyError):
+            continue
+    return examples
+
+
+# Escalated predictions kept for calibration_report, oldest are dropped first
+MAX_ESCALATED_PREDICTIONS = 1000
+
+
+@dataclass
+class IntentClassifierStats:
+    total: int = 0
+    cache_hits: int = 0
+    rules: int = 0
+    model: int = 0
+    llm: int = 0
+    default: int = 0
+    fallback: int = 0
+    # (local model confidence, local model agreed with the LLM) for the most recent escalated tasks
+    escalated_predictions: deque[tuple[float, bool]] = field(
+        default_factory=lambda: deque(maxlen=MAX_ESCALATED_PREDICTIONS)
+    )
+
 
 class IntentClassifier:
     """
     Classifies user tasks into specific intents to guide agent behavior.
+
+    Tiers, cheapest first: regex rules, a local hashed n-gram model (accepted above model_threshold),
+    then the LLM for ambiguous tasks. Without an LLM, model predictions below min_confidence fall back
+    to GENERAL. Decisions are cached by normalized task text. With log_path,
+    LLM decisions are appended as JSONL so the local model can be retrained from real tasks.
     """
-    
-    def __init__(self, llm: BaseChatModel):
+
+    def __init__(
+        self,
+        llm: Optional[BaseChatModel],
+        model: Optional[HashedNgramModel] = None,
+        model_path: Optional[str | Path] = None,
+        model_threshold: float = 0.8,
+        min_confidence: float = 0.5,
+        log_path: Optional[str | Path] = None,
+        cache_size: int = 1024,
+    ):
         self.llm = llm
-        
+        self.model_threshold = model_threshold
+        self.min_confidence = min_confidence
+        self.log_path = Path(log_path) if log_path else None
+        self.cache_size = cache_size
+        self.stats = IntentClassifierStats()
+        self._cache: OrderedDict[str, IntentAnalysis] = OrderedDict()
+
+        if model is None and model_path and Path(model_path).exists():
+            model = HashedNgramModel.load(model_path)
+        self._model = model
+        self._model_lock = asyncio.Lock()
+
+    @property
+    def model(self) -> HashedNgramModel:
+        if self._model is None:
+            self._model = HashedNgramModel().fit(_SEED_EXAMPLES)
+        return self._model
+
+    async def _get_model(self) -> HashedNgramModel:
+        # Training on the seed set takes 50-100 ms, so it runs in a thread the first time rules do not decide
+        if self._model is None:
+            async with self._model_lock:
+                if self._model is None:
+                    self._model = await asyncio.to_thread(HashedNgramModel().fit, _SEED_EXAMPLES)
+        return self._model
+
+    def train(self, examples: Iterable[tuple[str, IntentType]], epochs: int = 20) -> None:
+        """Continue training the local model, e.g. on load_logged_tasks(log_path)."""
+        self.model.fit(examples, epochs=epochs)
+        self._cache.clear()
+
     async def classify(self, task: str) -> IntentAnalysis:
         """
         Classify the user task.
         """
+        key = normalize_task(task)
+        self.stats.total += 1
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.stats.cache_hits += 1
+            self._cache.move_to_end(key)
+            return cached
+
+        analysis = classify_with_rules(task)
+        if analysis is not None:
+            self.stats.rules += 1
+        else:
+            intent, confidence = (await self._get_model()).predict(task)
+            if confidence >= self.model_threshold or (self.llm is None and confidence >= self.min_confidence):
+                self.stats.model += 1
+                analysis = IntentAnalysis(
+                    intent=intent, confidence=round(confidence, 3), reasoning="Local intent model", source="model"
+                )
+            elif self.llm is None:
+                self.stats.default += 1
+                analysis = IntentAnalysis(
+                    intent=IntentType.GENERAL,
+                    confidence=0.0,
+                    reasoning=f"Local intent model unsure ({intent.value} at {confidence:.2f}) and no LLM configured",
+                    source="default",
+                )
+            else:
+                analysis = await self._classify_with_llm(task)
+                if analysis.source == "llm":
+                    self.stats.escalated_predictions.append((confidence, intent == analysis.intent))
+
+        # A fallback means the LLM call failed, so the task gets another chance next time
+        if analysis.source == "fallback":
+            return analysis
+        self._cache[key] = analysis
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return analysis
+
+    async def _classify_with_llm(self, task: str) -> IntentAnalysis:
         system_prompt = """You are an expert intent classifier for a browser agent.
         Analyze the user's task and classify it into one of the following categories:
         - research: The user wants to find information, compare products, or learn about a topic.
@@ -38,52 +336,65 @@ class IntentClassifier:
         - planning: The user asks for a plan or a strategy.
         - navigation: The user explicitly asks to go to a URL.
         - general: Any other request.
-        
-        Provide your analysis in JSON format matching the schema:
-        {
-            "intent": "research" | "execution" | "planning" | "navigation" | "general",
-            "confidence": float (0.0 to 1.0),
-            "reasoning": "string explanation",
-            "suggested_steps": ["step 1", "step 2"]
-        }
+
+        Give a confidence between 0.0 and 1.0, a short reasoning and optionally a few suggested steps.
         """
-        
+
         try:
             messages = [
                 SystemMessage(content=system_prompt),
                 UserMessage(content=f"Task: {task}")
             ]
-            
-            # Use structured output if available, otherwise parse JSON
-            # For simplicity assuming the LLM can return JSON or we might need a wrapper
-            # checking if llm supports structured output would be better but for now let's try direct prompt
-            # Actually, using tools.registry views pattern might be cleaner but let's stick to simple generation first
-            
-            response = await self.llm.astep(messages)
-            content = response.content
-            
-            # Simple JSON extraction if needed
-            import json
-            import re
-            
-            # Try to find JSON block
-            match = re.search(r'\{.*\}', content, re.DOTALL)
-            if match:
-                json_str = match.group(0)
-                data = json.loads(json_str)
-                return IntentAnalysis(**data)
-            else:
-                # Fallback
-                return IntentAnalysis(
-                    intent=IntentType.GENERAL, 
-                    confidence=0.5, 
-                    reasoning="Could not parse intent from LLM response"
-                )
-                
+
+            response = await self.llm.ainvoke(messages, output_format=_LLMIntentAnalysis)
+            result = response.completion
+            self.stats.llm += 1
+            self._log_decision(task, result.intent)
+            return IntentAnalysis(**result.model_dump(), source="llm")
+
         except Exception as e:
             # Fallback on error
+            self.stats.fallback += 1
             return IntentAnalysis(
-                intent=IntentType.GENERAL, 
-                confidence=0.0, 
-                reasoning=f"Error during classification: {e}"
+                intent=IntentType.GENERAL,
+                confidence=0.0,
+                reasoning=f"Error during classification: {e}",
+                source="fallback"
             )
+
+    def _log_decision(self, task: str, intent: IntentType) -> None:
+        if self.log_path is None:
+            return
+        try:
+            with self.log_path.open("a") as f:
+                f.write(json.dumps({"task": task, "intent": intent.value}) + "\n")
+        except OSError as e:
+            logger.debug(f"Failed to log intent decision: {e}")
+
+    def calibration_report(self, bins: int = 5) -> dict:
+        """
+        Escalation rate and per-tier counts, plus how often the local model agreed with the LLM on
+        escalated tasks, bucketed by model confidence, to help pick model_threshold.
+        """
+        decided = self.stats.total - self.stats.cache_hits
+        buckets = []
+        for b in range(bins):
+            low, high = b / bins, (b + 1) / bins
+            in_bucket = [agreed for conf, agreed in self.stats.escalated_predictions if low <= conf < high or (b == bins - 1 and conf == 1.0)]
+            if in_bucket:
+                buckets.append({
+                    "confidence": f"{low:.1f}-{high:.1f}",
+                    "count": len(in_bucket),
+                    "agreement": round(sum(in_bucket) / len(in_bucket), 3),
+                })
+        return {
+            "total": self.stats.total,
+            "cache_hits": self.stats.cache_hits,
+            "rules": self.stats.rules,
+            "model": self.stats.model,
+            "llm": self.stats.llm,
+            "fallback": self.stats.fallback,
+            "escalation_rate": round((self.stats.llm + self.stats.fallback) / decided, 3) if decided else 0.0,
+            "model_threshold": self.model_threshold,
+            "model_agreement_by_confidence": buckets,
+        }
@@ -22,7 +22,7 @@ from aeternus.llm.messages import (
 	SystemMessage,
 )
 from aeternus.observability import observe_debug
-from aeternus.utils import match_url_with_domain_pattern, time_execution_sync
+from aeternus.utils import compile_domain_patterns, time_execution_sync
 
 logger = logging.getLogger(__name__)
 
@@ -269,10 +269,15 @@ class MessageManager:
 		# Collect placeholders for sensitive data
 		placeholders: set[str] = set()
 
+		matching_domains: set[str] = set()
+		if current_page_url:
+			domain_patterns = tuple(key for key, value in sensitive_data.items() if isinstance(value, dict))
+			matching_domains = compile_domain_patterns(domain_patterns, log_warnings=True).matching_patterns(current_page_url)
+
 		for key, value in sensitive_data.items():
 			if isinstance(value, dict):
 				# New format: {domain: {key: value}}
-				if current_page_url and match_url_with_domain_pattern(current_page_url, key, True):
+				if key in matching_domains:
 					placeholders.update(value.keys())
 			else:
 				# Old format: {key: value}
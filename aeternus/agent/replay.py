@@ -0,0 +1,181 @@
+"""
+Helpers for fast deterministic history replay.
+
+ElementRelocator finds a recorded element in the current selector map: an element_hash -> index
+dict built once per browser state answers exact matches in O(1); when the page changed enough that
+the hash moved, a lazily built inverted index scores candidates by xpath, stable attributes and text.
+wait_for_page_quiet replaces fixed inter-step sleeps with a readiness check that returns as soon as
+the document is loaded and the DOM stopped mutating.
+"""
+
+import asyncio
+import logging
+import re
+from collections import defaultdict
+
+from aeternus.browser.session import BrowserSession
+from aeternus.dom.views import DOMInteractedElement, DOMSelectorMap
+
+logger = logging.getLogger(__name__)
+
+# Actions after which the page (and therefore the selector map) is unchanged, so the next step can reuse it
+DOM_PRESERVING_ACTIONS = frozenset({'extract', 'read_file', 'write_file', 'replace_file', 'dropdown_options', 'screenshot'})
+
+# Attribute weights for fuzzy matching, identifiers count most
+_ATTRIBUTE_WEIGHTS = {
+	'id': 6.0,
+	'data-testid': 6.0,
+	'name': 4.0,
+	'aria-label': 3.0,
+	'placeholder': 3.0,
+	'href': 3.0,
+	'title': 2.0,
+	'alt': 2.0,
+	'for': 2.0,
+	'type': 1.0,
+	'role': 1.0,
+}
+# Attributes whose words also count as text, since labels move between attributes and content
+_TEXT_ATTRIBUTES = ('aria-label', 'title', 'placeholder', 'alt', 'value')
+_XPATH_WEIGHT = 5.0
+_XPATH_TAIL_WEIGHT = 1.0
+_TEXT_WEIGHT = 3.0
+_MIN_FUZZY_SCORE = 4.0
+
+_WORD_RE = re.compile(r'\w+')
+
+_PAGE_QUIET_JS = """
+new Promise(resolve => {
+	const start = performance.now();
+	let lastMutation = start;
+	const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+	observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+	const check = () => {
+		const now = performance.now();
+		if ((document.readyState === 'complete' && now - lastMutation >= %(quiet_ms)d) || now - start >= %(timeout_ms)d) {
+			observer.disconnect();
+			resolve(now - start);
+		} else {
+			setTimeout(check, 25);
+		}
+	};
+	check();
+})
+"""
+
+
+def _xpath_tail(xpath: str, segments: int = 2) -> str:
+	return '/'.join(xpath.split('/')[-segments:])
+
+
+def _words(text: str) -> set[str]:
+	return {w for w in _WORD_RE.findall(text.lower()) if len(w) > 1}
+
+
+class ElementRelocator:
+	"""Maps recorded elements to indices in one browser state's selector map."""
+
+	def __init__(self, selector_map: DOMSelectorMap):
+		self.selector_map = selector_map
+		self._by_hash: dict[int, int] = {}
+		for index, element in selector_map.items():
+			self._by_hash.setdefault(element.element_hash, index)
+		# Built on the first hash miss only
+		self._tokens: dict[str, list[int]] | None = None
+		self._texts: dict[int, set[str]] = {}
+
+	def _build_scoring_index(self) -> dict[str, list[int]]:
+		tokens: dict[str, list[int]] = defaultdict(list)
+		for index, element in self.selector_map.items():
+			xpath = element.xpath
+			tokens[f'xpath:{xpath}'].append(index)
+			tokens[f'tail:{element.tag_name}:{_xpath_tail(xpath)}'].append(index)
+			for name in _ATTRIBUTE_WEIGHTS:
+				value = element.attributes.get(name)
+				if value:
+					tokens[f'attr:{name}={value}'].append(index)
+
+			text = _words(element.get_all_children_text(max_depth=2))
+			for name in _TEXT_ATTRIBUTES:
+				text |= _words(element.attributes.get(name, ''))
+			self._texts[index] = text
+			for word in text:
+				tokens[f'text:{word}'].append(index)
+		return tokens
+
+	def _candidate_scores(self, historical: DOMInteractedElement) -> dict[int, float]:
+		if self._tokens is None:
+			self._tokens = self._build_scoring_index()
+		tokens = self._tokens
+
+		scores: dict[int, float] = defaultdict(float)
+		for index in tokens.get(f'xpath:{historical.x_path}', ()):
+			scores[index] += _XPATH_WEIGHT
+		tag = historical.node_name.lower()
+		for index in tokens.get(f'tail:{tag}:{_xpath_tail(historical.x_path)}', ()):
+			scores[index] += _XPATH_TAIL_WEIGHT
+
+		attributes = historical.attributes or {}
+		for name, weight in _ATTRIBUTE_WEIGHTS.items():
+			value = attributes.get(name)
+			if value:
+				for index in tokens.get(f'attr:{name}={value}', ()):
+					scores[index] += weight
+
+		historical_text = _words(historical.node_value or '')
+		for name in _TEXT_ATTRIBUTES:
+			historical_text |= _words(attributes.get(name, ''))
+		if historical_text:
+			candidates = {i for word in historical_text for i in tokens.get(f'text:{word}', ())}
+			for index in candidates:
+				text = self._texts[index]
+				scores[index] += _TEXT_WEIGHT * len(historical_text & text) / len(historical_text | text)
+
+		# Only elements of the same tag are considered
+		return {i: s for i, s in scores.items() if self.selector_map[i].tag_name == tag}
+
+	def find(self, historical: DOMInteractedElement) -> tuple[int | None, str]:
+		"""Return (index, how it was matched), or (None, reason) when there is no confident match."""
+		index = self._by_hash.get(historical.element_hash)
+		if index is not None:
+			return index, 'hash'
+
+		scores = self._candidate_scores(historical)
+		if not scores:
+			return None, 'no candidates'
+		ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+		best_index, best_score = ranked[0]
+		if best_score < _MIN_FUZZY_SCORE:
+			return None, f'best score {best_score:.1f} below {_MIN_FUZZY_SCORE}'
+		if len(ranked) > 1 and ranked[1][1] == best_score:
+			return None, f'ambiguous, {sum(1 for _, s in ranked if s == best_score)} candidates scored {best_score:.1f}'
+		return best_index, f'fuzzy score {best_score:.1f}'
+
+
+async def wait_for_page_quiet(browser_session: BrowserSession, timeout: float, quiet_period: float = 0.15) -> float:
+	"""Wait until the focused page finished loading and its DOM stopped changing for quiet_period, at most timeout seconds.
+
+	Returns the seconds waited. Navigations during the wait restart the check within the remaining budget.
+	"""
+	if timeout <= 0:
+		return 0.0
+
+	loop_time = asyncio.get_running_loop().time
+	start = loop_time()
+	while (remaining := timeout - (loop_time() - start)) > 0:
+		try:
+			cdp_session = await browser_session.get_or_create_cdp_session(focus=True)
+			await cdp_session.cdp_client.send.Runtime.evaluate(
+				params={
+					'expression': _PAGE_QUIET_JS % {'quiet_ms': int(quiet_period * 1000), 'timeout_ms': int(remaining * 1000)},
+					'awaitPromise': True,
+					'returnByValue': True,
+				},
+				session_id=cdp_session.session_id,
+			)
+			break
+		except Exception as e:
+			# The execution context is destroyed when the page navigates mid-wait
+			logger.debug(f'Page readiness check interrupted: {type(e).__name__}: {e}')
+			await asyncio.sleep(0.05)
+	return loop_time() - start
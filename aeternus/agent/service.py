@@ -44,6 +44,8 @@ from aeternus.agent.message_manager.service import (
 	MessageManager,
 )
 from aeternus.agent.prompts import SystemPrompt
+from aeternus.agent.history_log import HistoryLog, HistoryLogWriter
+from aeternus.agent.replay import DOM_PRESERVING_ACTIONS, ElementRelocator, wait_for_page_quiet
 from aeternus.agent.views import (
 	ActionResult,
 	AgentError,
@@ -65,6 +67,7 @@ from aeternus.config import CONFIG
 from aeternus.dom.views import DOMInteractedElement
 from aeternus.filesystem.file_system import FileSystem
 from aeternus.observability import observe, observe_debug
+from aeternus.screenshots.processing import resize_screenshot_async
 from aeternus.telemetry.service import ProductTelemetry
 from aeternus.telemetry.views import AgentTelemetryEvent
 from aeternus.tools.registry.views import ActionModel
@@ -79,7 +82,9 @@ from aeternus.utils import (
 )
 
 from aeternus.knowledge.ingestion import ContentIngestor
-from aeternus.knowledge.embeddings import MockEmbeddings
+from aeternus.knowledge.embeddings import EmbeddingsProvider, MockEmbeddings
+from aeternus.knowledge.service import IngestionService
+from aeternus.knowledge.store import VectorStore
 from aeternus.verification.service import VerificationService
 from aeternus.agent.intent import IntentClassifier, IntentType
 
@@ -166,6 +171,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		use_vision: bool | Literal['auto'] = True,
 		save_conversation_path: str | Path | None = None,
 		save_conversation_path_encoding: str | None = 'utf-8',
+		history_log_path: str | Path | None = None,
 		max_failures: int = 3,
 		override_system_message: str | None = None,
 		extend_system_message: str | None = None,
@@ -365,6 +371,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			vision_detail_level=vision_detail_level,
 			save_conversation_path=save_conversation_path,
 			save_conversation_path_encoding=save_conversation_path_encoding,
+			history_log_path=history_log_path,
 			max_failures=max_failures,
 			override_system_message=override_system_message,
 			extend_system_message=extend_system_message,
@@ -409,11 +416,21 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 
 		# Initialize AI Browser Components
 		self.content_ingestor = ContentIngestor()
+		# Optional local knowledge base: set both to keep ingested pages searchable instead of re-navigating
+		self.knowledge_store: VectorStore | None = None
+		self.embeddings: EmbeddingsProvider | None = None
+		self._ingestion_service: IngestionService | None = None
+		# Steps are appended to settings.history_log_path as they complete
+		self._history_log: HistoryLogWriter | None = None
+		# Replay state: the relocator for the last captured page, reused while replayed actions leave the DOM unchanged
+		self._replay_relocator: ElementRelocator | None = None
+		self._replay_dom_changed = False
 		self.verification_service = VerificationService()
 		self.intent_classifier = IntentClassifier(llm=llm)
 		self.current_intent = None
 
 		# Action setup
+		self._agent_output_types: dict[type[ActionModel], type[AgentOutput]] = {}
 		self._setup_action_models()
 		self._set_aeternus_version_and_source(source)
 
@@ -736,21 +753,24 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		# Initially only include actions with no filters
 		self.ActionModel = self.tools.registry.create_action_model()
 		# Create output model with the dynamic actions
-		if self.settings.flash_mode:
-			self.AgentOutput = AgentOutput.type_with_custom_actions_flash_mode(self.ActionModel)
-		elif self.settings.use_thinking:
-			self.AgentOutput = AgentOutput.type_with_custom_actions(self.ActionModel)
-		else:
-			self.AgentOutput = AgentOutput.type_with_custom_actions_no_thinking(self.ActionModel)
+		self.AgentOutput = self._agent_output_type(self.ActionModel)
 
 		# used to force the done action when max_steps is reached
 		self.DoneActionModel = self.tools.registry.create_action_model(include_actions=['done'])
-		if self.settings.flash_mode:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions_flash_mode(self.DoneActionModel)
-		elif self.settings.use_thinking:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions(self.DoneActionModel)
-		else:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions_no_thinking(self.DoneActionModel)
+		self.DoneAgentOutput = self._agent_output_type(self.DoneActionModel)
+
+	def _agent_output_type(self, action_model: type[ActionModel]) -> type[AgentOutput]:
+		"""AgentOutput type for an action model, cached since the registry hands out the same model while actions don't change"""
+		output_type = self._agent_output_types.get(action_model)
+		if output_type is None:
+			if self.settings.flash_mode:
+				output_type = AgentOutput.type_with_custom_actions_flash_mode(action_model)
+			elif self.settings.use_thinking:
+				output_type = AgentOutput.type_with_custom_actions(action_model)
+			else:
+				output_type = AgentOutput.type_with_custom_actions_no_thinking(action_model)
+			self._agent_output_types[action_model] = output_type
+		return output_type
 
 	def _get_skill_slug(self, skill: 'Skill', all_skills: list['Skill']) -> str:
 		"""Generate a clean slug from skill title for action names
@@ -1051,6 +1071,13 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		if self.skill_service is not None:
 			unavailable_skills_info = await self._get_unavailable_skills_info()
 
+		# Resize the screenshot for the LLM off the event loop, the prompt builder picks up the cached result
+		if browser_state_summary.screenshot and self._message_manager.llm_screenshot_size:
+			try:
+				await resize_screenshot_async(browser_state_summary.screenshot, self._message_manager.llm_screenshot_size)
+			except Exception as e:
+				self.logger.debug(f'Failed to pre-resize screenshot for LLM: {type(e).__name__}: {e}')
+
 		self._message_manager.create_state_messages(
 			browser_state_summary=browser_state_summary,
 			model_output=self.state.last_model_output,
@@ -1111,6 +1138,18 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		result = await self.multi_act(self.state.last_model_output.action)
 		self.state.last_result = result
 
+	def _start_ingestion_service(self) -> None:
+		"""Start background ingestion of every loaded tab when a knowledge store is configured (idempotent)"""
+		if not (self.knowledge_store and self.embeddings and self.browser_session):
+			return
+		# Ingested pages are also the evidence the final answer is cross-checked against
+		self.verification_service.configure_knowledge(self.knowledge_store, self.embeddings)
+		if self._ingestion_service is None:
+			self._ingestion_service = IngestionService(
+				self.browser_session, self.knowledge_store, self.embeddings, ingestor=self.content_ingestor
+			)
+		self._ingestion_service.start()
+
 	async def _post_process(self) -> None:
 		"""Handle post-action processing like download tracking and result logging"""
 		assert self.browser_session is not None, 'BrowserSession is not set up'
@@ -1126,12 +1165,11 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			if verification_result['status'] == 'flagged':
 				self.logger.warning(f"⚠️ Security Alert: {verification_result['reason']}")
 			
-			# 2. Content Ingestion (only if research intent or general)
-			if self.current_intent in [IntentType.RESEARCH, IntentType.GENERAL, IntentType.PLANNING]:
-				ingested = await self.content_ingestor.ingest_page(self.browser_session)
-				if ingested:
-					# Potentially store in memory or knowledge graph
-					pass
+			# 2. Content Ingestion: with a knowledge store, every tab is ingested in the background as it loads
+			if self.knowledge_store and self.embeddings:
+				self._start_ingestion_service()
+			elif self.current_intent in [IntentType.RESEARCH, IntentType.GENERAL, IntentType.PLANNING]:
+				await self.content_ingestor.ingest_page(self.browser_session)
 
 		# check for action errors  and len more than 1
 		if self.state.last_result and len(self.state.last_result) == 1 and self.state.last_result[-1].error:
@@ -1156,6 +1194,24 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 				total_attachments = len(self.state.last_result[-1].attachments)
 				for i, file_path in enumerate(self.state.last_result[-1].attachments):
 					self.logger.info(f'👉 Attachment {i + 1 if total_attachments > 1 else ""}: {file_path}')
+			await self._verify_final_result(self.state.last_result[-1])
+
+	async def _verify_final_result(self, result: ActionResult) -> None:
+		"""Cross-check the claims in the final answer against ingested pages and attach the verdicts to its metadata"""
+		if self.verification_service.claim_verifier is None or not result.extracted_content:
+			return
+		try:
+			verification = await self.verification_service.validate_content(result.extracted_content)
+		except Exception as e:
+			self.logger.debug(f'Claim verification of the final result failed: {type(e).__name__}: {e}')
+			return
+		if not verification['claims']:
+			return
+		result.metadata = {**(result.metadata or {}), 'claim_verification': verification}
+		if any(claim['label'] == 'contradicted' for claim in verification['claims']):
+			self.logger.warning(f'⚠️ Final result conflicts with visited pages: {verification["message"]}')
+		else:
+			self.logger.info(f'🔎 Final result claims: {verification["message"]}')
 
 	async def _handle_step_error(self, error: Exception) -> None:
 		"""Handle all types of errors that can occur during a step"""
@@ -1225,7 +1281,9 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		if summary_message:
 			await self._demo_mode_log(summary_message, 'info', {'step': self.state.n_steps})
 
-		# Save file system state after step completion
+		# Write buffered file changes and save file system state after step completion
+		if self.file_system:
+			await self.file_system.flush()
 		self.save_file_system_state()
 
 		# Emit both step created and executed events
@@ -1453,7 +1511,21 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			state_message=state_message,
 		)
 
+		self._record_history_item(history_item)
+
+	def _record_history_item(self, history_item: AgentHistory) -> None:
+		"""Add a history item, and append it to the JSONL history log if one is configured"""
 		self.history.add_item(history_item)
+		if self.settings.history_log_path:
+			try:
+				if self._history_log is None:
+					# A new run starts a fresh log, follow-up tasks of the same agent keep appending
+					self._history_log = HistoryLogWriter(
+						self.settings.history_log_path, sensitive_data=self.sensitive_data, overwrite=len(self.history.history) == 1
+					)
+				self._history_log.append(history_item)
+			except Exception as e:
+				self.logger.warning(f'Failed to append step to history log: {type(e).__name__}: {e}')
 
 	def _remove_think_tags(self, text: str) -> str:
 		THINK_TAGS = re.compile(r'<think>.*?</think>', re.DOTALL)
@@ -2208,7 +2280,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			self.logger.info("🧠 Analyzing user intent...")
 			intent_analysis = await self.intent_classifier.classify(self.task)
 			self.current_intent = intent_analysis.intent
-			self.logger.info(f"🎯 Intent classified as: {self.current_intent.value.upper()} (Confidence: {intent_analysis.confidence})")
+			self.logger.info(f"🎯 Intent classified as: {self.current_intent.value.upper()} (Confidence: {intent_analysis.confidence}, via {intent_analysis.source})")
 			if intent_analysis.reasoning:
 				self.logger.debug(f"   Reasoning: {intent_analysis.reasoning}")
 			
@@ -2238,6 +2310,8 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			self._log_first_step_startup()
 			# Start browser session and attach watchdogs
 			await self.browser_session.start()
+			# Subscribe before the first navigation (initial actions or step 1) so that page is ingested too
+			self._start_ingestion_service()
 			if self._demo_mode_enabled:
 				await self._demo_mode_log(f'Started task: {self.task}', 'info', {'tag': 'task'})
 				await self._demo_mode_log(
@@ -2297,7 +2371,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			else:
 				agent_run_error = 'Failed to complete task in maximum steps'
 
-				self.history.add_item(
+				self._record_history_item(
 					AgentHistory(
 						model_output=None,
 						result=[ActionResult(error=agent_run_error, include_in_memory=True)],
@@ -2371,8 +2445,10 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 
 				# Lazy import gif module to avoid heavy startup cost
 				from aeternus.agent.gif import create_history_gif
+				from aeternus.screenshots.processing import run_image_task
 
-				create_history_gif(task=self.task, history=self.history, output_path=output_path)
+				# Rendering decodes and re-encodes every screenshot, keep it off the event loop
+				await run_image_task(create_history_gif, task=self.task, history=self.history, output_path=output_path)
 
 				# Only emit output file event if GIF was actually created
 				if Path(output_path).exists():
@@ -2702,7 +2778,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 
 	async def rerun_history(
 		self,
-		history: AgentHistoryList,
+		history: AgentHistoryList | HistoryLog,
 		max_retries: int = 3,
 		skip_failures: bool = True,
 		delay_between_actions: float = 2.0,
@@ -2714,7 +2790,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		Rerun a saved history of actions with error handling and retry logic.
 
 		Args:
-		                history: The history to replay
+		                history: The history to replay (a HistoryLog is streamed step by step)
 		                max_retries: Maximum number of retries per action
 		                skip_failures: Whether to skip failed actions or stop execution
 		                delay_between_actions: Delay between actions in seconds (used when no saved interval)
@@ -2732,8 +2808,12 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		await self.browser_session.start()
 
 		results = []
+		steps = history.history if isinstance(history, AgentHistoryList) else history
+		total_steps = len(steps)
+		self._replay_relocator = None
+		self._replay_dom_changed = False
 
-		for i, history_item in enumerate(history.history):
+		for i, history_item in enumerate(steps):
 			goal = history_item.model_output.current_state.next_goal if history_item.model_output else ''
 			step_num = history_item.metadata.step_number if history_item.metadata else i
 			step_name = 'Initial actions' if step_num == 0 else f'Step {step_num}'
@@ -2759,7 +2839,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 					delay_str = f'{step_delay:.1f}s'
 				delay_source = f'using default delay={delay_str}'
 
-			self.logger.info(f'Replaying {step_name} ({i + 1}/{len(history.history)}) [{delay_source}]: {goal}')
+			self.logger.info(f'Replaying {step_name} ({i + 1}/{total_steps}) [{delay_source}]: {goal}')
 
 			if (
 				not history_item.model_output
@@ -2842,7 +2922,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 				metadata=metadata,
 			)
 
-			self.history.add_item(history_item)
+			self._record_history_item(history_item)
 			self.logger.debug('📝 Saved initial actions to history as step 0')
 			self.logger.debug('Initial actions completed')
 
@@ -2852,21 +2932,45 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		"""Execute a single step from history with element validation.
 
 		For extract actions, uses AI to re-evaluate the content since page content may have changed.
+
+		delay is an upper bound: after a step that could change the page we wait until the page is loaded
+		and its DOM is quiet, at most delay seconds. The browser state is only captured when an action
+		targets an element, and is reused while the previous steps only ran DOM-preserving actions.
 		"""
 		assert self.browser_session is not None, 'BrowserSession is not set up'
+		if not history_item.model_output:
+			raise ValueError('Invalid model output')
+
+		actions = history_item.model_output.action
+		action_names = [next(iter(action.model_dump(exclude_unset=True).keys()), None) for action in actions]
+		interacted = history_item.state.interacted_element
+		needs_elements = any(
+			name != 'extract' and i < len(interacted) and interacted[i] is not None and action.get_index() is not None
+			for i, (name, action) in enumerate(zip(action_names, actions))
+		)
 
-		await asyncio.sleep(delay)
-		state = await self.browser_session.get_browser_state_summary(include_screenshot=False)
-		if not state or not history_item.model_output:
-			raise ValueError('Invalid state or model output')
+		if self._replay_dom_changed:
+			self._replay_relocator = None
+			waited = await wait_for_page_quiet(self.browser_session, delay)
+			self.logger.debug(f'Page ready after {waited * 1000:.0f}ms (max {delay * 1000:.0f}ms)')
+
+		relocator = self._replay_relocator
+		if needs_elements and relocator is None:
+			state = await self.browser_session.get_browser_state_summary(include_screenshot=False)
+			if not state:
+				raise ValueError('Invalid browser state')
+			relocator = self._replay_relocator = ElementRelocator(state.dom_state.selector_map)
+
+		# Until this step completes, assume the page changed (a failed step is retried against a fresh state)
+		self._replay_dom_changed = True
 
 		results = []
 		pending_actions = []
 
-		for i, action in enumerate(history_item.model_output.action):
+		for i, action in enumerate(actions):
 			# Check if this is an extract action - use AI step instead
 			action_data = action.model_dump(exclude_unset=True)
-			action_name = next(iter(action_data.keys()), None)
+			action_name = action_names[i]
 
 			if action_name == 'extract':
 				# Execute any pending actions first to maintain correct order
@@ -2892,9 +2996,9 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			else:
 				# For non-extract actions, update indices and collect for batch execution
 				updated_action = await self._update_action_indices(
-					history_item.state.interacted_element[i],
+					interacted[i] if i < len(interacted) else None,
 					action,
-					state,
+					relocator,
 				)
 				if updated_action is None:
 					raise ValueError(f'Could not find matching element {i} in current page')
@@ -2905,39 +3009,32 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			batch_results = await self.multi_act(pending_actions)
 			results.extend(batch_results)
 
+		self._replay_dom_changed = any(name not in DOM_PRESERVING_ACTIONS for name in action_names)
 		return results
 
 	async def _update_action_indices(
 		self,
 		historical_element: DOMInteractedElement | None,
 		action: ActionModel,  # Type this properly based on your action model
-		browser_state_summary: BrowserStateSummary,
+		relocator: ElementRelocator | None,
 	) -> ActionModel | None:
 		"""
 		Update action indices based on current page state.
+		Elements are matched by hash first, then by xpath, attributes and text when the page changed.
 		Returns updated action or None if element cannot be found.
 		"""
-		if not historical_element or not browser_state_summary.dom_state.selector_map:
+		if not historical_element or relocator is None or not relocator.selector_map:
 			return action
 
-		# selector_hash_map = {hash(e): e for e in browser_state_summary.dom_state.selector_map.values()}
-
-		highlight_index, current_element = next(
-			(
-				(highlight_index, element)
-				for highlight_index, element in browser_state_summary.dom_state.selector_map.items()
-				if element.element_hash == historical_element.element_hash
-			),
-			(None, None),
-		)
-
-		if not current_element or highlight_index is None:
+		highlight_index, method = relocator.find(historical_element)
+		if highlight_index is None:
+			self.logger.debug(f'No match for <{historical_element.node_name.lower()}> {historical_element.x_path}: {method}')
 			return None
 
 		old_index = action.get_index()
 		if old_index != highlight_index:
 			action.set_index(highlight_index)
-			self.logger.info(f'Element moved in DOM, updated index from {old_index} to {highlight_index}')
+			self.logger.info(f'Element moved in DOM, updated index from {old_index} to {highlight_index} (matched by {method})')
 
 		return action
 
@@ -2951,7 +3048,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		Load history from file and rerun it, optionally substituting variables.
 
 		Args:
-			history_file: Path to the history file
+			history_file: Path to the history file (.json, or a .jsonl history log)
 			variables: Optional dict mapping variable names to new values (e.g. {'email': 'new@example.com'})
 			**kwargs: Additional arguments passed to rerun_history:
 				- max_retries: Maximum retries per action (default: 3)
@@ -2963,7 +3060,13 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		"""
 		if not history_file:
 			history_file = 'AgentHistory.json'
-		history = AgentHistoryList.load_from_file(history_file, self.AgentOutput)
+
+		history: AgentHistoryList | HistoryLog
+		if Path(history_file).suffix == '.jsonl' and not variables:
+			# Stream steps from the log instead of loading the whole history
+			history = HistoryLog(history_file, self.AgentOutput)
+		else:
+			history = AgentHistoryList.load_from_file(history_file, self.AgentOutput)
 
 		# Substitute variables if provided
 		if variables:
@@ -3052,6 +3155,17 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			if self.skill_service is not None:
 				await self.skill_service.close()
 
+			if self._ingestion_service is not None:
+				await self._ingestion_service.stop()
+
+			if self.file_system is not None:
+				await self.file_system.flush()
+
+			if self._history_log is not None:
+				self._history_log.write_usage(self.history.usage)
+				self._history_log.close()
+				self._history_log = None
+
 			# Force garbage collection
 			gc.collect()
 
@@ -3078,21 +3192,11 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		# Create new action model with current page's filtered actions
 		self.ActionModel = self.tools.registry.create_action_model(page_url=page_url)
 		# Update output model with the new actions
-		if self.settings.flash_mode:
-			self.AgentOutput = AgentOutput.type_with_custom_actions_flash_mode(self.ActionModel)
-		elif self.settings.use_thinking:
-			self.AgentOutput = AgentOutput.type_with_custom_actions(self.ActionModel)
-		else:
-			self.AgentOutput = AgentOutput.type_with_custom_actions_no_thinking(self.ActionModel)
+		self.AgentOutput = self._agent_output_type(self.ActionModel)
 
 		# Update done action model too
 		self.DoneActionModel = self.tools.registry.create_action_model(include_actions=['done'], page_url=page_url)
-		if self.settings.flash_mode:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions_flash_mode(self.DoneActionModel)
-		elif self.settings.use_thinking:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions(self.DoneActionModel)
-		else:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions_no_thinking(self.DoneActionModel)
+		self.DoneAgentOutput = self._agent_output_type(self.DoneActionModel)
 
 	async def authenticate_cloud_sync(self, show_instructions: bool = True) -> bool:
 		"""
@@ -36,6 +36,7 @@ class AgentSettings(BaseModel):
 	vision_detail_level: Literal['auto', 'low', 'high'] = 'auto'
 	save_conversation_path: str | Path | None = None
 	save_conversation_path_encoding: str | None = 'utf-8'
+	history_log_path: str | Path | None = None  # JSONL file each completed step is appended to
 	max_failures: int = 3
 	generate_gif: bool | str = False
 	override_system_message: str | None = None
@@ -291,6 +292,18 @@ class AgentHistory(BaseModel):
 
 	model_config = ConfigDict(arbitrary_types_allowed=True, protected_namespaces=())
 
+	@classmethod
+	def load_from_dict(cls, data: dict[str, Any], output_model: type[AgentOutput]) -> AgentHistory:
+		"""Validate one serialized history item, enriching model_output actions with output_model"""
+		if data['model_output']:
+			if isinstance(data['model_output'], dict):
+				data['model_output'] = output_model.model_validate(data['model_output'])
+			else:
+				data['model_output'] = None
+		if 'interacted_element' not in data['state']:
+			data['state']['interacted_element'] = None
+		return cls.model_validate(data)
+
 	@staticmethod
 	def get_interacted_element(model_output: AgentOutput, selector_map: DOMSelectorMap) -> list[DOMInteractedElement | None]:
 		elements = []
@@ -432,7 +445,19 @@ class AgentHistoryList(BaseModel, Generic[AgentStructuredOutput]):
 		return self.__str__()
 
 	def save_to_file(self, filepath: str | Path, sensitive_data: dict[str, str | dict[str, str]] | None = None) -> None:
-		"""Save history to JSON file with proper serialization and optional sensitive data filtering"""
+		"""Save history to JSON file with proper serialization and optional sensitive data filtering
+
+		A .jsonl path writes the append-only step-per-line format (see aeternus.agent.history_log).
+		"""
+		if Path(filepath).suffix == '.jsonl':
+			from aeternus.agent.history_log import HistoryLogWriter
+
+			with HistoryLogWriter(filepath, sensitive_data=sensitive_data, overwrite=True) as writer:
+				for item in self.history:
+					writer.append(item)
+				writer.write_usage(self.usage)
+			return
+
 		try:
 			Path(filepath).parent.mkdir(parents=True, exist_ok=True)
 			data = self.model_dump(sensitive_data=sensitive_data)
@@ -496,7 +521,12 @@ class AgentHistoryList(BaseModel, Generic[AgentStructuredOutput]):
 
 	@classmethod
 	def load_from_file(cls, filepath: str | Path, output_model: type[AgentOutput]) -> AgentHistoryList:
-		"""Load history from JSON file"""
+		"""Load history from JSON file (or a .jsonl history log, fully loaded; use HistoryLog for lazy access)"""
+		if Path(filepath).suffix == '.jsonl':
+			from aeternus.agent.history_log import HistoryLog
+
+			return HistoryLog(filepath, output_model).to_history_list()
+
 		with open(filepath, encoding='utf-8') as f:
 			data = json.load(f)
 		return cls.load_from_dict(data, output_model)
@@ -9,15 +9,29 @@ import base64
 import io
 import logging
 import os
+from typing import NamedTuple
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageColor, ImageDraw, ImageFont
 
 from aeternus.dom.views import DOMSelectorMap, EnhancedDOMTreeNode
 from aeternus.observability import observe_debug
+from aeternus.screenshots.processing import run_image_task
 from aeternus.utils import time_execution_async
 
+try:
+	import numpy as np
+
+	NUMPY_AVAILABLE = True
+except ImportError:
+	NUMPY_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Dashed border pattern used for element highlights
+DASH_LENGTH = 4
+GAP_LENGTH = 8
+LINE_WIDTH = 2
+
 # Font cache to prevent repeated font loading and reduce memory usage
 _FONT_CACHE: dict[tuple[str, int], ImageFont.FreeTypeFont | None] = {}
 
@@ -105,44 +119,83 @@ def should_show_index_overlay(backend_node_id: int | None) -> bool:
 	return backend_node_id is not None
 
 
-def draw_enhanced_bounding_box_with_text(
-	draw,  # ImageDraw.Draw - avoiding type annotation due to PIL typing issues
-	bbox: tuple[int, int, int, int],
-	color: str,
-	text: str | None = None,
-	font: ImageFont.FreeTypeFont | None = None,
-	element_type: str = 'div',
-	image_size: tuple[int, int] = (2000, 1500),
-	device_pixel_ratio: float = 1.0,
-) -> None:
-	"""Draw an enhanced bounding box with much bigger index containers and dashed borders."""
+def _draw_dashed_border_pil(draw, bbox: tuple[int, int, int, int], color: str) -> None:
+	"""Draw a dashed rectangle one dash at a time with ImageDraw (fallback when NumPy is not installed)."""
 	x1, y1, x2, y2 = bbox
 
-	# Draw dashed bounding box with pattern: 1 line, 2 spaces, 1 line, 2 spaces...
-	dash_length = 4
-	gap_length = 8
-	line_width = 2
-
-	# Helper function to draw dashed line
 	def draw_dashed_line(start_x, start_y, end_x, end_y):
 		if start_x == end_x:  # Vertical line
 			y = start_y
 			while y < end_y:
-				dash_end = min(y + dash_length, end_y)
-				draw.line([(start_x, y), (start_x, dash_end)], fill=color, width=line_width)
-				y += dash_length + gap_length
+				dash_end = min(y + DASH_LENGTH, end_y)
+				draw.line([(start_x, y), (start_x, dash_end)], fill=color, width=LINE_WIDTH)
+				y += DASH_LENGTH + GAP_LENGTH
 		else:  # Horizontal line
 			x = start_x
 			while x < end_x:
-				dash_end = min(x + dash_length, end_x)
-				draw.line([(x, start_y), (dash_end, start_y)], fill=color, width=line_width)
-				x += dash_length + gap_length
+				dash_end = min(x + DASH_LENGTH, end_x)
+				draw.line([(x, start_y), (dash_end, start_y)], fill=color, width=LINE_WIDTH)
+				x += DASH_LENGTH + GAP_LENGTH
 
-	# Draw dashed rectangle
 	draw_dashed_line(x1, y1, x2, y1)  # Top
 	draw_dashed_line(x2, y1, x2, y2)  # Right
-	draw_dashed_line(x2, y2, x1, y2)  # Bottom
-	draw_dashed_line(x1, y2, x1, y1)  # Left
+	draw_dashed_line(x1, y2, x2, y2)  # Bottom
+	draw_dashed_line(x1, y1, x1, y2)  # Left
+
+
+def _composite_dashed_borders(image: Image.Image, specs: 'list[HighlightSpec]') -> Image.Image:
+	"""Paint the dashed borders of all highlights into an RGBA image with NumPy slice assignments.
+
+	Each edge becomes one strided slice write instead of one ImageDraw.line() call per dash, which is what
+	dominates rendering time on pages with hundreds of interactive elements.
+	"""
+	pixels = np.array(image)
+	height, width = pixels.shape[:2]
+	period = DASH_LENGTH + GAP_LENGTH
+
+	for spec in specs:
+		x1, y1, x2, y2 = spec.bbox
+		rgba = ImageColor.getcolor(spec.color, 'RGBA')
+
+		# Dash masks along each axis: a dash covers DASH_LENGTH + 1 pixels (ImageDraw lines include both ends),
+		# and like the ImageDraw loop no dash starts at the far end of an edge
+		xs = np.arange(x1, x2 + 1)
+		xs = xs[((xs - x1) % period <= DASH_LENGTH) & (xs - (xs - x1) % period < x2)]
+		ys = np.arange(y1, y2 + 1)
+		ys = ys[((ys - y1) % period <= DASH_LENGTH) & (ys - (ys - y1) % period < y2)]
+
+		# A 2px wide ImageDraw line at row/column c covers c and c+1
+		for row in (y1, y2):
+			for r in (row, row + 1):
+				if 0 <= r < height:
+					pixels[r, xs[(xs >= 0) & (xs < width)]] = rgba
+		for col in (x1, x2):
+			for c in (col, col + 1):
+				if 0 <= c < width:
+					pixels[ys[(ys >= 0) & (ys < height)], c] = rgba
+
+	return Image.fromarray(pixels, 'RGBA')
+
+
+def draw_enhanced_bounding_box_with_text(
+	draw,  # ImageDraw.Draw - avoiding type annotation due to PIL typing issues
+	bbox: tuple[int, int, int, int],
+	color: str,
+	text: str | None = None,
+	font: ImageFont.FreeTypeFont | None = None,
+	element_type: str = 'div',
+	image_size: tuple[int, int] = (2000, 1500),
+	device_pixel_ratio: float = 1.0,
+	draw_border: bool = True,
+) -> None:
+	"""Draw an enhanced bounding box with much bigger index containers and dashed borders.
+
+	Pass draw_border=False when the border was already composited with _composite_dashed_borders().
+	"""
+	x1, y1, x2, y2 = bbox
+
+	if draw_border:
+		_draw_dashed_border_pil(draw, bbox, color)
 
 	# Draw much bigger index overlay if we have index text
 	if text:
@@ -337,20 +390,27 @@ def draw_bounding_box_with_text(
 			logger.debug(f'Failed to draw text overlay: {e}')
 
 
-def process_element_highlight(
+class HighlightSpec(NamedTuple):
+	"""Everything needed to draw one element highlight, plain data so it can be sent to an image worker process."""
+
+	element_id: int
+	bbox: tuple[int, int, int, int]  # device pixels, not yet clipped to the image
+	color: str
+	text: str | None
+	tag_name: str
+
+
+def build_highlight_spec(
 	element_id: int,
 	element: EnhancedDOMTreeNode,
-	draw,
 	device_pixel_ratio: float,
-	font,
 	filter_highlight_ids: bool,
-	image_size: tuple[int, int],
-) -> None:
-	"""Process a single element for highlighting."""
+) -> HighlightSpec | None:
+	"""Compute what to draw for a single element (cheap, reads the DOM node so it runs on the caller's side)."""
 	try:
 		# Use absolute_position coordinates directly
 		if not element.absolute_position:
-			return
+			return None
 
 		bounds = element.absolute_position
 
@@ -361,17 +421,6 @@ def process_element_highlight(
 		x2 = int((bounds.x + bounds.width) * device_pixel_ratio)
 		y2 = int((bounds.y + bounds.height) * device_pixel_ratio)
 
-		# Ensure coordinates are within image bounds
-		img_width, img_height = image_size
-		x1 = max(0, min(x1, img_width))
-		y1 = max(0, min(y1, img_height))
-		x2 = max(x1, min(x2, img_width))
-		y2 = max(y1, min(y2, img_height))
-
-		# Skip if bounding box is too small or invalid
-		if x2 - x1 < 2 or y2 - y1 < 2:
-			return
-
 		# Get element color based on type
 		tag_name = element.tag_name if hasattr(element, 'tag_name') else 'div'
 		element_type = None
@@ -395,15 +444,111 @@ def process_element_highlight(
 				# Always show ID when filter is disabled
 				index_text = str(backend_node_id)
 
-		# Draw enhanced bounding box with bigger index
+		return HighlightSpec(element_id, (x1, y1, x2, y2), color, index_text, tag_name)
+
+	except Exception as e:
+		logger.debug(f'Failed to build highlight for element {element_id}: {e}')
+		return None
+
+
+def _clip_highlight_spec(spec: HighlightSpec, image_size: tuple[int, int]) -> HighlightSpec | None:
+	"""Clip a highlight to the image bounds, dropping it if nothing visible remains."""
+	x1, y1, x2, y2 = spec.bbox
+
+	# Ensure coordinates are within image bounds
+	img_width, img_height = image_size
+	x1 = max(0, min(x1, img_width))
+	y1 = max(0, min(y1, img_height))
+	x2 = max(x1, min(x2, img_width))
+	y2 = max(y1, min(y2, img_height))
+
+	# Skip if bounding box is too small or invalid
+	if x2 - x1 < 2 or y2 - y1 < 2:
+		return None
+	return spec._replace(bbox=(x1, y1, x2, y2))
+
+
+def process_element_highlight(
+	element_id: int,
+	element: EnhancedDOMTreeNode,
+	draw,
+	device_pixel_ratio: float,
+	font,
+	filter_highlight_ids: bool,
+	image_size: tuple[int, int],
+) -> None:
+	"""Process a single element for highlighting."""
+	spec = build_highlight_spec(element_id, element, device_pixel_ratio, filter_highlight_ids)
+	if spec is None:
+		return
+	spec = _clip_highlight_spec(spec, image_size)
+	if spec is None:
+		return
+	try:
 		draw_enhanced_bounding_box_with_text(
-			draw, (x1, y1, x2, y2), color, index_text, font, tag_name, image_size, device_pixel_ratio
+			draw, spec.bbox, spec.color, spec.text, font, spec.tag_name, image_size, device_pixel_ratio
 		)
-
 	except Exception as e:
 		logger.debug(f'Failed to draw highlight for element {element_id}: {e}')
 
 
+def render_highlights(screenshot_b64: str, specs: list[HighlightSpec], device_pixel_ratio: float = 1.0) -> str:
+	"""Decode a screenshot, draw the given highlights on it and encode it back to base64 PNG.
+
+	Pure function of its arguments so it can run on the image executor (thread or worker process).
+	"""
+	screenshot_data = base64.b64decode(screenshot_b64)
+	image = Image.open(io.BytesIO(screenshot_data)).convert('RGBA')
+	try:
+		clipped = [c for c in (_clip_highlight_spec(spec, image.size) for spec in specs) if c is not None]
+
+		# Borders in one vectorized pass when NumPy is available, labels still need ImageDraw for text
+		borders_composited = False
+		if NUMPY_AVAILABLE and clipped:
+			try:
+				composited = _composite_dashed_borders(image, clipped)
+				image.close()
+				image = composited
+				borders_composited = True
+			except Exception as e:
+				logger.debug(f'Vectorized highlight compositing failed, drawing borders with ImageDraw: {e}')
+
+		# Create drawing context
+		draw = ImageDraw.Draw(image)
+
+		# Load font using shared function with caching
+		font = get_cross_platform_font(12)
+		# If no system fonts found, font remains None and will use default font
+
+		# PIL ImageDraw is not thread-safe, so elements are drawn one by one on this worker
+		for spec in clipped:
+			try:
+				draw_enhanced_bounding_box_with_text(
+					draw,
+					spec.bbox,
+					spec.color,
+					spec.text,
+					font,
+					spec.tag_name,
+					image.size,
+					device_pixel_ratio,
+					draw_border=not borders_composited,
+				)
+			except Exception as e:
+				logger.debug(f'Failed to draw highlight for element {spec.element_id}: {e}')
+
+		# Convert back to base64
+		output_buffer = io.BytesIO()
+		try:
+			image.save(output_buffer, format='PNG')
+			return base64.b64encode(output_buffer.getvalue()).decode('utf-8')
+		finally:
+			output_buffer.close()
+	finally:
+		# Explicit cleanup to prevent memory leaks
+		image.close()
+
+
 @observe_debug(ignore_input=True, ignore_output=True, name='create_highlighted_screenshot')
 @time_execution_async('create_highlighted_screenshot')
 async def create_highlighted_screenshot(
@@ -416,6 +561,8 @@ async def create_highlighted_screenshot(
 ) -> str:
 	"""Create a highlighted screenshot with bounding boxes around interactive elements.
 
+	Only the highlight specs are computed here, decoding, drawing and encoding run on the image executor.
+
 	Args:
 	    screenshot_b64: Base64 encoded screenshot
 	    selector_map: Map of interactive elements with their positions
@@ -427,42 +574,18 @@ async def create_highlighted_screenshot(
 	    Base64 encoded highlighted screenshot
 	"""
 	try:
-		# Decode screenshot
-		screenshot_data = base64.b64decode(screenshot_b64)
-		image = Image.open(io.BytesIO(screenshot_data)).convert('RGBA')
-
-		# Create drawing context
-		draw = ImageDraw.Draw(image)
+		specs = [
+			spec
+			for element_id, element in selector_map.items()
+			if (spec := build_highlight_spec(element_id, element, device_pixel_ratio, filter_highlight_ids)) is not None
+		]
 
-		# Load font using shared function with caching
-		font = get_cross_platform_font(12)
-		# If no system fonts found, font remains None and will use default font
-
-		# Process elements sequentially to avoid ImageDraw thread safety issues
-		# PIL ImageDraw is not thread-safe, so we process elements one by one
-		for element_id, element in selector_map.items():
-			process_element_highlight(element_id, element, draw, device_pixel_ratio, font, filter_highlight_ids, image.size)
-
-		# Convert back to base64
-		output_buffer = io.BytesIO()
-		try:
-			image.save(output_buffer, format='PNG')
-			output_buffer.seek(0)
-			highlighted_b64 = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
-
-			logger.debug(f'Successfully created highlighted screenshot with {len(selector_map)} elements')
-			return highlighted_b64
-		finally:
-			# Explicit cleanup to prevent memory leaks
-			output_buffer.close()
-			if 'image' in locals():
-				image.close()
+		highlighted_b64 = await run_image_task(render_highlights, screenshot_b64, specs, device_pixel_ratio)
+		logger.debug(f'Successfully created highlighted screenshot with {len(selector_map)} elements')
+		return highlighted_b64
 
 	except Exception as e:
 		logger.error(f'Failed to create highlighted screenshot: {e}')
-		# Clean up on error as well
-		if 'image' in locals():
-			image.close()
 		# Return original screenshot on error
 		return screenshot_b64
 
@@ -545,4 +668,4 @@ async def create_highlighted_screenshot_async(
 
 
 # Export the cleanup function for external use in long-running applications
-__all__ = ['create_highlighted_screenshot', 'create_highlighted_screenshot_async', 'cleanup_font_cache']
+__all__ = ['create_highlighted_screenshot', 'create_highlighted_screenshot_async', 'render_highlights', 'cleanup_font_cache']
@@ -3,17 +3,17 @@
 import base64
 import logging
 import math
+import queue
 import subprocess
+import tempfile
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import IO
 
 from aeternus.browser.profile import ViewportSize
 
 try:
-	import imageio.v2 as iio  # type: ignore[import-not-found]
 	import imageio_ffmpeg  # type: ignore[import-not-found]
-	import numpy as np  # type: ignore[import-not-found]
-	from imageio.core.format import Format  # type: ignore[import-not-found]
 
 	IMAGEIO_AVAILABLE = True
 except ImportError:
@@ -21,6 +21,12 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Frames waiting for the encoder. At typical screencast rates this is a few seconds of video;
+# beyond it frames are dropped rather than blocking the CDP event handler.
+MAX_PENDING_FRAMES = 64
+
+_STOP = object()  # sentinel telling the writer thread to finish
+
 
 def _get_padded_size(size: ViewportSize, macro_block_size: int = 16) -> ViewportSize:
 	"""Calculates the dimensions padded to the nearest multiple of macro_block_size."""
@@ -31,14 +37,15 @@ def _get_padded_size(size: ViewportSize, macro_block_size: int = 16) -> Viewport
 
 class VideoRecorderService:
 	"""
-	Handles the video encoding process for a browser session using imageio.
+	Handles the video encoding process for a browser session using a single ffmpeg process.
 
-	This service captures individual frames from the CDP screencast, decodes them,
-	and appends them to a video file using a pip-installable ffmpeg backend.
-	It automatically resizes frames to match the target video dimensions.
+	Screencast frames (JPEG or PNG) are piped into one long-lived ffmpeg encoder whose filter graph
+	scales and pads them to the target video dimensions. Base64 decoding and pipe writes happen on a
+	background writer thread fed by a bounded queue, so add_frame() never blocks the event loop;
+	when the encoder falls behind, new frames are dropped instead.
 	"""
 
-	def __init__(self, output_path: Path, size: ViewportSize, framerate: int):
+	def __init__(self, output_path: Path, size: ViewportSize, framerate: int, max_pending_frames: int = MAX_PENDING_FRAMES):
 		"""
 		Initializes the video recorder.
 
@@ -46,17 +53,54 @@ class VideoRecorderService:
 		    output_path: The full path where the video will be saved.
 		    size: A ViewportSize object specifying the width and height of the video.
 		    framerate: The desired framerate for the output video.
+		    max_pending_frames: How many frames may queue up for the encoder before new ones are dropped.
 		"""
 		self.output_path = output_path
 		self.size = size
 		self.framerate = framerate
-		self._writer: Optional['Format.Writer'] = None
-		self._is_active = False
 		self.padded_size = _get_padded_size(self.size)
+		self.frames_written = 0
+		self.frames_dropped = 0
+		self._is_active = False
+		self._process: subprocess.Popen | None = None
+		self._stderr: IO[bytes] | None = None
+		self._frames: queue.Queue = queue.Queue(maxsize=max_pending_frames)
+		self._writer_thread: threading.Thread | None = None
+
+	def _build_command(self) -> list[str]:
+		# Build a filter chain for ffmpeg, applied once for the whole stream:
+		# 1. scale: Resizes the frame to the user-specified dimensions.
+		# 2. pad: Adds black bars to meet codec's macro-block requirements,
+		#    centering the original content.
+		vf_chain = (
+			f'scale={self.size["width"]}:{self.size["height"]},'
+			f'pad={self.padded_size["width"]}:{self.padded_size["height"]}:(ow-iw)/2:(oh-ih)/2:color=black'
+		)
+		return [
+			imageio_ffmpeg.get_ffmpeg_exe(),
+			'-y',
+			'-loglevel',
+			'error',
+			'-f',
+			'image2pipe',  # Input is a stream of concatenated images, the image codec is probed (jpeg or png)
+			'-framerate',
+			str(self.framerate),
+			'-i',
+			'-',  # Input from stdin
+			'-vf',
+			vf_chain,  # Video filter for resizing and padding
+			'-c:v',
+			'libx264',
+			'-preset',
+			'veryfast',
+			'-pix_fmt',
+			'yuv420p',  # Ensures compatibility with most players
+			str(self.output_path),
+		]
 
 	def start(self) -> None:
 		"""
-		Prepares and starts the video writer.
+		Starts the ffmpeg encoder process and the writer thread feeding it.
 
 		If the required optional dependencies are not installed, this method will
 		log an error and do nothing.
@@ -69,94 +113,105 @@ class VideoRecorderService:
 
 		try:
 			self.output_path.parent.mkdir(parents=True, exist_ok=True)
-			# The macro_block_size is set to None because we handle padding ourselves
-			self._writer = iio.get_writer(
-				str(self.output_path),
-				fps=self.framerate,
-				codec='libx264',
-				quality=8,  # A good balance of quality and file size (1-10 scale)
-				pixelformat='yuv420p',  # Ensures compatibility with most players
-				macro_block_size=None,
+			# stderr goes to a temp file rather than a pipe nobody drains, read back on stop for error reporting
+			self._stderr = tempfile.TemporaryFile()
+			self._process = subprocess.Popen(
+				self._build_command(), stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr
 			)
+			self._writer_thread = threading.Thread(target=self._write_frames, name='video_recorder_writer', daemon=True)
+			self._writer_thread.start()
 			self._is_active = True
 			logger.debug(f'Video recorder started. Output will be saved to {self.output_path}')
 		except Exception as e:
 			logger.error(f'Failed to initialize video writer: {e}')
 			self._is_active = False
+			# Do not leave a half-started encoder or its stderr file behind
+			if self._process is not None:
+				self._process.kill()
+				self._process.wait()
+				if self._process.stdin:
+					self._process.stdin.close()
+				self._process = None
+			if self._stderr is not None:
+				self._stderr.close()
+				self._stderr = None
 
 	def add_frame(self, frame_data_b64: str) -> None:
 		"""
-		Decodes a base64-encoded PNG frame, resizes it, pads it to be codec-compatible,
-		and appends it to the video.
+		Queues a base64-encoded screencast frame (JPEG or PNG) for encoding without blocking.
+
+		The frame is dropped if the encoder is too far behind.
 
 		Args:
-		    frame_data_b64: A base64-encoded string of the PNG frame data.
+		    frame_data_b64: A base64-encoded string of the frame data.
 		"""
-		if not self._is_active or not self._writer:
+		if not self._is_active:
 			return
 
 		try:
-			frame_bytes = base64.b64decode(frame_data_b64)
-
-			# Build a filter chain for ffmpeg:
-			# 1. scale: Resizes the frame to the user-specified dimensions.
-			# 2. pad: Adds black bars to meet codec's macro-block requirements,
-			#    centering the original content.
-			vf_chain = (
-				f'scale={self.size["width"]}:{self.size["height"]},'
-				f'pad={self.padded_size["width"]}:{self.padded_size["height"]}:(ow-iw)/2:(oh-ih)/2:color=black'
-			)
-
-			output_pix_fmt = 'rgb24'
-			command = [
-				imageio_ffmpeg.get_ffmpeg_exe(),
-				'-f',
-				'image2pipe',  # Input format from a pipe
-				'-c:v',
-				'png',  # Specify input codec is PNG
-				'-i',
-				'-',  # Input from stdin
-				'-vf',
-				vf_chain,  # Video filter for resizing and padding
-				'-f',
-				'rawvideo',  # Output format is raw video
-				'-pix_fmt',
-				output_pix_fmt,  # Output pixel format
-				'-',  # Output to stdout
-			]
-
-			# Execute ffmpeg as a subprocess
-			proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-			out, err = proc.communicate(input=frame_bytes)
-
-			if proc.returncode != 0:
-				err_msg = err.decode(errors='ignore').strip()
-				if 'deprecated pixel format used' not in err_msg.lower():
-					raise OSError(f'ffmpeg error during resizing/padding: {err_msg}')
-				else:
-					logger.debug(f'ffmpeg warning during resizing/padding: {err_msg}')
-
-			# Convert the raw output bytes to a numpy array with the padded dimensions
-			img_array = np.frombuffer(out, dtype=np.uint8).reshape((self.padded_size['height'], self.padded_size['width'], 3))
-
-			self._writer.append_data(img_array)
-		except Exception as e:
-			logger.warning(f'Could not process and add video frame: {e}')
+			self._frames.put_nowait(frame_data_b64)
+		except queue.Full:
+			self.frames_dropped += 1
+			if self.frames_dropped == 1 or self.frames_dropped % 100 == 0:
+				logger.debug(f'Video encoder is behind, dropped {self.frames_dropped} frame(s) so far')
+
+	def _write_frames(self) -> None:
+		"""Writer thread: decode queued frames and stream them into ffmpeg's stdin."""
+		assert self._process is not None and self._process.stdin is not None
+		stdin = self._process.stdin
+		while True:
+			frame_data_b64 = self._frames.get()
+			if frame_data_b64 is _STOP:
+				break
+			try:
+				stdin.write(base64.b64decode(frame_data_b64))
+				self.frames_written += 1
+			except (BrokenPipeError, ValueError) as e:
+				# ffmpeg exited early, stop accepting frames, stop_and_save() reports its error output
+				logger.warning(f'Could not process and add video frame: {e}')
+				self._is_active = False
+				break
+			except Exception as e:
+				logger.warning(f'Could not process and add video frame: {e}')
 
 	def stop_and_save(self) -> None:
 		"""
-		Finalizes the video file by closing the writer.
+		Finalizes the video file by flushing queued frames and waiting for ffmpeg to finish.
 
-		This method should be called when the recording session is complete.
+		This method blocks, call it from a worker thread when on the event loop.
 		"""
-		if not self._is_active or not self._writer:
+		if not self._process:
 			return
 
+		process = self._process
 		try:
-			self._writer.close()
-			logger.info(f'📹 Video recording saved successfully to: {self.output_path}')
+			self._is_active = False
+			if self._writer_thread and self._writer_thread.is_alive():
+				self._frames.put(_STOP)
+				self._writer_thread.join()
+			if process.stdin:
+				try:
+					process.stdin.close()
+				except BrokenPipeError:
+					pass
+			returncode = process.wait(timeout=60)
+
+			if returncode != 0:
+				err_msg = ''
+				if self._stderr:
+					self._stderr.seek(0)
+					err_msg = self._stderr.read().decode(errors='ignore').strip()
+				raise OSError(f'ffmpeg exited with code {returncode}: {err_msg}')
+
+			dropped = f' ({self.frames_dropped} frames dropped)' if self.frames_dropped else ''
+			logger.info(f'📹 Video recording saved successfully to: {self.output_path}{dropped}')
 		except Exception as e:
 			logger.error(f'Failed to finalize and save video: {e}')
+			if process.poll() is None:
+				process.kill()
 		finally:
-			self._is_active = False
-			self._writer = None
+			if self._stderr:
+				self._stderr.close()
+			self._process = None
+			self._stderr = None
+			self._writer_thread = None
@@ -1,11 +1,13 @@
 """Browser watchdog for monitoring crashes and network timeouts using CDP."""
 
 import asyncio
+import heapq
 import time
 from typing import TYPE_CHECKING, ClassVar
 
 import psutil
 from bubus import BaseEvent
+from cdp_use.cdp.network import LoadingFailedEvent, LoadingFinishedEvent, RequestWillBeSentEvent
 from cdp_use.cdp.target import SessionID, TargetID
 from cdp_use.cdp.target.events import TargetCrashedEvent
 from pydantic import Field, PrivateAttr
@@ -36,7 +38,16 @@ class NetworkRequestTracker:
 
 
 class CrashWatchdog(BaseWatchdog):
-	"""Monitors browser health for crashes and network timeouts using CDP."""
+	"""Monitors browser health for crashes and network timeouts using CDP.
+
+	Liveness is inferred from CDP traffic: every network event updates a per-session last-message timestamp,
+	and a session is only actively probed with Runtime.evaluate once it has been quiet for
+	``health_probe_quiet_seconds``. Request timeouts are kept in a min-heap of deadlines so each wakeup only
+	touches requests that actually expired.
+
+	cdp_use keeps a single handler per CDP method, so this watchdog owns Network.requestWillBeSent,
+	Network.loadingFinished and Network.loadingFailed on the root client; other components must not register them.
+	"""
 
 	# Event contracts
 	LISTENS_TO: ClassVar[list[type[BaseEvent]]] = [
@@ -49,14 +60,18 @@ class CrashWatchdog(BaseWatchdog):
 
 	# Configuration
 	network_timeout_seconds: float = Field(default=10.0)
-	check_interval_seconds: float = Field(default=5.0)  # Reduced frequency to reduce noise
+	check_interval_seconds: float = Field(default=5.0)  # Minimum spacing between wakeups of the monitoring loop
+	health_probe_quiet_seconds: float = Field(default=30.0)  # Only ping a session after this long without CDP traffic
 
 	# Private state
 	_active_requests: dict[str, NetworkRequestTracker] = PrivateAttr(default_factory=dict)
+	_request_deadlines: list[tuple[float, str]] = PrivateAttr(default_factory=list)  # heap of (deadline, request_id)
 	_monitoring_task: asyncio.Task | None = PrivateAttr(default=None)
-	_last_responsive_checks: dict[str, float] = PrivateAttr(default_factory=dict)  # target_url -> timestamp
+	_monitoring_wakeup: asyncio.Event = PrivateAttr(default_factory=asyncio.Event)
+	_last_cdp_activity: dict[str, float] = PrivateAttr(default_factory=dict)  # session_id -> monotonic timestamp of last message
 	_cdp_event_tasks: set[asyncio.Task] = PrivateAttr(default_factory=set)  # Track CDP event handler tasks
 	_targets_with_listeners: set[str] = PrivateAttr(default_factory=set)  # Track targets that already have event listeners
+	_network_callbacks_registered: bool = PrivateAttr(default=False)  # Track if global network callbacks are registered
 
 	async def on_BrowserConnectedEvent(self, event: BrowserConnectedEvent) -> None:
 		"""Start monitoring when browser is connected."""
@@ -77,6 +92,15 @@ class CrashWatchdog(BaseWatchdog):
 		assert self.browser_session.agent_focus_target_id is not None, 'No current target ID'
 		await self.attach_to_target(self.browser_session.agent_focus_target_id)
 
+		# Redirect new tab pages once when they open instead of rescanning every tab on each health check
+		if self._is_new_tab_page(event.url) and event.url != 'about:blank':
+			try:
+				self.logger.debug(f'[CrashWatchdog] Redirecting chrome://new-tab-page/ to about:blank {event.url}')
+				cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=event.target_id, focus=False)
+				await cdp_session.cdp_client.send.Page.navigate(params={'url': 'about:blank'}, session_id=cdp_session.session_id)
+			except Exception as e:
+				self.logger.debug(f'[CrashWatchdog] Failed to redirect new tab page {event.target_id[:8]}...: {e}')
+
 	async def on_TabClosedEvent(self, event: TabClosedEvent) -> None:
 		"""Clean up tracking when tab closes."""
 		# Remove target from listener tracking to prevent memory leak
@@ -110,6 +134,28 @@ class CrashWatchdog(BaseWatchdog):
 
 			cdp_session.cdp_client.register.Target.targetCrashed(on_target_crashed)
 
+			# Network events double as liveness signals, register them once on the shared client.
+			# Registering replaces any previous handler, these three methods are owned by this watchdog (see class docstring)
+			if not self._network_callbacks_registered:
+				cdp_client = cdp_session.cdp_client
+
+				def on_request_will_be_sent(event: RequestWillBeSentEvent, session_id: SessionID | None = None):
+					self._on_request_cdp(event, session_id)  # type: ignore[arg-type]
+
+				def on_loading_finished(event: LoadingFinishedEvent, session_id: SessionID | None = None):
+					self._on_request_finished_cdp(event, session_id)  # type: ignore[arg-type]
+
+				def on_loading_failed(event: LoadingFailedEvent, session_id: SessionID | None = None):
+					self._on_request_failed_cdp(event, session_id)  # type: ignore[arg-type]
+
+				cdp_client.register.Network.requestWillBeSent(on_request_will_be_sent)
+				cdp_client.register.Network.loadingFinished(on_loading_finished)
+				cdp_client.register.Network.loadingFailed(on_loading_failed)
+				self._network_callbacks_registered = True
+
+			await cdp_session.cdp_client.send.Network.enable(session_id=cdp_session.session_id)
+			self._record_cdp_activity(cdp_session.session_id)
+
 			# Track that we've added listeners to this target
 			self._targets_with_listeners.add(target_id)
 
@@ -120,43 +166,41 @@ class CrashWatchdog(BaseWatchdog):
 		except Exception as e:
 			self.logger.warning(f'[CrashWatchdog] Failed to attach to target {target_id}: {e}')
 
-	async def _on_request_cdp(self, event: dict) -> None:
+	def _record_cdp_activity(self, session_id: str | None) -> None:
+		"""Note that a session just produced CDP traffic, proving it is alive."""
+		if session_id:
+			self._last_cdp_activity[session_id] = time.monotonic()
+
+	def _on_request_cdp(self, event: dict, session_id: str | None = None) -> None:
 		"""Track new network request from CDP event."""
+		self._record_cdp_activity(session_id)
 		request_id = event.get('requestId', '')
 		request = event.get('request', {})
 
+		start_time = time.monotonic()
 		self._active_requests[request_id] = NetworkRequestTracker(
 			request_id=request_id,
-			start_time=time.time(),
+			start_time=start_time,
 			url=request.get('url', ''),
 			method=request.get('method', ''),
 			resource_type=event.get('type'),
 		)
-		# logger.debug(f'[CrashWatchdog] Tracking request: {request.get("method", "")} {request.get("url", "")[:50]}...')
+		was_idle = not self._request_deadlines
+		heapq.heappush(self._request_deadlines, (start_time + self.network_timeout_seconds, request_id))
+		if was_idle:
+			# The loop may be sleeping until the next quiet-period probe, wake it to schedule this deadline
+			self._monitoring_wakeup.set()
 
-	def _on_response_cdp(self, event: dict) -> None:
-		"""Remove request from tracking on response."""
-		request_id = event.get('requestId', '')
-		if request_id in self._active_requests:
-			elapsed = time.time() - self._active_requests[request_id].start_time
-			response = event.get('response', {})
-			self.logger.debug(f'[CrashWatchdog] Request completed in {elapsed:.2f}s: {response.get("url", "")[:50]}...')
-			# Don't remove yet - wait for loadingFinished
-
-	def _on_request_failed_cdp(self, event: dict) -> None:
+	def _on_request_failed_cdp(self, event: dict, session_id: str | None = None) -> None:
 		"""Remove request from tracking on failure."""
-		request_id = event.get('requestId', '')
-		if request_id in self._active_requests:
-			elapsed = time.time() - self._active_requests[request_id].start_time
-			self.logger.debug(
-				f'[CrashWatchdog] Request failed after {elapsed:.2f}s: {self._active_requests[request_id].url[:50]}...'
-			)
-			del self._active_requests[request_id]
+		self._record_cdp_activity(session_id)
+		self._active_requests.pop(event.get('requestId', ''), None)
 
-	def _on_request_finished_cdp(self, event: dict) -> None:
+	def _on_request_finished_cdp(self, event: dict, session_id: str | None = None) -> None:
 		"""Remove request from tracking when loading is finished."""
-		request_id = event.get('requestId', '')
-		self._active_requests.pop(request_id, None)
+		# The heap entry is left in place and skipped lazily when its deadline comes up
+		self._record_cdp_activity(session_id)
+		self._active_requests.pop(event.get('requestId', ''), None)
 
 	async def _on_target_crash_cdp(self, target_id: TargetID) -> None:
 		"""Handle target crash detected via CDP."""
@@ -220,40 +264,65 @@ class CrashWatchdog(BaseWatchdog):
 
 		# Clear all tracking
 		self._active_requests.clear()
+		self._request_deadlines.clear()
 		self._targets_with_listeners.clear()
-		self._last_responsive_checks.clear()
+		self._last_cdp_activity.clear()
+		self._network_callbacks_registered = False
 
 	async def _monitoring_loop(self) -> None:
-		"""Main monitoring loop."""
+		"""Main monitoring loop, sleeps until the next request deadline or quiet-period probe is due."""
 		await asyncio.sleep(10)  # give browser time to start up and load the first page after first LLM call
 		while True:
 			try:
 				await self._check_network_timeouts()
-				await self._check_browser_health()
-				await asyncio.sleep(self.check_interval_seconds)
+				if self._is_focus_session_quiet():
+					await self._check_browser_health()
+
+				self._monitoring_wakeup.clear()
+				try:
+					await asyncio.wait_for(self._monitoring_wakeup.wait(), timeout=self._seconds_until_next_check())
+				except TimeoutError:
+					pass
 			except asyncio.CancelledError:
 				break
 			except Exception as e:
 				self.logger.error(f'[CrashWatchdog] Error in monitoring loop: {e}')
 
+	def _get_focus_last_activity(self) -> float | None:
+		"""Most recent CDP traffic timestamp across all sessions attached to the agent focus target."""
+		target_id = self.browser_session.agent_focus_target_id
+		if not target_id or not self.browser_session.session_manager:
+			return None
+		sessions = self.browser_session.session_manager.get_all_sessions_for_target(target_id)
+		timestamps = [self._last_cdp_activity[s.session_id] for s in sessions if s.session_id in self._last_cdp_activity]
+		return max(timestamps) if timestamps else None
+
+	def _is_focus_session_quiet(self) -> bool:
+		"""True if the agent focus target has not produced any CDP traffic for the quiet period."""
+		last_activity = self._get_focus_last_activity()
+		return last_activity is None or time.monotonic() - last_activity >= self.health_probe_quiet_seconds
+
+	def _seconds_until_next_check(self) -> float:
+		"""Time until the earliest request deadline or quiet-period probe, never less than check_interval_seconds."""
+		now = time.monotonic()
+		last_activity = self._get_focus_last_activity()
+		next_due = (last_activity if last_activity is not None else now) + self.health_probe_quiet_seconds
+		if self._request_deadlines:
+			next_due = min(next_due, self._request_deadlines[0][0])
+		return max(next_due - now, self.check_interval_seconds)
+
 	async def _check_network_timeouts(self) -> None:
-		"""Check for network requests exceeding timeout."""
-		current_time = time.time()
+		"""Emit timeouts for requests whose deadline has passed, popping only expired entries from the heap."""
+		current_time = time.monotonic()
 		timed_out_requests = []
 
-		# Debug logging
-		if self._active_requests:
-			self.logger.debug(
-				f'[CrashWatchdog] Checking {len(self._active_requests)} active requests for timeouts (threshold: {self.network_timeout_seconds}s)'
-			)
-
-		for request_id, tracker in self._active_requests.items():
-			elapsed = current_time - tracker.start_time
-			self.logger.debug(
-				f'[CrashWatchdog] Request {tracker.url[:30]}... elapsed: {elapsed:.1f}s, timeout: {self.network_timeout_seconds}s'
-			)
-			if elapsed >= self.network_timeout_seconds:
-				timed_out_requests.append((request_id, tracker))
+		while self._request_deadlines and self._request_deadlines[0][0] <= current_time:
+			deadline, request_id = heapq.heappop(self._request_deadlines)
+			tracker = self._active_requests.get(request_id)
+			# Skip entries for requests that already finished or were re-issued with a later deadline
+			if tracker is None or tracker.start_time + self.network_timeout_seconds != deadline:
+				continue
+			timed_out_requests.append((request_id, tracker))
 
 		# Emit events for timed out requests
 		for request_id, tracker in timed_out_requests:
@@ -279,29 +348,17 @@ class CrashWatchdog(BaseWatchdog):
 			del self._active_requests[request_id]
 
 	async def _check_browser_health(self) -> None:
-		"""Check if browser and targets are still responsive."""
+		"""Actively probe the agent focus session, only called once it has been quiet for the probe period."""
 
 		try:
-			self.logger.debug(f'[CrashWatchdog] Checking browser health for target {self.browser_session.agent_focus_target_id}')
-			cdp_session = await self.browser_session.get_or_create_cdp_session()
-
-			for target in self.browser_session.session_manager.get_all_page_targets():
-				if self._is_new_tab_page(target.url) and target.url != 'about:blank':
-					self.logger.debug(f'[CrashWatchdog] Redirecting chrome://new-tab-page/ to about:blank {target.url}')
-					cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target.target_id)
-					await cdp_session.cdp_client.send.Page.navigate(
-						params={'url': 'about:blank'}, session_id=cdp_session.session_id
-					)
+			cdp_session = await self.browser_session.get_or_create_cdp_session(focus=False)
 
 			# Quick ping to check if session is alive
-			self.logger.debug(f'[CrashWatchdog] Attempting to run simple JS test expression in session {cdp_session} 1+1')
 			await asyncio.wait_for(
 				cdp_session.cdp_client.send.Runtime.evaluate(params={'expression': '1+1'}, session_id=cdp_session.session_id),
 				timeout=1.0,
 			)
-			self.logger.debug(
-				f'[CrashWatchdog] Browser health check passed for target {self.browser_session.agent_focus_target_id}'
-			)
+			self._record_cdp_activity(cdp_session.session_id)
 		except Exception as e:
 			self.logger.error(
 				f'[CrashWatchdog] ❌ Crashed/unresponsive session detected for target {self.browser_session.agent_focus_target_id} '
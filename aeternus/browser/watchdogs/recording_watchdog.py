@@ -60,7 +60,8 @@ class RecordingWatchdog(BaseWatchdog):
 			cdp_session = await self.browser_session.get_or_create_cdp_session()
 			await cdp_session.cdp_client.send.Page.startScreencast(
 				params={
-					'format': 'png',
+					# JPEG frames are much cheaper for Chrome to produce and for ffmpeg to decode than PNG
+					'format': 'jpeg',
 					'quality': 90,
 					'maxWidth': size['width'],
 					'maxHeight': size['height'],
@@ -72,8 +73,9 @@ class RecordingWatchdog(BaseWatchdog):
 		except Exception as e:
 			self.logger.error(f'Failed to start screencast via CDP: {e}')
 			if self._recorder:
-				self._recorder.stop_and_save()
+				recorder = self._recorder
 				self._recorder = None
+				await asyncio.to_thread(recorder.stop_and_save)
 
 	async def _get_current_viewport_size(self) -> ViewportSize | None:
 		"""Gets the current viewport size directly from the browser via CDP."""
@@ -97,6 +99,9 @@ class RecordingWatchdog(BaseWatchdog):
 	def on_screencastFrame(self, event: ScreencastFrameEvent, session_id: str | None) -> None:
 		"""
 		Synchronous handler for incoming screencast frames.
+
+		Only queues the frame for the recorder's encoder thread (dropping it if the encoder is behind),
+		so frames are acknowledged immediately and CDP event delivery is never blocked by encoding.
 		"""
 
 		if not self._recorder:
@@ -129,5 +134,4 @@ class RecordingWatchdog(BaseWatchdog):
 			self._recorder = None
 
 			self.logger.debug('Stopping video recording and saving file...')
-			loop = asyncio.get_event_loop()
-			await loop.run_in_executor(None, recorder.stop_and_save)
+			await asyncio.to_thread(recorder.stop_and_save)
@@ -3,6 +3,7 @@
 from typing import TYPE_CHECKING, ClassVar
 
 from bubus import BaseEvent
+from pydantic import PrivateAttr
 
 from aeternus.browser.events import (
 	BrowserErrorEvent,
@@ -11,6 +12,7 @@ from aeternus.browser.events import (
 	TabCreatedEvent,
 )
 from aeternus.browser.watchdog_base import BaseWatchdog
+from aeternus.utils import DomainMatcher
 
 if TYPE_CHECKING:
 	pass
@@ -32,6 +34,10 @@ class SecurityWatchdog(BaseWatchdog):
 		BrowserErrorEvent,
 	]
 
+	# Compiled matchers for allowed_domains / prohibited_domains, keyed by field name.
+	# Each entry remembers the list/set it was built from so profile changes trigger a rebuild.
+	_domain_matchers: dict[str, tuple[list[str] | set[str], int, DomainMatcher]] = PrivateAttr(default_factory=dict)
+
 	async def on_NavigateToUrlEvent(self, event: NavigateToUrlEvent) -> None:
 		"""Check if navigation URL is allowed before navigation starts."""
 		# Security check BEFORE navigation
@@ -200,80 +206,69 @@ class SecurityWatchdog(BaseWatchdog):
 		):
 			return True
 
-		# Check allowed domains (fast path for sets, slow path for lists with patterns)
+		# Check allowed domains (allowed domains take precedence over prohibited domains)
 		if self.browser_session.browser_profile.allowed_domains:
-			allowed_domains = self.browser_session.browser_profile.allowed_domains
+			matcher = self._get_domain_matcher('allowed_domains')
+			return matcher.matches_parts(url, parsed.scheme, host)
 
-			if isinstance(allowed_domains, set):
-				# Fast path: O(1) exact hostname match - check both www and non-www variants
-				host_variant, host_alt = self._get_domain_variants(host)
-				return host_variant in allowed_domains or host_alt in allowed_domains
-			else:
-				# Slow path: O(n) pattern matching for lists
-				for pattern in allowed_domains:
-					if self._is_url_match(url, host, parsed.scheme, pattern):
-						return True
-				return False
-
-		# Check prohibited domains (fast path for sets, slow path for lists with patterns)
+		# Check prohibited domains
 		if self.browser_session.browser_profile.prohibited_domains:
-			prohibited_domains = self.browser_session.browser_profile.prohibited_domains
-
-			if isinstance(prohibited_domains, set):
-				# Fast path: O(1) exact hostname match - check both www and non-www variants
-				host_variant, host_alt = self._get_domain_variants(host)
-				return host_variant not in prohibited_domains and host_alt not in prohibited_domains
-			else:
-				# Slow path: O(n) pattern matching for lists
-				for pattern in prohibited_domains:
-					if self._is_url_match(url, host, parsed.scheme, pattern):
-						return False
-				return True
+			matcher = self._get_domain_matcher('prohibited_domains')
+			return not matcher.matches_parts(url, parsed.scheme, host)
 
 		return True
 
-	def _is_url_match(self, url: str, host: str, scheme: str, pattern: str) -> bool:
-		"""Check if a URL matches a pattern."""
-
-		# Full URL for matching (scheme + host)
-		full_url_pattern = f'{scheme}://{host}'
-
-		# Handle glob patterns
-		if '*' in pattern:
-			self._log_glob_warning()
-			import fnmatch
-
-			# Check if pattern matches the host
-			if pattern.startswith('*.'):
-				# Pattern like *.example.com should match subdomains and main domain
-				domain_part = pattern[2:]  # Remove *.
-				if host == domain_part or host.endswith('.' + domain_part):
-					# Only match http/https URLs for domain-only patterns
-					if scheme in ['http', 'https']:
-						return True
-			elif pattern.endswith('/*'):
-				# Pattern like brave://* or http*://example.com/*
-				if fnmatch.fnmatch(url, pattern):
-					return True
-			else:
-				# Use fnmatch for other glob patterns
-				if fnmatch.fnmatch(
-					full_url_pattern if '://' in pattern else host,
-					pattern,
-				):
-					return True
-		else:
-			# Exact match
-			if '://' in pattern:
+	def _get_domain_matcher(self, field_name: str) -> DomainMatcher:
+		"""Get the compiled matcher for a profile domain list, compiling it only when the list changes."""
+		domains = getattr(self.browser_session.browser_profile, field_name)
+		cached = self._domain_matchers.get(field_name)
+		if cached is not None and cached[0] is domains and cached[1] == len(domains):
+			return cached[2]
+
+		matcher = self._compile_domain_patterns(domains)
+		self._domain_matchers[field_name] = (domains, len(domains), matcher)
+		return matcher
+
+	def _compile_domain_patterns(self, domains: list[str] | set[str]) -> DomainMatcher:
+		"""Compile navigation patterns into a DomainMatcher.
+
+		Sets hold exact hostnames (www and non-www variants match each other).
+		Lists support the pattern forms below, each stored in the cheapest lookup structure:
+		- ``*.example.com``: example.com and its subdomains, http/https only (suffix trie)
+		- ``brave://*`` or ``http*://example.com/*``: glob against the full URL (combined regex)
+		- other globs: against ``scheme://host`` if the pattern has a scheme, else the host (combined regex)
+		- ``https://example.com``: URL prefix (combined regex)
+		- ``example.com``: exact host, case-insensitive, plus www. for root domains (hash set)
+		"""
+		matcher = DomainMatcher()
+
+		if isinstance(domains, set):
+			for domain in domains:
+				for variant in self._get_domain_variants(domain):
+					matcher.add_exact_host(variant, domain)
+			return matcher.compile()
+
+		for pattern in domains:
+			if '*' in pattern:
+				self._log_glob_warning()
+				if pattern.startswith('*.'):
+					# Pattern like *.example.com should match subdomains and main domain, only for http/https URLs
+					matcher.add_host_suffix(pattern[2:], pattern, scheme_glob='http')
+					matcher.add_host_suffix(pattern[2:], pattern, scheme_glob='https')
+				elif pattern.endswith('/*'):
+					# Pattern like brave://* or http*://example.com/*
+					matcher.add_url_glob(pattern, pattern)
+				elif '://' in pattern:
+					matcher.add_origin_glob(pattern, pattern)
+				else:
+					matcher.add_host_glob(pattern, pattern)
+			elif '://' in pattern:
 				# Full URL pattern
-				if url.startswith(pattern):
-					return True
+				matcher.add_url_prefix(pattern, pattern)
 			else:
-				# Domain-only pattern (case-insensitive comparison)
-				if host.lower() == pattern.lower():
-					return True
-				# If pattern is a root domain, also check www subdomain
-				if self._is_root_domain(pattern) and host.lower() == f'www.{pattern.lower()}':
-					return True
-
-		return False
+				# Domain-only pattern, if pattern is a root domain also allow the www subdomain
+				matcher.add_exact_host(pattern.lower(), pattern)
+				if self._is_root_domain(pattern):
+					matcher.add_exact_host(f'www.{pattern.lower()}', pattern)
+
+		return matcher.compile()
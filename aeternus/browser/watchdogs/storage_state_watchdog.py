@@ -3,11 +3,12 @@
 import asyncio
 import json
 import os
+import time
 from pathlib import Path
 from typing import Any, ClassVar
 
 from bubus import BaseEvent
-from cdp_use.cdp.network import Cookie
+from cdp_use.cdp.network import Cookie, ResponseReceivedExtraInfoEvent
 from pydantic import Field, PrivateAttr
 
 from aeternus.browser.events import (
@@ -17,13 +18,29 @@ from aeternus.browser.events import (
 	SaveStorageStateEvent,
 	StorageStateLoadedEvent,
 	StorageStateSavedEvent,
+	TabCreatedEvent,
 )
 from aeternus.browser.watchdog_base import BaseWatchdog
 from aeternus.utils import create_task_with_error_handling
 
 
+CookieKey = tuple[str, str, str]
+
+
+def _cookie_key(cookie: dict[str, Any]) -> CookieKey:
+	return (cookie.get('name', ''), cookie.get('domain', ''), cookie.get('path', ''))
+
+
 class StorageStateWatchdog(BaseWatchdog):
-	"""Monitors and persists browser storage state including cookies and localStorage."""
+	"""Monitors and persists browser storage state including cookies and localStorage.
+
+	Cookie changes are detected from Set-Cookie headers seen in Network.responseReceivedExtraInfo, with a
+	fallback diff of the cookie jar every ``auto_save_interval`` seconds for changes no response reports
+	(``document.cookie`` writes, expiry, deletion). Changed cookies are appended to a journal file next to
+	storage_state.json (``storage_state.json.journal``), which is compacted into the main file every
+	``auto_save_interval`` seconds while it has pending changes, once it grows past
+	``journal_compact_threshold`` entries, and on stop.
+	"""
 
 	# Event contracts
 	LISTENS_TO: ClassVar[list[type[BaseEvent]]] = [
@@ -31,6 +48,7 @@ class StorageStateWatchdog(BaseWatchdog):
 		BrowserStopEvent,
 		SaveStorageStateEvent,
 		LoadStorageStateEvent,
+		TabCreatedEvent,
 	]
 	EMITS: ClassVar[list[type[BaseEvent]]] = [
 		StorageStateSavedEvent,
@@ -38,13 +56,21 @@ class StorageStateWatchdog(BaseWatchdog):
 	]
 
 	# Configuration
-	auto_save_interval: float = Field(default=30.0)  # Auto-save every 30 seconds
-	save_on_change: bool = Field(default=True)  # Save immediately when cookies change
+	auto_save_interval: float = Field(default=30.0)  # Diff the cookie jar and compact pending changes every 30 seconds
+	save_on_change: bool = Field(default=True)  # Journal cookie changes shortly after they happen
+	change_debounce_seconds: float = Field(default=1.0)  # Coalesce bursts of Set-Cookie responses into one journal write
+	journal_compact_threshold: int = Field(default=1000)  # Compact early once the journal has this many entries
 
 	# Private state
 	_monitoring_task: asyncio.Task | None = PrivateAttr(default=None)
-	_last_cookie_state: list[dict] = PrivateAttr(default_factory=list)
+	_last_cookie_state: dict[CookieKey, dict[str, Any]] = PrivateAttr(default_factory=dict)
 	_save_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+	_cookies_dirty: asyncio.Event = PrivateAttr(default_factory=asyncio.Event)
+	_network_callback_registered: bool = PrivateAttr(default=False)
+	_network_monitored_targets: set[str] = PrivateAttr(default_factory=set)
+	_journal_entries: int = PrivateAttr(default=0)
+	_cookies_removed: bool = PrivateAttr(default=False)
+	_last_compacted_at: float = PrivateAttr(default_factory=time.monotonic)
 
 	async def on_BrowserConnectedEvent(self, event: BrowserConnectedEvent) -> None:
 		"""Start monitoring when browser starts."""
@@ -61,6 +87,10 @@ class StorageStateWatchdog(BaseWatchdog):
 		self.logger.debug('[StorageStateWatchdog] Stopping storage_state monitoring')
 		await self._stop_monitoring()
 
+	async def on_TabCreatedEvent(self, event: TabCreatedEvent) -> None:
+		"""Watch Set-Cookie responses in new tabs."""
+		await self._enable_cookie_change_detection(event.target_id)
+
 	async def on_SaveStorageStateEvent(self, event: SaveStorageStateEvent) -> None:
 		"""Handle storage state save request."""
 		# Use provided path or fall back to profile default
@@ -92,6 +122,9 @@ class StorageStateWatchdog(BaseWatchdog):
 
 		assert self.browser_session.cdp_client is not None
 
+		self._last_compacted_at = time.monotonic()
+		await self._enable_cookie_change_detection(self.browser_session.agent_focus_target_id)
+
 		self._monitoring_task = create_task_with_error_handling(
 			self._monitor_storage_changes(), name='monitor_storage_changes', logger_instance=self.logger, suppress_exceptions=True
 		)
@@ -106,34 +139,63 @@ class StorageStateWatchdog(BaseWatchdog):
 			except asyncio.CancelledError:
 				pass
 			# self.logger.debug('[StorageStateWatchdog] Stopped storage monitoring task')
+		self._network_monitored_targets.clear()
+		self._network_callback_registered = False
 
-	async def _check_for_cookie_changes_cdp(self, event: dict) -> None:
-		"""Check if a CDP network event indicates cookie changes.
+	async def _enable_cookie_change_detection(self, target_id: str | None) -> None:
+		"""Listen for Set-Cookie headers on a target instead of polling the cookie jar."""
+		if not target_id or target_id in self._network_monitored_targets:
+			return
 
-		This would be called by Network.responseReceivedExtraInfo events
-		if we set up CDP event listeners.
-		"""
 		try:
-			# Check for Set-Cookie headers in the response
-			headers = event.get('headers', {})
-			if 'set-cookie' in headers or 'Set-Cookie' in headers:
-				self.logger.debug('[StorageStateWatchdog] Cookie change detected via CDP')
+			cdp_client = self.browser_session.cdp_client
 
-				# If save on change is enabled, trigger save immediately
-				if self.save_on_change:
-					await self._save_storage_state()
+			if not self._network_callback_registered:
+				# Registered once on the root client, events from every attached session arrive here
+				def on_response_extra_info(event: ResponseReceivedExtraInfoEvent, session_id: str | None = None) -> None:
+					self._check_for_cookie_changes_cdp(event)  # type: ignore[arg-type]
+
+				cdp_client.register.Network.responseReceivedExtraInfo(on_response_extra_info)
+				self._network_callback_registered = True
+
+			cdp_session = await self.browser_session.get_or_create_cdp_session(target_id, focus=False)
+			await cdp_client.send.Network.enable(session_id=cdp_session.session_id)
+			self._network_monitored_targets.add(target_id)
 		except Exception as e:
-			self.logger.warning(f'[StorageStateWatchdog] Error checking for cookie changes: {e}')
+			self.logger.debug(f'[StorageStateWatchdog] Failed to enable cookie change detection for {target_id}: {e}')
+
+	def _check_for_cookie_changes_cdp(self, event: dict) -> None:
+		"""Mark cookies dirty when a Network.responseReceivedExtraInfo event carries Set-Cookie headers."""
+		# Header names keep the server's casing in extra info events
+		headers = event.get('headers', {})
+		if 'set-cookie' in headers or 'Set-Cookie' in headers:
+			if not self._cookies_dirty.is_set():
+				self.logger.debug('[StorageStateWatchdog] Cookie change detected via CDP')
+			self._cookies_dirty.set()
 
 	async def _monitor_storage_changes(self) -> None:
-		"""Periodically check for storage changes and auto-save."""
+		"""Journal cookie changes as they are reported by the browser and compact the journal periodically.
+
+		The loop wakes on a Set-Cookie response, or every auto_save_interval seconds to diff the cookie jar
+		for changes no response announces (page scripts, expiry, deletion).
+		"""
 		while True:
 			try:
-				await asyncio.sleep(self.auto_save_interval)
-
-				# Check if cookies have changed
-				if await self._have_cookies_changed():
+				try:
+					await asyncio.wait_for(self._cookies_dirty.wait(), timeout=self.auto_save_interval)
+					# Let bursts of Set-Cookie responses (e.g. a login redirect chain) settle into one write
+					await asyncio.sleep(self.change_debounce_seconds if self.save_on_change else self.auto_save_interval)
+				except asyncio.TimeoutError:
+					pass
+				self._cookies_dirty.clear()
+
+				if await self._journal_cookie_changes():
 					self.logger.debug('[StorageStateWatchdog] Detected changes to sync with storage_state.json')
+
+				pending = self._journal_entries > 0 or self._cookies_removed
+				if self._journal_entries >= self.journal_compact_threshold or (
+					pending and time.monotonic() - self._last_compacted_at >= self.auto_save_interval
+				):
 					await self._save_storage_state()
 
 			except asyncio.CancelledError:
@@ -141,31 +203,120 @@ class StorageStateWatchdog(BaseWatchdog):
 			except Exception as e:
 				self.logger.error(f'[StorageStateWatchdog] Error in monitoring loop: {e}')
 
-	async def _have_cookies_changed(self) -> bool:
-		"""Check if cookies have changed since last save."""
-		if not self.browser_session.cdp_client:
-			return False
+	def _diff_cookies(self, current_cookies: list[dict[str, Any]]) -> list[dict[str, Any]]:
+		"""Return the cookies that were added or changed since the last journal write or save."""
+		return [dict(c) for c in current_cookies if self._last_cookie_state.get(_cookie_key(c)) != c]
 
+	def _get_file_save_path(self, path: str | None = None) -> Path | None:
+		"""Resolve the storage_state.json path, or None if the storage state is not file-backed."""
+		save_path = path or self.browser_session.browser_profile.storage_state
+		if not save_path or isinstance(save_path, dict):
+			return None
+		return Path(save_path).expanduser().resolve()
+
+	@staticmethod
+	def _get_journal_path(json_path: Path) -> Path:
+		return json_path.with_name(json_path.name + '.journal')
+
+	async def _journal_cookie_changes(self) -> int:
+		"""Append cookies changed since the last write to the journal, returns the number of entries written."""
+		json_path = self._get_file_save_path()
+		if json_path is None or not self.browser_session.cdp_client:
+			return 0
+
+		async with self._save_lock:
+			try:
+				current_cookies = await self.browser_session._cdp_get_cookies()
+				changed = self._diff_cookies(current_cookies)  # type: ignore[arg-type]
+
+				# Removals can't be journaled as cookie records, they are picked up by the next compaction
+				current_keys = {_cookie_key(c) for c in current_cookies}  # type: ignore[arg-type]
+				removed = [key for key in self._last_cookie_state if key not in current_keys]
+				for key in removed:
+					del self._last_cookie_state[key]
+				if removed:
+					self._cookies_removed = True
+
+				if not changed:
+					return 0
+
+				await asyncio.to_thread(self._append_journal_sync, self._get_journal_path(json_path), changed)
+
+				for cookie in changed:
+					self._last_cookie_state[_cookie_key(cookie)] = cookie
+				self._journal_entries += len(changed)
+				return len(changed)
+			except Exception as e:
+				self.logger.error(f'[StorageStateWatchdog] Failed to journal cookie changes: {e}')
+				return 0
+
+	@staticmethod
+	def _append_journal_sync(journal_path: Path, cookies: list[dict[str, Any]]) -> None:
+		"""Append cookie records as JSON lines, a single O_APPEND write so a crash never leaves a torn line mid-file."""
+		journal_path.parent.mkdir(parents=True, exist_ok=True)
+		data = ''.join(json.dumps({'cookie': cookie}, separators=(',', ':')) + '\n' for cookie in cookies).encode()
+		fd = os.open(journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
 		try:
-			# Get current cookies using CDP
-			current_cookies = await self.browser_session._cdp_get_cookies()
+			os.write(fd, data)
+		finally:
+			os.close(fd)
+
+	@classmethod
+	def _read_journal_sync(cls, journal_path: Path) -> dict[str, Any]:
+		"""Read journaled cookies as a partial storage state, skipping a torn trailing line."""
+		cookies: dict[CookieKey, dict[str, Any]] = {}
+		if journal_path.exists():
+			for line in journal_path.read_text().splitlines():
+				try:
+					cookie = json.loads(line)['cookie']
+				except (ValueError, KeyError, TypeError):
+					continue
+				cookies[_cookie_key(cookie)] = cookie
+		return {'cookies': list(cookies.values()), 'origins': []}
+
+	@classmethod
+	def _read_storage_state_sync(cls, json_path: Path) -> dict[str, Any]:
+		"""Read storage_state.json with any not-yet-compacted journal entries applied on top."""
+		state: dict[str, Any] = {'cookies': [], 'origins': []}
+		if json_path.exists():
+			state = json.loads(json_path.read_text())
+		journal = cls._read_journal_sync(cls._get_journal_path(json_path))
+		if journal['cookies']:
+			state = cls._merge_storage_states(state, journal)
+		return state
+
+	def _write_storage_state_sync(self, json_path: Path, storage_state: dict[str, Any]) -> dict[str, Any]:
+		"""Merge into the existing file and atomically replace it, then truncate the journal."""
+		json_path.parent.mkdir(parents=True, exist_ok=True)
+
+		merged_state = storage_state
+		if json_path.exists() or self._get_journal_path(json_path).exists():
+			try:
+				merged_state = self._merge_storage_states(self._read_storage_state_sync(json_path), storage_state)
+			except (ValueError, KeyError) as e:
+				self.logger.error(f'[StorageStateWatchdog] Failed to merge with existing state: {e}')
 
-			# Convert to comparable format, using .get() for optional fields
-			current_cookie_set = {
-				(c.get('name', ''), c.get('domain', ''), c.get('path', '')): c.get('value', '') for c in current_cookies
-			}
+		# Write atomically: fsync the temp file before it replaces the original
+		temp_path = json_path.with_suffix('.json.tmp')
+		with open(temp_path, 'w') as f:
+			f.write(json.dumps(merged_state, indent=4))
+			f.flush()
+			os.fsync(f.fileno())
 
-			last_cookie_set = {
-				(c.get('name', ''), c.get('domain', ''), c.get('path', '')): c.get('value', '') for c in self._last_cookie_state
-			}
+		# Backup existing file
+		if json_path.exists():
+			backup_path = json_path.with_suffix('.json.bak')
+			json_path.replace(backup_path)
 
-			return current_cookie_set != last_cookie_set
-		except Exception as e:
-			self.logger.debug(f'[StorageStateWatchdog] Error comparing cookies: {e}')
-			return False
+		# Move temp to final
+		temp_path.replace(json_path)
+
+		# Everything in the journal is now part of the main file
+		self._get_journal_path(json_path).unlink(missing_ok=True)
+		return merged_state
 
 	async def _save_storage_state(self, path: str | None = None) -> None:
-		"""Save browser storage state to file."""
+		"""Save browser storage state to file, compacting the change journal into it."""
 		async with self._save_lock:
 			# Check if CDP client is available
 			assert await self.browser_session.get_or_create_cdp_session(target_id=None)
@@ -185,32 +336,14 @@ class StorageStateWatchdog(BaseWatchdog):
 				storage_state = await self.browser_session._cdp_get_storage_state()
 
 				# Update our last known state
-				self._last_cookie_state = storage_state.get('cookies', []).copy()
+				self._last_cookie_state = {_cookie_key(c): dict(c) for c in storage_state.get('cookies', [])}
 
-				# Convert path to Path object
+				# Merge, write and truncate the journal off the event loop
 				json_path = Path(save_path).expanduser().resolve()
-				json_path.parent.mkdir(parents=True, exist_ok=True)
-
-				# Merge with existing state if file exists
-				merged_state = storage_state
-				if json_path.exists():
-					try:
-						existing_state = json.loads(json_path.read_text())
-						merged_state = self._merge_storage_states(existing_state, dict(storage_state))
-					except Exception as e:
-						self.logger.error(f'[StorageStateWatchdog] Failed to merge with existing state: {e}')
-
-				# Write atomically
-				temp_path = json_path.with_suffix('.json.tmp')
-				temp_path.write_text(json.dumps(merged_state, indent=4))
-
-				# Backup existing file
-				if json_path.exists():
-					backup_path = json_path.with_suffix('.json.bak')
-					json_path.replace(backup_path)
-
-				# Move temp to final
-				temp_path.replace(json_path)
+				merged_state = await asyncio.to_thread(self._write_storage_state_sync, json_path, dict(storage_state))
+				self._journal_entries = 0
+				self._cookies_removed = False
+				self._last_compacted_at = time.monotonic()
 
 				# Emit success event
 				self.event_bus.dispatch(
@@ -237,20 +370,20 @@ class StorageStateWatchdog(BaseWatchdog):
 			return
 
 		load_path = path or self.browser_session.browser_profile.storage_state
-		if not load_path or not os.path.exists(str(load_path)):
+		if not load_path or isinstance(load_path, dict):
+			return
+		json_path = Path(load_path).expanduser().resolve()
+		if not json_path.exists() and not self._get_journal_path(json_path).exists():
 			return
 
 		try:
-			# Read the storage state file asynchronously
-			import anyio
-
-			content = await anyio.Path(str(load_path)).read_text()
-			storage = json.loads(content)
+			# Read the storage state file (plus any journal left behind by an unclean shutdown) off the event loop
+			storage = await asyncio.to_thread(self._read_storage_state_sync, json_path)
 
 			# Apply cookies if present
 			if 'cookies' in storage and storage['cookies']:
 				await self.browser_session._cdp_set_cookies(storage['cookies'])
-				self._last_cookie_state = storage['cookies'].copy()
+				self._last_cookie_state = {_cookie_key(c): c for c in storage['cookies']}
 				self.logger.debug(f'[StorageStateWatchdog] Added {len(storage["cookies"])} cookies from storage state')
 
 			# Apply origins (localStorage/sessionStorage) if present
@@ -1,16 +1,22 @@
 """Code-use mode - Jupyter notebook-like code execution for browser automation."""
 
+from aeternus.code_use.journal import NotebookJournal, recover_notebook
 from aeternus.code_use.namespace import create_namespace
 from aeternus.code_use.notebook_export import export_to_ipynb, session_to_python_script
 from aeternus.code_use.service import CodeAgent
 from aeternus.code_use.views import CodeCell, ExecutionStatus, NotebookSession
+from aeternus.code_use.worker import CodeWorkerPool, WorkerLimits
 
 __all__ = [
 	'CodeAgent',
 	'create_namespace',
 	'export_to_ipynb',
 	'session_to_python_script',
+	'NotebookJournal',
+	'recover_notebook',
 	'CodeCell',
 	'ExecutionStatus',
 	'NotebookSession',
+	'CodeWorkerPool',
+	'WorkerLimits',
 ]
@@ -0,0 +1,236 @@
+"""
+Incremental Jupyter notebook persistence for code-use sessions.
+
+NotebookJournal writes an .ipynb file as the session runs: the header and setup cell when it is created, then
+each finished cell as one appended line. Until it is finalized the file lacks only its closing brackets, so
+finalizing (and reopening to append more) costs O(1) and a crashed run can be recovered with
+recover_notebook(). Cells that are on disk can drop their outputs from memory, keeping long sessions flat.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+from .views import CellType, CodeCell, ExecutionStatus, NotebookSession
+
+NOTEBOOK_METADATA: dict[str, Any] = {
+	'kernelspec': {'display_name': 'Python 3', 'language': 'python', 'name': 'python3'},
+	'language_info': {
+		'name': 'python',
+		'version': '3.11.0',
+		'mimetype': 'text/x-python',
+		'codemirror_mode': {'name': 'ipython', 'version': 3},
+		'pygments_lexer': 'ipython3',
+		'nbconvert_exporter': 'python',
+		'file_extension': '.py',
+	},
+}
+
+SETUP_CODE = """import asyncio
+import json
+from typing import Any
+from aeternus import BrowserSession
+from aeternus.code_use import create_namespace
+
+# Initialize browser and namespace
+browser = BrowserSession()
+await browser.start()
+
+# Create namespace with all browser control functions
+namespace: dict[str, Any] = create_namespace(browser)
+
+# Import all functions into the current namespace
+globals().update(namespace)
+
+# Type hints for better IDE support (these are now available globally)
+# navigate, click, input, evaluate, search, extract, scroll, done, etc.
+
+print("Browser-use environment initialized!")
+print("Available functions: navigate, click, input, evaluate, search, extract, done, etc.")"""
+
+_JS_PATTERNS = re.compile(
+	'|'.join(
+		[
+			r'function\s+\w+\s*\(',
+			r'\(\s*function\s*\(\)',
+			r'=>\s*{',
+			r'document\.',
+			r'Array\.from\(',
+			r'\.querySelector',
+			r'\.textContent',
+			r'\.innerHTML',
+			r'return\s+',
+			r'console\.log',
+			r'window\.',
+			r'\.map\(',
+			r'\.filter\(',
+			r'\.forEach\(',
+		]
+	),
+	re.IGNORECASE,
+)
+
+# Everything before the cells is written up front, so closing the notebook only needs this footer
+_FOOTER = b'\n]}\n'
+
+
+def looks_like_javascript(value: Any) -> bool:
+	return isinstance(value, str) and bool(value.strip()) and bool(_JS_PATTERNS.search(value))
+
+
+def setup_notebook_cell() -> dict[str, Any]:
+	return {'cell_type': 'code', 'metadata': {}, 'source': SETUP_CODE.split('\n'), 'execution_count': None, 'outputs': []}
+
+
+def javascript_notebook_cell(var_name: str, value: str) -> dict[str, Any]:
+	return {
+		'cell_type': 'code',
+		'metadata': {},
+		'source': [f'# JavaScript Code Block: {var_name}\n', f'{var_name} = """{value}"""'],
+		'execution_count': None,
+		'outputs': [],
+	}
+
+
+def cell_to_notebook_cell(cell: CodeCell) -> dict[str, Any]:
+	"""Convert a session cell to an ipynb cell dict."""
+	notebook_cell: dict[str, Any] = {
+		'cell_type': cell.cell_type.value,
+		'metadata': {},
+		'source': cell.source.splitlines(keepends=True),
+	}
+
+	if cell.cell_type == CellType.CODE:
+		notebook_cell['execution_count'] = cell.execution_count
+		notebook_cell['outputs'] = []
+
+		# Add output if available
+		if cell.output:
+			notebook_cell['outputs'].append({'output_type': 'stream', 'name': 'stdout', 'text': cell.output.split('\n')})
+
+		# Add error if available
+		if cell.error:
+			notebook_cell['outputs'].append(
+				{
+					'output_type': 'error',
+					'ename': 'Error',
+					'evalue': cell.error.split('\n')[0],
+					'traceback': cell.error.split('\n'),
+				}
+			)
+
+		# Add browser state as a separate output
+		if cell.browser_state:
+			notebook_cell['outputs'].append(
+				{'output_type': 'stream', 'name': 'stdout', 'text': [f'Browser State:\n{cell.browser_state}']}
+			)
+
+	return notebook_cell
+
+
+def recover_notebook(path: str | Path) -> Path:
+	"""Close a journal left open by a crashed run: drop a partially written last cell and add the footer."""
+	path = Path(path)
+	with open(path, 'r+b') as f:
+		f.seek(0, os.SEEK_END)
+		size = f.tell()
+		f.seek(max(0, size - len(_FOOTER)))
+		if f.read() == _FOOTER:
+			return path
+
+		# Each cell is one line, so only the last line can be incomplete
+		f.seek(0)
+		content = f.read()
+		last_newline = content.rfind(b'\n')
+		try:
+			json.loads(content[last_newline + 1 :].lstrip(b','))
+		except ValueError:
+			if last_newline > 0:
+				f.seek(last_newline)
+				f.truncate()
+		f.seek(0, os.SEEK_END)
+		f.write(_FOOTER)
+	return path
+
+
+class NotebookJournal:
+	"""Appends session cells to an .ipynb file as they finish executing."""
+
+	def __init__(self, path: str | Path, keep_outputs: int = 20):
+		"""
+		Args:
+			path: Notebook file to write (overwritten)
+			keep_outputs: Journaled cells keep their output in memory only while among the last keep_outputs cells
+		"""
+		self.path = Path(path)
+		self.keep_outputs = keep_outputs
+		self._written_cells = 0
+		self._trimmed_cells = 0
+		self._written_js: dict[str, str] = {}
+		self._has_cells = False
+		self._finalized = False
+
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		self._file = open(self.path, 'wb')
+		header = json.dumps({'nbformat': 4, 'nbformat_minor': 5, 'metadata': NOTEBOOK_METADATA}, ensure_ascii=False)
+		# Open the header object back up and start the cells array
+		self._file.write(header[:-1].encode() + b', "cells": [')
+		self._append(setup_notebook_cell())
+
+	def _append(self, notebook_cell: dict[str, Any]) -> None:
+		if self._finalized:
+			self._reopen()
+		# Separators lead the line, so every line is a complete cell
+		separator = b'\n,' if self._has_cells else b'\n'
+		self._file.write(separator + json.dumps(notebook_cell, ensure_ascii=False).encode())
+		self._file.flush()
+		self._has_cells = True
+
+	def _reopen(self) -> None:
+		self._file = open(self.path, 'r+b')
+		self._file.seek(-len(_FOOTER), os.SEEK_END)
+		self._file.truncate()
+		self._finalized = False
+
+	def sync(self, session: NotebookSession, namespace: dict[str, Any] | None = None) -> None:
+		"""Append JavaScript code blocks defined since the last sync, then finished cells not yet written."""
+		# Code blocks are put in the namespace before the cell that uses them runs, so they go first
+		if namespace:
+			for var_name in sorted(namespace.get('_code_block_vars', ())):
+				value = namespace.get(var_name)
+				if not looks_like_javascript(value):
+					continue
+				digest = hashlib.sha256(value.encode()).hexdigest()
+				if self._written_js.get(var_name) != digest:
+					self._append(javascript_notebook_cell(var_name, value))
+					self._written_js[var_name] = digest
+
+		cells = session.cells
+		while self._written_cells < len(cells):
+			cell = cells[self._written_cells]
+			if cell.status in (ExecutionStatus.PENDING, ExecutionStatus.RUNNING):
+				break
+			self._append(cell_to_notebook_cell(cell))
+			self._written_cells += 1
+
+		# Outputs of older cells live on disk only
+		while self._trimmed_cells < self._written_cells - self.keep_outputs:
+			cells[self._trimmed_cells].output = None
+			cells[self._trimmed_cells].browser_state = None
+			self._trimmed_cells += 1
+
+	def finalize(self, session: NotebookSession | None = None, namespace: dict[str, Any] | None = None) -> Path:
+		"""Write any remaining cells and close the notebook. Appending later reopens it."""
+		if session is not None:
+			self.sync(session, namespace)
+		if not self._finalized:
+			self._file.write(_FOOTER)
+			self._file.close()
+			self._finalized = True
+		return self.path
+
+	def close(self) -> None:
+		self.finalize()
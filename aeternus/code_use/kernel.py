@@ -0,0 +1,74 @@
+"""Persistent execution kernel for code-use cells."""
+
+import ast
+import hashlib
+import inspect
+from collections import OrderedDict
+from types import CodeType
+from typing import Any
+
+from aeternus.agent.replay import DOM_PRESERVING_ACTIONS
+from aeternus.tools.service import Tools
+
+# Filename given to compiled cells; error reporting walks tracebacks for frames with this name
+CELL_FILENAME = '<code>'
+
+
+def page_changing_names(tools: Tools) -> frozenset[str]:
+	"""Namespace names of the actions that can change the page (see create_namespace for the naming)."""
+	names = {'evaluate'}
+	for action_name in tools.registry.registry.actions:
+		if action_name not in DOM_PRESERVING_ACTIONS:
+			names.add('input_text' if action_name == 'input' else action_name)
+	return frozenset(names)
+
+
+def _referenced_names(code: CodeType) -> frozenset[str]:
+	"""Global and attribute names referenced anywhere in a code object, including nested functions."""
+	names = set(code.co_names)
+	for const in code.co_consts:
+		if isinstance(const, CodeType):
+			names |= _referenced_names(const)
+	return frozenset(names)
+
+
+class CodeKernel:
+	"""
+	Runs cells directly in a persistent namespace, like a Jupyter kernel.
+
+	Cells are compiled with top-level await allowed, so assignments land in the namespace as module globals
+	with no wrapper function or locals copying. Compiled cells are cached by source hash, which makes
+	re-running a cell (retries, replays, repeated helper snippets) skip parsing and compilation.
+	"""
+
+	def __init__(self, namespace: dict[str, Any], cache_size: int = 256):
+		self.namespace = namespace
+		self.cache_size = cache_size
+		self._compiled: OrderedDict[str, tuple[CodeType, frozenset[str]]] = OrderedDict()
+		self.cache_hits = 0
+		self.cache_misses = 0
+
+	def compile(self, source: str) -> tuple[CodeType, frozenset[str]]:
+		"""Compile a cell (cached), returning the code object and the names it references."""
+		key = hashlib.sha256(source.encode()).hexdigest()
+		cached = self._compiled.get(key)
+		if cached is not None:
+			self._compiled.move_to_end(key)
+			self.cache_hits += 1
+			return cached
+
+		self.cache_misses += 1
+		code = compile(source, CELL_FILENAME, 'exec', flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+		compiled = (code, _referenced_names(code))
+		self._compiled[key] = compiled
+		while len(self._compiled) > self.cache_size:
+			self._compiled.popitem(last=False)
+		return compiled
+
+	async def run(self, source: str) -> frozenset[str]:
+		"""Execute a cell in the namespace, awaiting it if it uses top-level await. Returns the names it references."""
+		code, names = self.compile(source)
+		result = eval(code, self.namespace)
+		if code.co_flags & inspect.CO_COROUTINE:
+			await result
+		return names
@@ -253,6 +253,40 @@ async def evaluate(code: str, browser_session: BrowserSession) -> Any:
 		raise EvaluateError(f'Failed to execute JavaScript: {type(e).__name__}: {e}') from e
 
 
+def create_library_namespace() -> dict[str, Any]:
+	"""Standard library modules and the optional data libraries that are installed, as exposed to code cells."""
+	namespace: dict[str, Any] = {
+		'json': json,
+		'asyncio': asyncio,
+		'Path': Path,
+		'csv': csv,
+		're': re,
+		'datetime': datetime,
+		'requests': requests,
+	}
+
+	# Add optional data science libraries if available
+	if NUMPY_AVAILABLE:
+		namespace['np'] = np
+		namespace['numpy'] = np
+	if PANDAS_AVAILABLE:
+		namespace['pd'] = pd
+		namespace['pandas'] = pd
+	if MATPLOTLIB_AVAILABLE:
+		namespace['plt'] = plt
+		namespace['matplotlib'] = plt
+	if BS4_AVAILABLE:
+		namespace['BeautifulSoup'] = BeautifulSoup
+		namespace['bs4'] = BeautifulSoup
+	if PYPDF_AVAILABLE:
+		namespace['PdfReader'] = PdfReader
+		namespace['pypdf'] = PdfReader
+	if TABULATE_AVAILABLE:
+		namespace['tabulate'] = tabulate
+
+	return namespace
+
+
 def create_namespace(
 	browser_session: BrowserSession,
 	tools: Tools | None = None,
@@ -296,35 +330,10 @@ def create_namespace(
 		# Core objects
 		'browser': browser_session,
 		'file_system': file_system,
-		# Standard library modules (always available)
-		'json': json,
-		'asyncio': asyncio,
-		'Path': Path,
-		'csv': csv,
-		're': re,
-		'datetime': datetime,
-		'requests': requests,
+		# Standard library modules (always available) and optional data libraries
+		**create_library_namespace(),
 	}
 
-	# Add optional data science libraries if available
-	if NUMPY_AVAILABLE:
-		namespace['np'] = np
-		namespace['numpy'] = np
-	if PANDAS_AVAILABLE:
-		namespace['pd'] = pd
-		namespace['pandas'] = pd
-	if MATPLOTLIB_AVAILABLE:
-		namespace['plt'] = plt
-		namespace['matplotlib'] = plt
-	if BS4_AVAILABLE:
-		namespace['BeautifulSoup'] = BeautifulSoup
-		namespace['bs4'] = BeautifulSoup
-	if PYPDF_AVAILABLE:
-		namespace['PdfReader'] = PdfReader
-		namespace['pypdf'] = PdfReader
-	if TABULATE_AVAILABLE:
-		namespace['tabulate'] = tabulate
-
 	# Track failed evaluate() calls to detect repeated failed approaches
 	if '_evaluate_failures' not in namespace:
 		namespace['_evaluate_failures'] = []
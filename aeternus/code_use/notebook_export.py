@@ -1,11 +1,19 @@
 """Export code-use session to Jupyter notebook format."""
 
 import json
-import re
+import shutil
 from pathlib import Path
 
 from aeternus.code_use.service import CodeAgent
 
+from .journal import (
+	NOTEBOOK_METADATA,
+	NotebookJournal,
+	cell_to_notebook_cell,
+	javascript_notebook_cell,
+	looks_like_javascript,
+	setup_notebook_cell,
+)
 from .views import CellType, NotebookExport
 
 
@@ -14,10 +22,12 @@ def export_to_ipynb(agent: CodeAgent, output_path: str | Path) -> Path:
 	Export a NotebookSession to a Jupyter notebook (.ipynb) file.
 	Now includes JavaScript code blocks that were stored in the namespace.
 
+	The agent journals cells to its notebook as they run, so exporting closes that file (O(1)) and copies it
+	to output_path when it lives elsewhere. The notebook is only rebuilt for agents without a journal.
+
 	Args:
-		session: The NotebookSession to export
+		agent: The CodeAgent whose session to export
 		output_path: Path where to save the notebook file
-		agent: Optional CodeAgent instance to access namespace for JavaScript blocks
 
 	Returns:
 		Path to the saved notebook file
@@ -30,144 +40,31 @@ def export_to_ipynb(agent: CodeAgent, output_path: str | Path) -> Path:
 		```
 	"""
 	output_path = Path(output_path)
+	output_path.parent.mkdir(parents=True, exist_ok=True)
 
-	# Create notebook structure
-	notebook = NotebookExport(
-		metadata={
-			'kernelspec': {'display_name': 'Python 3', 'language': 'python', 'name': 'python3'},
-			'language_info': {
-				'name': 'python',
-				'version': '3.11.0',
-				'mimetype': 'text/x-python',
-				'codemirror_mode': {'name': 'ipython', 'version': 3},
-				'pygments_lexer': 'ipython3',
-				'nbconvert_exporter': 'python',
-				'file_extension': '.py',
-			},
-		}
-	)
-
-	# Add setup cell at the beginning with proper type hints
-	setup_code = """import asyncio
-import json
-from typing import Any
-from aeternus import BrowserSession
-from aeternus.code_use import create_namespace
-
-# Initialize browser and namespace
-browser = BrowserSession()
-await browser.start()
-
-# Create namespace with all browser control functions
-namespace: dict[str, Any] = create_namespace(browser)
-
-# Import all functions into the current namespace
-globals().update(namespace)
-
-# Type hints for better IDE support (these are now available globally)
-# navigate, click, input, evaluate, search, extract, scroll, done, etc.
-
-print("Browser-use environment initialized!")
-print("Available functions: navigate, click, input, evaluate, search, extract, done, etc.")"""
+	journal: NotebookJournal | None = getattr(agent, 'notebook_journal', None)
+	if journal is not None:
+		notebook_path = journal.finalize(agent.session, agent.namespace)
+		if output_path.resolve() != notebook_path.resolve():
+			shutil.copyfile(notebook_path, output_path)
+		return output_path
 
-	setup_cell = {
-		'cell_type': 'code',
-		'metadata': {},
-		'source': setup_code.split('\n'),
-		'execution_count': None,
-		'outputs': [],
-	}
-	notebook.cells.append(setup_cell)
+	# Create notebook structure
+	notebook = NotebookExport(metadata=NOTEBOOK_METADATA)
+	notebook.cells.append(setup_notebook_cell())
 
 	# Add JavaScript code blocks as variables FIRST
 	if hasattr(agent, 'namespace') and agent.namespace:
-		# Look for JavaScript variables in the namespace
-		code_block_vars = agent.namespace.get('_code_block_vars', set())
-
-		for var_name in sorted(code_block_vars):
+		for var_name in sorted(agent.namespace.get('_code_block_vars', set())):
 			var_value = agent.namespace.get(var_name)
-			if isinstance(var_value, str) and var_value.strip():
-				# Check if this looks like JavaScript code
-				# Look for common JS patterns
-				js_patterns = [
-					r'function\s+\w+\s*\(',
-					r'\(\s*function\s*\(\)',
-					r'=>\s*{',
-					r'document\.',
-					r'Array\.from\(',
-					r'\.querySelector',
-					r'\.textContent',
-					r'\.innerHTML',
-					r'return\s+',
-					r'console\.log',
-					r'window\.',
-					r'\.map\(',
-					r'\.filter\(',
-					r'\.forEach\(',
-				]
-
-				is_js = any(re.search(pattern, var_value, re.IGNORECASE) for pattern in js_patterns)
-
-				if is_js:
-					# Create a code cell with the JavaScript variable
-					js_cell = {
-						'cell_type': 'code',
-						'metadata': {},
-						'source': [f'# JavaScript Code Block: {var_name}\n', f'{var_name} = """{var_value}"""'],
-						'execution_count': None,
-						'outputs': [],
-					}
-					notebook.cells.append(js_cell)
+			if looks_like_javascript(var_value):
+				notebook.cells.append(javascript_notebook_cell(var_name, var_value))
 
 	# Convert cells
-	python_cell_count = 0
 	for cell in agent.session.cells:
-		notebook_cell: dict = {
-			'cell_type': cell.cell_type.value,
-			'metadata': {},
-			'source': cell.source.splitlines(keepends=True),
-		}
-
-		if cell.cell_type == CellType.CODE:
-			python_cell_count += 1
-			notebook_cell['execution_count'] = cell.execution_count
-			notebook_cell['outputs'] = []
-
-			# Add output if available
-			if cell.output:
-				notebook_cell['outputs'].append(
-					{
-						'output_type': 'stream',
-						'name': 'stdout',
-						'text': cell.output.split('\n'),
-					}
-				)
-
-			# Add error if available
-			if cell.error:
-				notebook_cell['outputs'].append(
-					{
-						'output_type': 'error',
-						'ename': 'Error',
-						'evalue': cell.error.split('\n')[0] if cell.error else '',
-						'traceback': cell.error.split('\n') if cell.error else [],
-					}
-				)
-
-			# Add browser state as a separate output
-			if cell.browser_state:
-				notebook_cell['outputs'].append(
-					{
-						'output_type': 'stream',
-						'name': 'stdout',
-						'text': [f'Browser State:\n{cell.browser_state}'],
-					}
-				)
-
-		notebook.cells.append(notebook_cell)
+		notebook.cells.append(cell_to_notebook_cell(cell))
 
 	# Write to file
-	output_path.parent.mkdir(parents=True, exist_ok=True)
 	with open(output_path, 'w', encoding='utf-8') as f:
 		json.dump(notebook.model_dump(), f, indent=2, ensure_ascii=False)
 
@@ -232,30 +129,9 @@ def session_to_python_script(agent: CodeAgent) -> str:
 
 		for var_name in sorted(code_block_vars):
 			var_value = agent.namespace.get(var_name)
-			if isinstance(var_value, str) and var_value.strip():
-				# Check if this looks like JavaScript code
-				js_patterns = [
-					r'function\s+\w+\s*\(',
-					r'\(\s*function\s*\(\)',
-					r'=>\s*{',
-					r'document\.',
-					r'Array\.from\(',
-					r'\.querySelector',
-					r'\.textContent',
-					r'\.innerHTML',
-					r'return\s+',
-					r'console\.log',
-					r'window\.',
-					r'\.map\(',
-					r'\.filter\(',
-					r'\.forEach\(',
-				]
-
-				is_js = any(re.search(pattern, var_value, re.IGNORECASE) for pattern in js_patterns)
-
-				if is_js:
-					lines.append(f'\t# JavaScript Code Block: {var_name}\n')
-					lines.append(f'\t{var_name} = """{var_value}"""\n\n')
+			if looks_like_javascript(var_value):
+				lines.append(f'\t# JavaScript Code Block: {var_name}\n')
+				lines.append(f'\t{var_name} = """{var_value}"""\n\n')
 
 	for i, cell in enumerate(agent.session.cells):
 		if cell.cell_type == CellType.CODE:
@@ -3,6 +3,7 @@
 import asyncio
 import datetime
 import html
+import inspect
 import json
 import logging
 import re
@@ -12,6 +13,7 @@ from typing import Any
 
 from uuid_extensions import uuid7str
 
+from aeternus.agent.replay import wait_for_page_quiet
 from aeternus.browser import BrowserSession
 from aeternus.browser.profile import BrowserProfile
 from aeternus.dom.service import DomService
@@ -34,6 +36,8 @@ from aeternus.tools.service import CodeAgentTools, Tools
 from aeternus.utils import get_aeternus_version
 
 from .formatting import format_browser_state_for_llm
+from .journal import NotebookJournal
+from .kernel import CELL_FILENAME, CodeKernel, page_changing_names
 from .namespace import EvaluateError, create_namespace
 from .utils import detect_token_limit_issue, extract_code_blocks, extract_url_from_task, truncate_message_content
 from .views import (
@@ -47,6 +51,7 @@ from .views import (
 	ExecutionStatus,
 	NotebookSession,
 )
+from .worker import CodeWorker, CodeWorkerPool, WorkerCrashedError, WorkerVariable, get_worker_pool, rebuild_cell_exception
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +84,9 @@ class CodeAgent:
 		use_vision: bool = True,
 		calculate_cost: bool = False,
 		demo_mode: bool | None = None,
+		use_worker: bool = False,
+		worker_pool: CodeWorkerPool | None = None,
+		notebook_path: str | Path | None = None,
 		**kwargs,
 	):
 		"""
@@ -100,6 +108,9 @@ class CodeAgent:
 			use_vision: Whether to include screenshots in LLM messages (default: True)
 			calculate_cost: Whether to calculate token costs (default: False)
 			demo_mode: Enable the in-browser demo panel for live logging (default: False)
+			use_worker: Run cells in a subprocess kernel with CPU, memory and time limits (default: False)
+			worker_pool: Pool to take the subprocess kernel from (default: a shared process-wide pool)
+			notebook_path: Where cells are journaled as an .ipynb while the agent runs (default: in the agent directory)
 			llm: Optional ChatBrowserUse LLM instance (will create default if not provided)
 			**kwargs: Additional keyword arguments for compatibility (ignored)
 		"""
@@ -157,9 +168,15 @@ class CodeAgent:
 		self.max_failures = max_failures
 		self.max_validations = max_validations
 		self.use_vision = use_vision
+		self.use_worker = use_worker or worker_pool is not None
+		self._worker_pool = worker_pool
+		self._worker: CodeWorker | None = None
 
 		self.session = NotebookSession()
 		self.namespace: dict[str, Any] = {}
+		self.kernel = CodeKernel(self.namespace)
+		# Cells referencing these names may change the page, so they wait for it to settle
+		self._page_changing_names: frozenset[str] = frozenset()
 		self._llm_messages: list[BaseMessage] = []  # Internal LLM conversation history
 		self.complete_history: list[CodeAgentHistory] = []  # Type-safe history with model_output and result
 		self.dom_service: DomService | None = None
@@ -178,6 +195,8 @@ class CodeAgent:
 		base_tmp = Path('/tmp')
 		self.agent_directory = base_tmp / f'aeternus_code_agent_{self.id}_{timestamp}'
 		self.screenshot_service = ScreenshotService(agent_directory=self.agent_directory)
+		# Finished cells are appended to the notebook on disk; export_to_ipynb only closes it
+		self.notebook_journal = NotebookJournal(notebook_path or self.agent_directory / 'notebook.ipynb')
 
 		# Initialize token cost service for usage tracking
 		self.token_cost_service = TokenCost(include_cost=calculate_cost)
@@ -241,6 +260,11 @@ class CodeAgent:
 			available_file_paths=self.available_file_paths,
 			sensitive_data=self.sensitive_data,
 		)
+		self.kernel = CodeKernel(self.namespace)
+		self._page_changing_names = page_changing_names(self.tools)
+		if self.use_worker and self._worker is None:
+			self._worker_pool = self._worker_pool or get_worker_pool()
+			self._worker = await self._worker_pool.acquire()
 
 		# Initialize conversation with task
 		self._llm_messages.append(UserMessage(content=f'Task: {self.task}'))
@@ -257,7 +281,7 @@ class CodeAgent:
 				# Use the navigate action from namespace
 				await self.namespace['navigate'](initial_url)
 				# Wait for page load
-				await asyncio.sleep(2)
+				await wait_for_page_quiet(self.browser_session, 2.0)
 
 				# Record this navigation as a cell in the notebook
 				nav_code = f"await navigate('{initial_url}')"
@@ -598,6 +622,8 @@ class CodeAgent:
 					# Check if it's a list or dict that might contain collected data
 					if isinstance(var_value, (list, dict)) and var_value:
 						data_vars.append(f'  - {var_name}: {type(var_value).__name__} with {len(var_value)} items')
+					elif isinstance(var_value, WorkerVariable) and var_value.type_name in ('list', 'dict') and var_value.length:
+						data_vars.append(f'  - {var_name}: {var_value.type_name} with {var_value.length} items')
 
 			if data_vars:
 				partial_result_parts.append('\nVariables in namespace that may contain partial data:')
@@ -657,6 +683,7 @@ class CodeAgent:
 		# Store history data in session for history property
 		self.session._complete_history = self.complete_history
 		self.session._usage_summary = self.usage_summary
+		self.notebook_journal.finalize(self.session, self.namespace)
 
 		return self.session
 
@@ -826,7 +853,6 @@ class CodeAgent:
 
 		try:
 			# Capture output
-			import ast
 			import io
 			import sys
 
@@ -843,105 +869,11 @@ class CodeAgent:
 				# Store consecutive errors count for done() validation
 				self.namespace['_consecutive_errors'] = self._consecutive_errors
 
-				# Check if code contains await expressions - if so, wrap in async function
-				# This mimics how Jupyter/IPython handles top-level await
-				try:
-					tree = ast.parse(code, mode='exec')
-					has_await = any(isinstance(node, (ast.Await, ast.AsyncWith, ast.AsyncFor)) for node in ast.walk(tree))
-				except SyntaxError:
-					# If parse fails, let exec handle the error
-					has_await = False
-
-				if has_await:
-					# When code has await, we must wrap in async function
-					# To make variables persist naturally (like Jupyter without needing 'global'):
-					# 1. Extract all assigned variable names from the code
-					# 2. Inject 'global' declarations for variables that already exist in namespace
-					# 3. Extract user's explicit global declarations and pre-define those vars
-					# 4. Return locals() so we can update namespace with new variables
-
-					# Find all variable names being assigned + user's explicit globals
-					try:
-						assigned_names = set()
-						user_global_names = set()
-
-						for node in ast.walk(tree):
-							if isinstance(node, ast.Assign):
-								for target in node.targets:
-									if isinstance(target, ast.Name):
-										assigned_names.add(target.id)
-							elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
-								assigned_names.add(node.target.id)
-							elif isinstance(node, (ast.AnnAssign, ast.NamedExpr)):
-								if hasattr(node, 'target') and isinstance(node.target, ast.Name):
-									assigned_names.add(node.target.id)
-							elif isinstance(node, ast.Global):
-								# Track user's explicit global declarations
-								user_global_names.update(node.names)
-
-						# Pre-define any user-declared globals that don't exist yet
-						# This prevents NameError when user writes "global foo" before "foo = ..."
-						for name in user_global_names:
-							if name not in self.namespace:
-								self.namespace[name] = None
-
-						# Filter to only existing namespace vars (like Jupyter does)
-						# Include both: assigned vars that exist + user's explicit globals
-						existing_vars = {name for name in (assigned_names | user_global_names) if name in self.namespace}
-					except Exception as e:
-						existing_vars = set()
-
-					# Build global declaration if needed
-					global_decl = ''
-					has_global_decl = False
-					if existing_vars:
-						vars_str = ', '.join(sorted(existing_vars))
-						global_decl = f'    global {vars_str}\n'
-						has_global_decl = True
-
-					indented_code = '\n'.join('    ' + line if line.strip() else line for line in code.split('\n'))
-					wrapped_code = f"""async def __code_exec__():
-{global_decl}{indented_code}
-    # Return locals so we can update the namespace
-    return locals()
-
-__code_exec_coro__ = __code_exec__()
-"""
-					# Store whether we added a global declaration (needed for error line mapping)
-					self.namespace['_has_global_decl'] = has_global_decl
-
-					# Compile and execute wrapper at module level
-					compiled_code = compile(wrapped_code, '<code>', 'exec')
-					exec(compiled_code, self.namespace, self.namespace)
-
-					# Get and await the coroutine, then update namespace with new/modified variables
-					coro = self.namespace.get('__code_exec_coro__')
-					if coro:
-						result_locals = await coro
-						# Update namespace with all variables from the function's locals
-						# This makes variable assignments persist across cells
-						if result_locals:
-							for key, value in result_locals.items():
-								if not key.startswith('_'):
-									self.namespace[key] = value
-									# Variable info is tracked in "Available" section, no need for verbose inline output
-
-						# Clean up temporary variables
-						self.namespace.pop('__code_exec_coro__', None)
-						self.namespace.pop('__code_exec__', None)
+				# Top-level await is compiled natively, so variables persist as namespace globals (like Jupyter)
+				if self._worker is not None:
+					referenced_names = await self._run_cell_in_worker(code)
 				else:
-					# No await - execute directly at module level for natural variable scoping
-					# This means x = x + 10 will work without needing 'global x'
-
-					# Track variables before execution
-					vars_before = set(self.namespace.keys())
-
-					compiled_code = compile(code, '<code>', 'exec')
-					exec(compiled_code, self.namespace, self.namespace)
-
-					# Track newly created/modified variables (info shown in "Available" section)
-					vars_after = set(self.namespace.keys())
-					new_vars = vars_after - vars_before
+					referenced_names = await self.kernel.run(code)
 
 				# Get output
 				output_value = sys.stdout.getvalue()
@@ -951,8 +883,9 @@ __code_exec_coro__ = __code_exec__()
 			finally:
 				sys.stdout = old_stdout
 
-			# Wait 2 seconds for page to stabilize after code execution
-			await asyncio.sleep(0.5)
+			# Let the page settle after browser actions, returning as soon as it is loaded and quiet
+			if self.browser_session and referenced_names & self._page_changing_names:
+				await wait_for_page_quiet(self.browser_session, 0.5, quiet_period=0.1)
 
 			# Note: Browser state is now fetched right before LLM call instead of after each execution
 			# This reduces unnecessary state fetches for operations that don't affect the browser
@@ -1067,7 +1000,7 @@ __code_exec_coro__ = __code_exec__()
 					user_code_lineno = None
 					while tb is not None:
 						frame = tb.tb_frame
-						if frame.f_code.co_filename == '<code>':
+						if frame.f_code.co_filename == CELL_FILENAME:
 							# Found the frame executing user code
 							# Get the line number from the traceback
 							user_code_lineno = tb.tb_lineno
@@ -1084,6 +1017,43 @@ __code_exec_coro__ = __code_exec__()
 
 		return output, error, None
 
+	async def _run_cell_in_worker(self, code: str) -> frozenset[str]:
+		"""Run a cell in the subprocess kernel; its variables are mirrored into the namespace as WorkerVariable placeholders."""
+		assert self._worker is not None and self._worker_pool is not None
+
+		# Syntax errors and the referenced names come from the local compile, without a round trip
+		_, referenced_names = self.kernel.compile(code)
+		helpers = {
+			name: value
+			for name, value in self.namespace.items()
+			if not name.startswith('_') and inspect.iscoroutinefunction(value)
+		}
+		updates = {name: self.namespace[name] for name in self.namespace.get('_code_block_vars', ())}
+
+		try:
+			result = await self._worker.run_cell(code, helpers, updates)
+		except WorkerCrashedError as e:
+			await self._worker_pool.release(self._worker)
+			self._worker = await self._worker_pool.acquire()
+			for name in [n for n, v in self.namespace.items() if isinstance(v, WorkerVariable)]:
+				del self.namespace[name]
+			raise RuntimeError(f'{e}. Variables from earlier cells were reset.') from e
+
+		if result.output:
+			print(result.output, end='')
+
+		for name in [n for n, v in self.namespace.items() if isinstance(v, WorkerVariable) and n not in result.variables]:
+			del self.namespace[name]
+		for name, info in result.variables.items():
+			existing = self.namespace.get(name)
+			if name in updates or (existing is not None and not isinstance(existing, WorkerVariable)):
+				continue
+			self.namespace[name] = WorkerVariable(name, info['type'], info['len'])
+
+		if result.error_type:
+			raise rebuild_cell_exception(result)
+		return referenced_names
+
 	async def _get_browser_state(self) -> tuple[str, str | None]:
 		"""Get the current browser state as text with ultra-minimal DOM structure for code agents.
 
@@ -1227,6 +1197,7 @@ __code_exec_coro__ = __code_exec__()
 		)
 
 		self.complete_history.append(history_entry)
+		self.notebook_journal.sync(self.session, self.namespace)
 		await self._demo_mode_log_step(history_entry)
 
 	async def _demo_mode_log(self, message: str, level: str = 'info', metadata: dict[str, Any] | None = None) -> None:
@@ -1420,6 +1391,9 @@ __code_exec_coro__ = __code_exec__()
 
 	async def close(self) -> None:
 		"""Close the browser session."""
+		if self._worker is not None and self._worker_pool is not None:
+			await self._worker_pool.release(self._worker)
+			self._worker = None
 		if self.browser_session:
 			# Check if we should close the browser based on keep_alive setting
 			if not self.browser_session.browser_profile.keep_alive:
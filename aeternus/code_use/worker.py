@@ -0,0 +1,483 @@
+"""
+Subprocess kernels for code-use cells.
+
+With worker mode on, cells run in a separate Python process instead of the agent's event loop, so CPU-heavy
+cells (big tables, pandas work) cannot stall CDP handling or other agents in the process. The worker keeps its
+own persistent namespace. The browser helpers created by create_namespace stay in the agent process and are
+proxied to the worker. Every call is sent over the worker's stdin/stdout as JSON lines; only JSON crosses the
+boundary, so a misbehaving cell cannot get objects unpickled in the agent.
+
+Each worker runs under a memory limit, and each cell under a CPU-time limit (checked in the worker) and a
+wall-clock timeout (enforced by the agent, which kills the worker). A killed worker loses its variables. The
+agent then starts a new one and reports the reset in the cell error.
+
+The worker process entry point is main(); use CodeWorkerPool from the agent side.
+"""
+
+import argparse
+import asyncio
+import builtins
+import inspect
+import io
+import json
+import logging
+import math
+import os
+import signal
+import sys
+import weakref
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import BaseModel
+
+from aeternus.code_use.kernel import CELL_FILENAME, CodeKernel
+
+try:
+	import resource
+except ImportError:  # Windows: limits other than the wall-clock timeout are not enforced
+	resource = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Large extracted pages and DataFrame dumps travel as single JSON lines
+_STREAM_LIMIT = 2**30
+
+
+@dataclass
+class WorkerLimits:
+	"""Resource limits for subprocess kernels. None disables a limit."""
+
+	cell_timeout: float | None = 300.0
+	cpu_seconds: int | None = 120
+	memory_mb: int | None = 4096
+
+
+@dataclass
+class CellResult:
+	output: str | None = None
+	error_type: str | None = None
+	error: str | None = None
+	lineno: int | None = None
+	offset: int | None = None
+	text: str | None = None
+	# name -> {'type': type name, 'len': length or None} for the worker's user variables
+	variables: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+class WorkerVariable:
+	"""Placeholder in the agent's namespace for a variable that lives in the worker."""
+
+	def __init__(self, name: str, type_name: str, length: int | None):
+		self.name = name
+		self.type_name = type_name
+		self.length = length
+
+	def __repr__(self) -> str:
+		size = f', len={self.length}' if self.length is not None else ''
+		return f'<{self.type_name} {self.name} in worker{size}>'
+
+
+class WorkerCrashedError(RuntimeError):
+	"""The worker process died or was killed (timeout, memory); its variables are gone."""
+
+
+def _to_json(value: Any) -> Any:
+	if isinstance(value, BaseModel):
+		return value.model_dump(mode='json')
+	if isinstance(value, (set, frozenset, tuple)):
+		return list(value)
+	return str(value)
+
+
+def _dumps(message: dict[str, Any]) -> bytes:
+	return json.dumps(message, default=_to_json).encode() + b'\n'
+
+
+def rebuild_cell_exception(result: CellResult) -> BaseException:
+	"""Recreate a worker-side exception so the agent's error reporting can treat it like a local one."""
+	message = result.error or ''
+	if result.error_type in ('SyntaxError', 'IndentationError', 'TabError'):
+		error_class = getattr(builtins, result.error_type)
+		return error_class(message, (CELL_FILENAME, result.lineno, result.offset, result.text))
+	if result.error_type == 'NameError':
+		return NameError(message)
+	if result.error_type == 'EvaluateError':
+		from aeternus.code_use.namespace import EvaluateError
+
+		return EvaluateError(message)
+	# Keep the original type name, which is what the error message shows
+	return type(result.error_type or 'Exception', (Exception,), {})(message)
+
+
+# ---------------------------------------------------------------------------
+# Agent side
+# ---------------------------------------------------------------------------
+
+
+class CodeWorker:
+	"""Handle to one subprocess kernel."""
+
+	def __init__(self, limits: WorkerLimits):
+		self.limits = limits
+		self._process: asyncio.subprocess.Process | None = None
+		self._loop: asyncio.AbstractEventLoop | None = None
+		self._write_lock = asyncio.Lock()
+		self._next_cell_id = 0
+
+	@property
+	def alive(self) -> bool:
+		return self._process is not None and self._process.returncode is None
+
+	@property
+	def usable(self) -> bool:
+		"""Alive and owned by the running event loop; the pipes of a worker started in another loop never wake this one"""
+		try:
+			return self.alive and self._loop is asyncio.get_running_loop()
+		except RuntimeError:
+			return False
+
+	async def start(self) -> None:
+		self._loop = asyncio.get_running_loop()
+		# Started through -c rather than -m, since importing the package already imports this module
+		args = [sys.executable, '-c', 'from aeternus.code_use.worker import main; main()']
+		if self.limits.cpu_seconds:
+			args += ['--cpu-seconds', str(self.limits.cpu_seconds)]
+		if self.limits.memory_mb:
+			args += ['--memory-mb', str(self.limits.memory_mb)]
+		self._process = await asyncio.create_subprocess_exec(
+			*args,
+			stdin=asyncio.subprocess.PIPE,
+			stdout=asyncio.subprocess.PIPE,
+			limit=_STREAM_LIMIT,
+		)
+		# The worker announces itself once its imports are done
+		message = await self._read()
+		if message.get('type') != 'ready':
+			raise WorkerCrashedError(f'Code worker failed to start: {message}')
+
+	async def _send(self, message: dict[str, Any]) -> None:
+		assert self._process and self._process.stdin
+		async with self._write_lock:
+			self._process.stdin.write(_dumps(message))
+			await self._process.stdin.drain()
+
+	async def _read(self) -> dict[str, Any]:
+		assert self._process and self._process.stdout
+		line = await self._process.stdout.readline()
+		if not line:
+			raise WorkerCrashedError(f'Code worker exited with code {await self._process.wait()}')
+		return json.loads(line)
+
+	async def _answer_call(self, message: dict[str, Any], helpers: dict[str, Callable[..., Awaitable[Any]]]) -> None:
+		reply: dict[str, Any] = {'type': 'reply', 'id': message['id']}
+		try:
+			helper = helpers[message['name']]
+			reply['value'] = await helper(*message.get('args', []), **message.get('kwargs', {}))
+		except Exception as e:
+			reply['error_type'] = type(e).__name__
+			reply['error'] = str(e)
+		try:
+			await self._send(reply)
+		except (ConnectionError, AssertionError):
+			pass  # The worker went away mid-call, run_cell reports it
+
+	async def _run_cell(
+		self, code: str, helpers: dict[str, Callable[..., Awaitable[Any]]], updates: dict[str, Any]
+	) -> CellResult:
+		self._next_cell_id += 1
+		cell_id = self._next_cell_id
+		await self._send({'type': 'exec', 'id': cell_id, 'code': code, 'updates': updates, 'helpers': sorted(helpers)})
+
+		calls: set[asyncio.Task] = set()
+		try:
+			while True:
+				message = await self._read()
+				if message['type'] == 'call':
+					# Helpers run concurrently so cells can asyncio.gather() browser calls
+					task = asyncio.create_task(self._answer_call(message, helpers))
+					calls.add(task)
+					task.add_done_callback(calls.discard)
+				elif message['type'] == 'done' and message['id'] == cell_id:
+					return CellResult(**{k: v for k, v in message.items() if k not in ('type', 'id')})
+		finally:
+			for task in calls:
+				task.cancel()
+
+	async def run_cell(
+		self, code: str, helpers: dict[str, Callable[..., Awaitable[Any]]], updates: dict[str, Any] | None = None
+	) -> CellResult:
+		"""Run a cell in the worker. updates are assigned in the worker namespace first. Kills the worker on timeout."""
+		if not self.usable:
+			raise WorkerCrashedError('Code worker is not running in this event loop')
+		try:
+			return await asyncio.wait_for(self._run_cell(code, helpers, updates or {}), timeout=self.limits.cell_timeout)
+		except asyncio.TimeoutError:
+			await self.close()
+			raise WorkerCrashedError(f'Cell exceeded the {self.limits.cell_timeout:.0f}s timeout and its worker was stopped')
+
+	async def close(self) -> None:
+		if not self.alive:
+			return
+		assert self._process
+		if not self.usable:
+			self.abandon()
+			return
+		try:
+			self._process.kill()
+		except ProcessLookupError:
+			pass
+		await self._process.wait()
+
+	def abandon(self) -> None:
+		"""Kill a worker whose event loop is gone; its transport cannot be awaited from another loop"""
+		if self._process is None:
+			return
+		try:
+			os.kill(self._process.pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+			# Reap it here, the old loop's child watcher is gone
+			os.waitpid(self._process.pid, 0)
+		except (ProcessLookupError, ChildProcessError):
+			pass
+		self._process = None
+
+
+class CodeWorkerPool:
+	"""
+	Keeps `size` started workers warm so an agent gets a kernel without waiting for interpreter startup and imports.
+
+	Workers hold an agent's variables, so they are never handed to a second agent: released workers are stopped
+	and the pool is topped up in the background.
+	"""
+
+	def __init__(self, size: int = 1, limits: WorkerLimits | None = None):
+		self.size = size
+		self.limits = limits or WorkerLimits()
+		self._idle: list[CodeWorker] = []
+		self._refill_task: asyncio.Task | None = None
+
+	async def _start_worker(self) -> CodeWorker:
+		worker = CodeWorker(self.limits)
+		try:
+			await worker.start()
+		except BaseException:
+			# Cancelled (e.g. by close()) or failed mid-start, do not leave the half-started process behind
+			await worker.close()
+			raise
+		return worker
+
+	async def _refill(self) -> None:
+		while len(self._idle) < self.size:
+			self._idle.append(await self._start_worker())
+
+	def _schedule_refill(self) -> None:
+		# A refill task left pending by a finished event loop never completes, so it does not count
+		task = self._refill_task
+		if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+			from aeternus.utils import create_task_with_error_handling
+
+			self._refill_task = create_task_with_error_handling(self._refill(), name='refill_code_workers', suppress_exceptions=True)
+
+	async def acquire(self) -> CodeWorker:
+		while self._idle:
+			worker = self._idle.pop()
+			if worker.usable:
+				self._schedule_refill()
+				return worker
+			# Crashed, or warmed up by an earlier event loop (e.g. a previous asyncio.run())
+			await worker.close()
+		worker = await self._start_worker()
+		self._schedule_refill()
+		return worker
+
+	async def release(self, worker: CodeWorker) -> None:
+		await worker.close()
+
+	async def close(self) -> None:
+		if self._refill_task and self._refill_task.get_loop() is asyncio.get_running_loop():
+			self._refill_task.cancel()
+			# Let it kill the worker it may be starting
+			await asyncio.gather(self._refill_task, return_exceptions=True)
+		idle, self._idle = self._idle, []
+		await asyncio.gather(*(worker.close() for worker in idle), return_exceptions=True)
+
+	def abandon(self) -> None:
+		"""Kill the idle workers without awaiting them, for pools whose event loop is gone"""
+		idle, self._idle = self._idle, []
+		for worker in idle:
+			worker.abandon()
+
+
+# One pool per event loop: worker pipes are bound to the loop that started them
+_default_pools: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, CodeWorkerPool]' = weakref.WeakKeyDictionary()
+
+
+def get_worker_pool() -> CodeWorkerPool:
+	"""Pool of the running event loop used by CodeAgent(use_worker=True) when no pool is passed."""
+	loop = asyncio.get_running_loop()
+	pool = _default_pools.get(loop)
+	if pool is None:
+		# Stop the warm workers of pools whose loop has finished
+		for stale_loop, stale_pool in list(_default_pools.items()):
+			if stale_loop.is_closed():
+				stale_pool.abandon()
+				del _default_pools[stale_loop]
+		pool = _default_pools[loop] = CodeWorkerPool()
+	return pool
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+
+class _CPULimitExceeded(Exception):
+	pass
+
+
+class _WorkerServer:
+	def __init__(self, reader: asyncio.StreamReader, out: io.BufferedWriter, cpu_seconds: int | None):
+		from aeternus.code_use.namespace import create_library_namespace
+
+		self.reader = reader
+		self.out = out
+		self.cpu_seconds = cpu_seconds
+		self.namespace = create_library_namespace()
+		self.kernel = CodeKernel(self.namespace)
+		self._base_names = set(self.namespace)
+		self._helper_names: set[str] = set()
+		self._pending: dict[int, asyncio.Future] = {}
+		self._next_call_id = 0
+		self._cell_task: asyncio.Task | None = None
+
+	def _send(self, message: dict[str, Any]) -> None:
+		self.out.write(_dumps(message))
+		self.out.flush()
+
+	def _make_proxy(self, name: str) -> Callable[..., Awaitable[Any]]:
+		async def proxy(*args: Any, **kwargs: Any) -> Any:
+			self._next_call_id += 1
+			call_id = self._next_call_id
+			future = asyncio.get_running_loop().create_future()
+			self._pending[call_id] = future
+			self._send({'type': 'call', 'id': call_id, 'name': name, 'args': args, 'kwargs': kwargs})
+			return await future
+
+		proxy.__name__ = name
+		return proxy
+
+	def _resolve_reply(self, message: dict[str, Any]) -> None:
+		future = self._pending.pop(message['id'], None)
+		if future is None or future.done():
+			return
+		if 'error_type' in message:
+			future.set_exception(rebuild_cell_exception(CellResult(error_type=message['error_type'], error=message['error'])))
+		else:
+			future.set_result(message.get('value'))
+
+	def _variables(self) -> dict[str, dict[str, Any]]:
+		variables = {}
+		for name, value in self.namespace.items():
+			if name.startswith('_') or name in self._base_names or name in self._helper_names or inspect.ismodule(value):
+				continue
+			try:
+				length = len(value) if isinstance(value, (list, dict, tuple, set, str)) else None
+			except Exception:
+				length = None
+			variables[name] = {'type': type(value).__name__, 'len': length}
+		return variables
+
+	def _set_cpu_limit(self, enabled: bool) -> None:
+		if resource is None or not self.cpu_seconds:
+			return
+		_, hard = resource.getrlimit(resource.RLIMIT_CPU)
+		if enabled:
+			usage = resource.getrusage(resource.RUSAGE_SELF)
+			# Round the time already used up, so the cell always gets at least cpu_seconds of its own
+			soft = math.ceil(usage.ru_utime + usage.ru_stime) + self.cpu_seconds
+			if hard != resource.RLIM_INFINITY:
+				soft = min(soft, hard)
+		else:
+			soft = hard
+		resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+	async def _exec(self, message: dict[str, Any]) -> None:
+		for name in message.get('helpers', []):
+			if name not in self._helper_names:
+				self.namespace[name] = self._make_proxy(name)
+				self._helper_names.add(name)
+		self.namespace.update(message.get('updates', {}))
+
+		result = CellResult()
+		captured = io.StringIO()
+		old_stdout = sys.stdout
+		sys.stdout = captured
+		self._set_cpu_limit(True)
+		try:
+			await self.kernel.run(message['code'])
+		except _CPULimitExceeded:
+			result.error_type = 'TimeoutError'
+			result.error = f'Cell exceeded the CPU time limit of {self.cpu_seconds}s'
+		except SyntaxError as e:
+			result.error_type, result.error = type(e).__name__, e.msg
+			result.lineno, result.offset, result.text = e.lineno, e.offset, e.text
+		except BaseException as e:
+			if isinstance(e, (KeyboardInterrupt, SystemExit)):
+				raise
+			result.error_type, result.error = type(e).__name__, str(e)
+			tb = e.__traceback__
+			while tb is not None:
+				if tb.tb_frame.f_code.co_filename == CELL_FILENAME:
+					result.lineno = tb.tb_lineno
+				tb = tb.tb_next
+		finally:
+			self._set_cpu_limit(False)
+			sys.stdout = old_stdout
+
+		result.output = captured.getvalue() or None
+		result.variables = self._variables()
+		self._send({'type': 'done', 'id': message['id'], **result.__dict__})
+
+	async def serve(self) -> None:
+		self._send({'type': 'ready'})
+		while True:
+			line = await self.reader.readline()
+			if not line:
+				return
+			message = json.loads(line)
+			if message['type'] == 'reply':
+				self._resolve_reply(message)
+			elif message['type'] == 'exec':
+				# Cells run as tasks so replies to their helper calls keep being read
+				self._cell_task = asyncio.create_task(self._exec(message))
+
+
+def _on_sigxcpu(signum: int, frame: Any) -> None:
+	raise _CPULimitExceeded()
+
+
+async def _main(cpu_seconds: int | None) -> None:
+	# The protocol owns the original stdout; stray writes to fd 1 (C extensions, subprocesses) go to stderr
+	out = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+	os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+	loop = asyncio.get_running_loop()
+	reader = asyncio.StreamReader(limit=_STREAM_LIMIT)
+	await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+	await _WorkerServer(reader, out, cpu_seconds).serve()
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description='Subprocess kernel for code-use cells')
+	parser.add_argument('--cpu-seconds', type=int, default=None)
+	parser.add_argument('--memory-mb', type=int, default=None)
+	args = parser.parse_args()
+
+	if resource is not None:
+		if args.memory_mb:
+			limit = args.memory_mb * 1024 * 1024
+			resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+		if args.cpu_seconds:
+			signal.signal(signal.SIGXCPU, _on_sigxcpu)
+	asyncio.run(_main(args.cpu_seconds))
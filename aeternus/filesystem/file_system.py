@@ -1,17 +1,41 @@
 import asyncio
 import base64
+import logging
 import os
 import re
 import shutil
+import threading
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, ClassVar
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from aeternus.utils import create_task_with_error_handling
+
+logger = logging.getLogger(__name__)
 
 INVALID_FILENAME_ERROR_MESSAGE = 'Error: Invalid filename format. Must be alphanumeric with supported extension.'
 DEFAULT_FILE_SYSTEM_PATH = 'browseruse_agent_data'
+# Seconds after a write before buffered file changes are flushed in the background
+DEFAULT_FLUSH_DELAY = 1.0
+
+_io_executor: ThreadPoolExecutor | None = None
+_io_executor_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+	"""Thread pool shared by all file systems for disk writes."""
+	global _io_executor
+	with _io_executor_lock:
+		if _io_executor is None:
+			_io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='filesystem_io')
+		return _io_executor
+
+
+async def run_io(func, *args) -> Any:
+	return await asyncio.get_running_loop().run_in_executor(get_io_executor(), func, *args)
 
 
 class FileSystemError(Exception):
@@ -21,11 +45,30 @@ class FileSystemError(Exception):
 
 
 class BaseFile(BaseModel, ABC):
-	"""Base class for all file types"""
+	"""Base class for all file types
+
+	The in-memory content is the source of truth. Text files are write-behind: changes are
+	only recorded, and FileSystem.flush() writes them out, appending just the new tail for
+	appendable formats and rewriting the file once for everything else.
+	"""
 
 	name: str
 	content: str = ''
 
+	# Buffered until FileSystem.flush() (binary formats are rendered and written immediately)
+	write_behind: ClassVar[bool] = True
+	# Appends go to disk as O_APPEND writes of the new tail only
+	appendable: ClassVar[bool] = False
+
+	# Appended pieces not yet joined into content, so a run of appends costs O(total size) instead of O(n^2)
+	_appends: list[str] = PrivateAttr(default_factory=list)
+	_appends_length: int = PrivateAttr(default=0)
+	# The first _disk_length characters of the full content are what the file on disk holds, unless _needs_rewrite
+	_disk_length: int = PrivateAttr(default=0)
+	_needs_rewrite: bool = PrivateAttr(default=True)
+	# Bumped on every change, lets FileSystem.get_state() reuse snapshots of unchanged files
+	_version: int = PrivateAttr(default=0)
+
 	# --- Subclass must define this ---
 	@property
 	@abstractmethod
@@ -39,31 +82,95 @@ class BaseFile(BaseModel, ABC):
 
 	def append_file_content(self, content: str) -> None:
 		"""Append content to internal content"""
-		self.update_content(self.content + content)
+		self._appends.append(content)
+		self._appends_length += len(content)
+		self._version += 1
+		if not self.appendable:
+			self._needs_rewrite = True
 
 	# --- These are shared and implemented here ---
 
 	def update_content(self, content: str) -> None:
+		self._appends.clear()
+		self._appends_length = 0
 		self.content = content
+		self._version += 1
+		self._needs_rewrite = True
+
+	def _join_appends(self) -> None:
+		if self._appends:
+			self.content = self.content + ''.join(self._appends)
+			self._appends.clear()
+			self._appends_length = 0
+
+	@property
+	def _length(self) -> int:
+		return len(self.content) + self._appends_length
+
+	@property
+	def is_dirty(self) -> bool:
+		return self._needs_rewrite or self._length != self._disk_length
+
+	def take_pending_write(self) -> tuple[str, str] | None:
+		"""Return (mode, text) to bring the disk copy up to date and mark it as written.
+
+		Called on the event loop so the snapshot is consistent, the write itself can then run in a thread.
+		Call mark_write_failed() if writing it fails.
+		"""
+		if not self.is_dirty:
+			return None
+		if self._needs_rewrite or self._length < self._disk_length:
+			self._join_appends()
+			pending = ('w', self.content)
+		elif self._disk_length >= len(self.content):
+			# Only appended pieces are new, no need to join them into content yet
+			appended = ''.join(self._appends)
+			self._appends[:] = [appended]
+			pending = ('a', appended[self._disk_length - len(self.content) :])
+		else:
+			self._join_appends()
+			pending = ('a', self.content[self._disk_length :])
+		self._disk_length = self._length
+		self._needs_rewrite = False
+		return pending
+
+	def mark_write_failed(self) -> None:
+		self._needs_rewrite = True
+
+	def write_pending_sync(self, path: Path, pending: tuple[str, str]) -> None:
+		mode, text = pending
+		with open(path / self.full_name, mode, encoding='utf-8') as f:
+			f.write(text)
 
 	def sync_to_disk_sync(self, path: Path) -> None:
 		file_path = path / self.full_name
-		file_path.write_text(self.content)
+		content = self.read()
+		file_path.write_text(content, encoding='utf-8')
+		self._disk_length = len(content)
+		self._needs_rewrite = False
 
 	async def sync_to_disk(self, path: Path) -> None:
-		file_path = path / self.full_name
-		with ThreadPoolExecutor() as executor:
-			await asyncio.get_event_loop().run_in_executor(executor, lambda: file_path.write_text(self.content))
+		pending = self.take_pending_write()
+		if pending is None:
+			return
+		try:
+			await run_io(self.write_pending_sync, path, pending)
+		except Exception:
+			self.mark_write_failed()
+			raise
 
 	async def write(self, content: str, path: Path) -> None:
 		self.write_file_content(content)
-		await self.sync_to_disk(path)
+		if not self.write_behind:
+			await self.sync_to_disk(path)
 
 	async def append(self, content: str, path: Path) -> None:
 		self.append_file_content(content)
-		await self.sync_to_disk(path)
+		if not self.write_behind:
+			await self.sync_to_disk(path)
 
 	def read(self) -> str:
+		self._join_appends()
 		return self.content
 
 	@property
@@ -72,16 +179,18 @@ class BaseFile(BaseModel, ABC):
 
 	@property
 	def get_size(self) -> int:
-		return len(self.content)
+		return self._length
 
 	@property
 	def get_line_count(self) -> int:
-		return len(self.content.splitlines())
+		return len(self.read().splitlines())
 
 
 class MarkdownFile(BaseFile):
 	"""Markdown file implementation"""
 
+	appendable: ClassVar[bool] = True
+
 	@property
 	def extension(self) -> str:
 		return 'md'
@@ -90,6 +199,8 @@ class MarkdownFile(BaseFile):
 class TxtFile(BaseFile):
 	"""Plain text file implementation"""
 
+	appendable: ClassVar[bool] = True
+
 	@property
 	def extension(self) -> str:
 		return 'txt'
@@ -106,6 +217,8 @@ class JsonFile(BaseFile):
 class CsvFile(BaseFile):
 	"""CSV file implementation"""
 
+	appendable: ClassVar[bool] = True
+
 	@property
 	def extension(self) -> str:
 		return 'csv'
@@ -114,6 +227,8 @@ class CsvFile(BaseFile):
 class JsonlFile(BaseFile):
 	"""JSONL (JSON Lines) file implementation"""
 
+	appendable: ClassVar[bool] = True
+
 	@property
 	def extension(self) -> str:
 		return 'jsonl'
@@ -122,6 +237,8 @@ class JsonlFile(BaseFile):
 class PdfFile(BaseFile):
 	"""PDF file implementation"""
 
+	write_behind: ClassVar[bool] = False
+
 	@property
 	def extension(self) -> str:
 		return 'pdf'
@@ -142,7 +259,7 @@ class PdfFile(BaseFile):
 			# Convert markdown content to simple text and add to PDF
 			# For basic implementation, we'll treat content as plain text
 			# This avoids the AGPL license issue while maintaining functionality
-			content_lines = self.content.split('\n')
+			content_lines = self.read().split('\n')
 
 			for line in content_lines:
 				if line.strip():
@@ -160,17 +277,20 @@ class PdfFile(BaseFile):
 					story.append(Spacer(1, 6))
 
 			doc.build(story)
+			self._disk_length = self._length
+			self._needs_rewrite = False
 		except Exception as e:
 			raise FileSystemError(f"Error: Could not write to file '{self.full_name}'. {str(e)}")
 
 	async def sync_to_disk(self, path: Path) -> None:
-		with ThreadPoolExecutor() as executor:
-			await asyncio.get_event_loop().run_in_executor(executor, lambda: self.sync_to_disk_sync(path))
+		await run_io(self.sync_to_disk_sync, path)
 
 
 class DocxFile(BaseFile):
 	"""DOCX file implementation"""
 
+	write_behind: ClassVar[bool] = False
+
 	@property
 	def extension(self) -> str:
 		return 'docx'
@@ -183,7 +303,7 @@ class DocxFile(BaseFile):
 			doc = Document()
 
 			# Convert content to DOCX paragraphs
-			content_lines = self.content.split('\n')
+			content_lines = self.read().split('\n')
 
 			for line in content_lines:
 				if line.strip():
@@ -200,12 +320,13 @@ class DocxFile(BaseFile):
 					doc.add_paragraph()  # Empty paragraph for spacing
 
 			doc.save(str(file_path))
+			self._disk_length = self._length
+			self._needs_rewrite = False
 		except Exception as e:
 			raise FileSystemError(f"Error: Could not write to file '{self.full_name}'. {str(e)}")
 
 	async def sync_to_disk(self, path: Path) -> None:
-		with ThreadPoolExecutor() as executor:
-			await asyncio.get_event_loop().run_in_executor(executor, lambda: self.sync_to_disk_sync(path))
+		await run_io(self.sync_to_disk_sync, path)
 
 
 class FileSystemState(BaseModel):
@@ -217,9 +338,15 @@ class FileSystemState(BaseModel):
 
 
 class FileSystem:
-	"""Enhanced file system with in-memory storage and multiple file type support"""
+	"""Enhanced file system with in-memory storage and multiple file type support
 
-	def __init__(self, base_dir: str | Path, create_default_files: bool = True):
+	Text file changes are written behind: a flush is scheduled flush_delay seconds after the
+	first unflushed change, so bursts of writes and appends coalesce into one disk write per
+	file. Call flush() before handing file paths to anything that reads from disk (the agent
+	flushes at every step boundary).
+	"""
+
+	def __init__(self, base_dir: str | Path, create_default_files: bool = True, flush_delay: float = DEFAULT_FLUSH_DELAY):
 		# Handle the Path conversion before calling super().__init__
 		self.base_dir = Path(base_dir) if isinstance(base_dir, str) else base_dir
 		self.base_dir.mkdir(parents=True, exist_ok=True)
@@ -241,6 +368,12 @@ class FileSystem:
 			'docx': DocxFile,
 		}
 
+		self.flush_delay = flush_delay
+		self._flush_handle: asyncio.TimerHandle | None = None
+		self._flush_lock = asyncio.Lock()
+		# full filename -> (file version, snapshot entry), see get_state()
+		self._state_cache: dict[str, tuple[int, dict[str, Any]]] = {}
+
 		self.files = {}
 		if create_default_files:
 			self.default_files = ['todo.md']
@@ -285,6 +418,58 @@ class FileSystem:
 		"""Get the file system directory"""
 		return self.data_dir
 
+	def _schedule_flush(self) -> None:
+		if self._flush_handle is not None:
+			return
+		try:
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			self.flush_sync()
+			return
+		self._flush_handle = loop.call_later(self.flush_delay, self._start_background_flush)
+
+	def _start_background_flush(self) -> None:
+		self._flush_handle = None
+		create_task_with_error_handling(self.flush(), name='file_system_flush', logger_instance=logger, suppress_exceptions=True)
+
+	def _after_change(self, file_obj: BaseFile) -> None:
+		if file_obj.write_behind:
+			self._schedule_flush()
+
+	async def flush(self) -> None:
+		"""Write all buffered changes to disk, one write per changed file."""
+		if self._flush_handle is not None:
+			self._flush_handle.cancel()
+			self._flush_handle = None
+
+		async with self._flush_lock:
+			pending = [(f, w) for f in self.files.values() if f.write_behind and (w := f.take_pending_write())]
+			if not pending:
+				return
+
+			def write_all() -> list[tuple[BaseFile, Exception]]:
+				failures = []
+				for file_obj, write in pending:
+					try:
+						file_obj.write_pending_sync(self.data_dir, write)
+					except Exception as e:
+						failures.append((file_obj, e))
+				return failures
+
+			for file_obj, error in await run_io(write_all):
+				file_obj.mark_write_failed()
+				logger.warning(f'💾 Could not write {file_obj.full_name} to disk: {type(error).__name__}: {error}')
+
+	def flush_sync(self) -> None:
+		"""Blocking flush, for callers outside the event loop."""
+		for file_obj in self.files.values():
+			if file_obj.write_behind and (write := file_obj.take_pending_write()):
+				try:
+					file_obj.write_pending_sync(self.data_dir, write)
+				except Exception as e:
+					file_obj.mark_write_failed()
+					logger.warning(f'💾 Could not write {file_obj.full_name} to disk: {type(e).__name__}: {e}')
+
 	def get_file(self, full_filename: str) -> BaseFile | None:
 		"""Get a file object by full filename"""
 		if not self._is_valid_filename(full_filename):
@@ -436,6 +621,7 @@ class FileSystem:
 
 			# Use file-specific write method
 			await file_obj.write(content, self.data_dir)
+			self._after_change(file_obj)
 			return f'Data written to file {full_filename} successfully.'
 		except FileSystemError as e:
 			return str(e)
@@ -453,6 +639,7 @@ class FileSystem:
 
 		try:
 			await file_obj.append(content, self.data_dir)
+			self._after_change(file_obj)
 			return f'Data appended to file {full_filename} successfully.'
 		except FileSystemError as e:
 			return str(e)
@@ -475,6 +662,7 @@ class FileSystem:
 			content = file_obj.read()
 			content = content.replace(old_str, new_str)
 			await file_obj.write(content, self.data_dir)
+			self._after_change(file_obj)
 			return f'Successfully replaced all occurrences of "{old_str}" with "{new_str}" in file {full_filename}'
 		except FileSystemError as e:
 			return str(e)
@@ -488,6 +676,7 @@ class FileSystem:
 		file_obj = MarkdownFile(name=initial_filename)
 		await file_obj.write(content, self.data_dir)
 		self.files[extracted_filename] = file_obj
+		self._after_change(file_obj)
 		self.extracted_content_count += 1
 		return extracted_filename
 
@@ -570,10 +759,20 @@ class FileSystem:
 		return todo_file.read() if todo_file else ''
 
 	def get_state(self) -> FileSystemState:
-		"""Get serializable state of the file system"""
+		"""Get serializable state of the file system
+
+		Incremental: entries of files unchanged since the previous snapshot are reused as is.
+		"""
 		files_data = {}
 		for full_filename, file_obj in self.files.items():
-			files_data[full_filename] = {'type': file_obj.__class__.__name__, 'data': file_obj.model_dump()}
+			cached = self._state_cache.get(full_filename)
+			if cached is None or cached[0] != file_obj._version:
+				file_obj.read()
+				cached = (file_obj._version, {'type': file_obj.__class__.__name__, 'data': file_obj.model_dump()})
+				self._state_cache[full_filename] = cached
+			files_data[full_filename] = cached[1]
+		for full_filename in self._state_cache.keys() - self.files.keys():
+			del self._state_cache[full_filename]
 
 		return FileSystemState(
 			files=files_data, base_dir=str(self.base_dir), extracted_content_count=self.extracted_content_count
@@ -581,6 +780,9 @@ class FileSystem:
 
 	def nuke(self) -> None:
 		"""Delete the file system directory"""
+		if self._flush_handle is not None:
+			self._flush_handle.cancel()
+			self._flush_handle = None
 		shutil.rmtree(self.data_dir)
 
 	@classmethod
@@ -0,0 +1,278 @@
+"""
+Structure-aware streaming chunker for page markdown.
+
+Markdown from extract_clean_markdown() is read line by line and grouped into blocks (headings, paragraphs,
+lists, tables, fenced code). Blocks are packed into chunks under a token budget and never split across a
+chunk boundary unless a single block is larger than the budget, in which case tables are split by rows
+(repeating the header), code by lines, and prose by sentences. Every chunk carries the heading path it
+belongs to and its character range in the markdown.
+
+Everything is generator based: iter_chunks() holds at most one chunk worth of blocks at a time.
+"""
+
+import io
+import re
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+
+# Rough characters per token for English text, used when no tokenizer is given
+CHARS_PER_TOKEN = 4
+
+_HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_LIST_ITEM_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+_TABLE_SEPARATOR_RE = re.compile(r'^\s*\|?\s*:?-{3,}:?\s*(?:\|\s*:?-{3,}:?\s*)*\|?\s*$')
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+@dataclass
+class MarkdownBlock:
+	"""A structural unit of markdown that should stay together if it fits in a chunk."""
+
+	kind: str  # 'heading' | 'paragraph' | 'list' | 'table' | 'code'
+	text: str
+	start: int  # character offsets into the markdown
+	end: int
+	level: int = 0  # heading level, 0 for other blocks
+
+
+@dataclass
+class TextChunk:
+	text: str
+	heading_path: list[str] = field(default_factory=list)
+	start_offset: int = 0
+	end_offset: int = 0
+	token_count: int = 0
+
+	@property
+	def section(self) -> str:
+		return ' > '.join(self.heading_path)
+
+
+def estimate_tokens(text: str) -> int:
+	return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def iter_markdown_blocks(markdown: str | Iterable[str]) -> Iterator[MarkdownBlock]:
+	"""Group markdown lines into blocks. Accepts a string or any iterable of lines (with or without newlines)."""
+	lines = io.StringIO(markdown) if isinstance(markdown, str) else markdown
+
+	offset = 0
+	kind: str | None = None
+	buffer: list[str] = []
+	block_start = 0
+
+	def flush() -> MarkdownBlock | None:
+		nonlocal kind, buffer
+		if kind is None:
+			return None
+		text = ''.join(buffer).rstrip('\n')
+		block = MarkdownBlock(kind, text, block_start, block_start + len(text))
+		kind, buffer = None, []
+		return block
+
+	for raw_line in lines:
+		line = raw_line if raw_line.endswith('\n') else raw_line + '\n'
+		line_start = offset
+		offset += len(line)
+		stripped = line.strip()
+
+		# Inside a fenced code block everything belongs to it until the closing fence
+		if kind == 'code':
+			buffer.append(line)
+			if stripped.startswith('```') and len(buffer) > 1:
+				if block := flush():
+					yield block
+			continue
+
+		if not stripped:
+			if block := flush():
+				yield block
+			continue
+
+		if stripped.startswith('```'):
+			line_kind = 'code'
+		elif _HEADING_RE.match(stripped):
+			line_kind = 'heading'
+		elif stripped.startswith('|'):
+			line_kind = 'table'
+		elif _LIST_ITEM_RE.match(line) or (kind == 'list' and line[:1] in ' \t'):
+			# Indented continuation lines stay with their list item
+			line_kind = 'list'
+		else:
+			line_kind = 'paragraph'
+
+		# Lists and tables span lines, every heading or paragraph line is its own block
+		if kind is not None and (line_kind != kind or line_kind in ('heading', 'paragraph')):
+			if block := flush():
+				yield block
+
+		if kind is None:
+			kind = line_kind
+			block_start = line_start
+		buffer.append(line)
+
+		if line_kind == 'heading':
+			match = _HEADING_RE.match(stripped)
+			assert match is not None
+			block = flush()
+			assert block is not None
+			block.level = len(match.group(1))
+			block.text = stripped
+			yield block
+
+	if block := flush():
+		yield block
+
+
+def _line_spans(text: str) -> list[tuple[str, int, int]]:
+	"""Lines of text with their (start, end) offsets in text."""
+	spans, start = [], 0
+	for line in text.split('\n'):
+		spans.append((line, start, start + len(line)))
+		start += len(line) + 1
+	return spans
+
+
+def _sentence_spans(text: str) -> list[tuple[str, int, int]]:
+	"""Sentences of text with their (start, end) offsets in text; the whitespace between them belongs to neither."""
+	spans, start = [], 0
+	for match in _SENTENCE_END_RE.finditer(text):
+		spans.append((text[start : match.start()], start, match.start()))
+		start = match.end()
+	spans.append((text[start:], start, len(text)))
+	return spans
+
+
+def _split_oversized(block: MarkdownBlock, max_tokens: int, count_tokens: Callable[[str], int]) -> Iterator[MarkdownBlock]:
+	"""Split a block that alone exceeds the budget into pieces that fit.
+
+	Each piece's offsets are the source range of the units it contains. A repeated table header is not part of it.
+	"""
+	if block.kind == 'table':
+		rows = _line_spans(block.text)
+		# Repeat the header (and separator row) on every piece so each stays a readable table
+		header_rows = 2 if len(rows) > 1 and _TABLE_SEPARATOR_RE.match(rows[1][0]) else 1
+		header, units = rows[:header_rows], rows[header_rows:]
+		joiner = '\n'
+		prefix = '\n'.join(row for row, _, _ in header) + '\n'
+	elif block.kind in ('code', 'list'):
+		units, joiner, prefix = _line_spans(block.text), '\n', ''
+	else:
+		units, joiner, prefix = _sentence_spans(block.text), ' ', ''
+
+	# Very long single units (minified lines, sentences without punctuation) are cut by words
+	budget_chars = max_tokens * CHARS_PER_TOKEN
+	expanded: list[tuple[str, int, int]] = []
+	for unit, unit_start, unit_end in units:
+		if count_tokens(unit) <= max_tokens:
+			expanded.append((unit, unit_start, unit_end))
+			continue
+		current, current_start, word_start = '', unit_start, unit_start
+		for word in unit.split(' '):
+			next_word_start = word_start + len(word) + 1
+			while len(word) > budget_chars:
+				if current:
+					expanded.append((current, current_start, current_start + len(current)))
+					current = ''
+				expanded.append((word[:budget_chars], word_start, word_start + budget_chars))
+				word = word[budget_chars:]
+				word_start += budget_chars
+			candidate = f'{current} {word}' if current else word
+			if current and count_tokens(candidate) > max_tokens:
+				expanded.append((current, current_start, current_start + len(current)))
+				candidate = word
+			if not current or candidate == word:
+				current_start = word_start
+			current = candidate
+			word_start = next_word_start
+		if current:
+			expanded.append((current, current_start, current_start + len(current)))
+
+	piece: list[tuple[str, int, int]] = []
+
+	def make_piece() -> MarkdownBlock:
+		text = prefix + joiner.join(unit for unit, _, _ in piece)
+		return MarkdownBlock(block.kind, text, block.start + piece[0][1], block.start + piece[-1][2])
+
+	for unit in expanded:
+		candidate = prefix + joiner.join([u for u, _, _ in piece] + [unit[0]])
+		if piece and count_tokens(candidate) > max_tokens:
+			yield make_piece()
+			piece = []
+		piece.append(unit)
+	if piece:
+		yield make_piece()
+
+
+def iter_chunks(
+	markdown: str | Iterable[str],
+	max_tokens: int = 256,
+	overlap_tokens: int = 0,
+	count_tokens: Callable[[str], int] = estimate_tokens,
+) -> Iterator[TextChunk]:
+	"""Yield chunks along heading, paragraph, list, table and code boundaries, each at most max_tokens.
+
+	A new heading always starts a new chunk. With overlap_tokens, trailing blocks of the previous chunk
+	(up to that many tokens, same section only) are repeated at the start of the next one.
+	"""
+	heading_path: list[tuple[int, str]] = []
+	blocks: list[MarkdownBlock] = []
+	tokens = 0
+
+	def emit() -> TextChunk | None:
+		# Sections without any content are already represented by the heading_path of their subsections
+		if all(b.kind == 'heading' for b in blocks):
+			return None
+		text = '\n'.join(b.text for b in blocks)
+		return TextChunk(
+			text=text,
+			heading_path=[title for _, title in heading_path],
+			start_offset=blocks[0].start,
+			end_offset=blocks[-1].end,
+			token_count=count_tokens(text),
+		)
+
+	def carry_over() -> tuple[list[MarkdownBlock], int]:
+		kept: list[MarkdownBlock] = []
+		kept_tokens = 0
+		for b in reversed(blocks):
+			b_tokens = count_tokens(b.text)
+			if b.kind == 'heading' or kept_tokens + b_tokens > overlap_tokens:
+				break
+			kept.insert(0, b)
+			kept_tokens += b_tokens
+		return kept, kept_tokens
+
+	for block in iter_markdown_blocks(markdown):
+		if block.kind == 'heading':
+			if chunk := emit():
+				yield chunk
+			blocks, tokens = [], 0
+			title = _HEADING_RE.match(block.text).group(2)  # type: ignore[union-attr]
+			while heading_path and heading_path[-1][0] >= block.level:
+				heading_path.pop()
+			heading_path.append((block.level, title))
+			blocks.append(block)
+			tokens = count_tokens(block.text)
+			continue
+
+		pieces = [block] if count_tokens(block.text) <= max_tokens else list(_split_oversized(block, max_tokens, count_tokens))
+		for piece in pieces:
+			piece_tokens = count_tokens(piece.text)
+			# Blocks are joined with a newline, which costs about one token
+			if blocks and tokens + piece_tokens + 1 > max_tokens:
+				only_heading = all(b.kind == 'heading' for b in blocks)
+				if not only_heading:
+					if chunk := emit():
+						yield chunk
+					blocks, tokens = carry_over() if overlap_tokens else ([], 0)
+					if tokens + piece_tokens + 1 > max_tokens:
+						blocks, tokens = [], 0
+				else:
+					# The heading does not fit next to its first block, it stays in the chunk's heading_path
+					blocks, tokens = [], 0
+			blocks.append(piece)
+			tokens += piece_tokens + (1 if len(blocks) > 1 else 0)
+
+	if chunk := emit():
+		yield chunk
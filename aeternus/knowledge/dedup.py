@@ -0,0 +1,131 @@
+"""
+Near-duplicate detection for ingested text with 64-bit SimHash fingerprints.
+
+A fingerprint is the bitwise majority vote over the hashes of a text's word 3-gram shingles, so texts that share
+most shingles (the same article behind tracking parameters, AMP pages, mirrors, repeated boilerplate) land within
+a few bits of each other. SimHashIndex finds fingerprints within max_distance bits using the pigeonhole trick:
+with max_distance=3 and four 16-bit bands, any match agrees exactly on at least one band.
+
+Fingerprints live in packed arrays (8 bytes per entry plus 4 bytes per band bucket entry), which keeps millions of
+chunks in memory at a few tens of bytes each.
+"""
+
+import re
+from array import array
+from collections.abc import Iterable
+from hashlib import blake2b
+
+try:
+	import numpy as np
+
+	NUMPY_AVAILABLE = True
+except ImportError:
+	NUMPY_AVAILABLE = False
+
+FINGERPRINT_BITS = 64
+DEFAULT_MAX_DISTANCE = 3
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> list[str]:
+	"""Word n-grams of the normalized text (lowercase, punctuation and markdown syntax ignored)."""
+	words = _WORD_RE.findall(text.lower())
+	if len(words) <= size:
+		return [' '.join(words)] if words else []
+	return [' '.join(words[i : i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text: str) -> int:
+	"""64-bit SimHash of a text, 0 for text without words."""
+	hashes = [int.from_bytes(blake2b(s.encode('utf-8', errors='surrogatepass'), digest_size=8).digest(), 'little') for s in shingles(text)]
+	if not hashes:
+		return 0
+
+	if NUMPY_AVAILABLE:
+		# Bit i of column i is bit i of the little-endian integer, same as the pure Python path below
+		packed = np.array(hashes, dtype='<u8').view(np.uint8)
+		counts = np.unpackbits(packed, bitorder='little').reshape(len(hashes), FINGERPRINT_BITS).sum(axis=0)
+		bits = (counts * 2 > len(hashes)).astype(np.uint8)
+		return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+	fingerprint = 0
+	for bit in range(FINGERPRINT_BITS):
+		if sum((h >> bit) & 1 for h in hashes) * 2 > len(hashes):
+			fingerprint |= 1 << bit
+	return fingerprint
+
+
+def to_signed(fingerprint: int) -> int:
+	"""Map an unsigned 64-bit fingerprint into SQLite's signed INTEGER range."""
+	return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+	return value + (1 << 64) if value < 0 else value
+
+
+class SimHashIndex:
+	"""
+	Fingerprints keyed by small dense integers (e.g. vector store row ids) with near-duplicate lookup.
+
+	Supports max_distance up to bands - 1.
+	"""
+
+	def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE, bands: int = 4):
+		if FINGERPRINT_BITS % bands or max_distance >= bands:
+			raise ValueError(f'Need max_distance < bands and bands dividing {FINGERPRINT_BITS}, got {max_distance} and {bands}')
+		self.max_distance = max_distance
+		self.bands = bands
+		self._band_bits = FINGERPRINT_BITS // bands
+		self._band_mask = (1 << self._band_bits) - 1
+		self._fingerprints = array('Q')
+		self._alive = bytearray()
+		self._buckets: dict[int, array] = {}
+		self._size = 0
+
+	def __len__(self) -> int:
+		return self._size
+
+	def _bucket_keys(self, fingerprint: int) -> Iterable[int]:
+		for band in range(self.bands):
+			yield (band << self._band_bits) | ((fingerprint >> (band * self._band_bits)) & self._band_mask)
+
+	def add(self, key: int, fingerprint: int) -> None:
+		if key >= len(self._fingerprints):
+			grow = key + 1 - len(self._fingerprints)
+			self._fingerprints.extend([0] * grow)
+			self._alive.extend(bytes(grow))
+		elif self._alive[key]:
+			self.remove(key)
+
+		self._fingerprints[key] = fingerprint
+		self._alive[key] = 1
+		self._size += 1
+		for bucket_key in self._bucket_keys(fingerprint):
+			bucket = self._buckets.get(bucket_key)
+			if bucket is None:
+				bucket = self._buckets[bucket_key] = array('I')
+			bucket.append(key)
+
+	def remove(self, key: int) -> None:
+		"""Forget a key. Bucket entries are left behind and skipped on lookup."""
+		if key < len(self._alive) and self._alive[key]:
+			self._alive[key] = 0
+			self._size -= 1
+
+	def find(self, fingerprint: int, exclude: set[int] | None = None) -> list[int]:
+		"""Keys whose fingerprint is within max_distance bits, closest first."""
+		matches: dict[int, int] = {}
+		for bucket_key in self._bucket_keys(fingerprint):
+			for key in self._buckets.get(bucket_key, ()):
+				if key in matches or not self._alive[key] or (exclude and key in exclude):
+					continue
+				distance = (self._fingerprints[key] ^ fingerprint).bit_count()
+				if distance <= self.max_distance:
+					matches[key] = distance
+		return sorted(matches, key=matches.__getitem__)
+
+	def contains_near(self, fingerprint: int, exclude: set[int] | None = None) -> bool:
+		return bool(self.find(fingerprint, exclude))
@@ -1,17 +1,29 @@
-
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
 from abc import ABC, abstractmethod
-from typing import List
+from array import array
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
 
 class EmbeddingsProvider(ABC):
     """
     Abstract base class for embeddings providers.
     """
-    
+
+    # Identifies the vector space, cached vectors are only reused for the same model name
+    model_name: str = 'default'
+
     @abstractmethod
     async def embed_query(self, text: str) -> List[float]:
         """Embed a single query string."""
         pass
-        
+
     @abstractmethod
     async def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """Embed a list of document strings."""
@@ -21,13 +33,281 @@ class MockEmbeddings(EmbeddingsProvider):
     """
     Mock embeddings provider for testing/development without model dependencies.
     """
-    
+
+    model_name = 'mock'
+
     def __init__(self, dimension: int = 768):
         self.dimension = dimension
-        
+
     async def embed_query(self, text: str) -> List[float]:
         # Return a deterministic random vector based on length
         return [0.1] * self.dimension
-        
+
     async def embed_documents(self, texts: List[str]) -> List[List[float]]:
         return [[0.1] * self.dimension for _ in texts]
+
+class OpenAICompatibleEmbeddings(EmbeddingsProvider):
+    """
+    Embeddings from any server implementing the OpenAI /embeddings endpoint (OpenAI, Azure, vLLM, Ollama, ...).
+    """
+
+    def __init__(
+        self,
+        model: str = 'text-embedding-3-small',
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: float = 60.0,
+        dimensions: Optional[int] = None,
+    ):
+        import httpx
+
+        self.model = model
+        self.model_name = f'openai:{model}' + (f':{dimensions}' if dimensions else '')
+        self.dimensions = dimensions
+        base_url = (base_url or os.getenv('OPENAI_BASE_URL') or 'https://api.openai.com/v1').rstrip('/')
+        api_key = api_key or os.getenv('OPENAI_API_KEY')
+        headers = {'Authorization': f'Bearer {api_key}'} if api_key else {}
+        self._client = httpx.AsyncClient(base_url=base_url, headers=headers, timeout=timeout)
+
+    async def embed_query(self, text: str) -> List[float]:
+        return (await self.embed_documents([text]))[0]
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        payload: dict = {'model': self.model, 'input': texts}
+        if self.dimensions:
+            payload['dimensions'] = self.dimensions
+        response = await self._client.post('/embeddings', json=payload)
+        response.raise_for_status()
+        data = sorted(response.json()['data'], key=lambda item: item['index'])
+        return [item['embedding'] for item in data]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+class LocalEmbeddings(EmbeddingsProvider):
+    """
+    CPU sentence embeddings from an ONNX export of a sentence-transformers model (e.g. all-MiniLM-L6-v2).
+
+    model_dir must contain model.onnx and tokenizer.json. Requires: pip install onnxruntime tokenizers numpy
+    """
+
+    def __init__(self, model_dir: str | Path, max_length: int = 256, batch_size: int = 32):
+        try:
+            import numpy  # noqa: F401
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                'LocalEmbeddings requires optional dependencies. Please install them with: pip install onnxruntime tokenizers numpy'
+            ) from e
+
+        model_dir = Path(model_dir).expanduser()
+        self.model_name = f'local:{model_dir.name}'
+        self.batch_size = batch_size
+        self._tokenizer = Tokenizer.from_file(str(model_dir / 'tokenizer.json'))
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding()
+        self._session = onnxruntime.InferenceSession(str(model_dir / 'model.onnx'), providers=['CPUExecutionProvider'])
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        # onnxruntime sessions are thread safe but we keep one batch in flight to bound memory
+        self._lock = threading.Lock()
+
+    def _embed_sync(self, texts: List[str]) -> List[List[float]]:
+        import numpy as np
+
+        vectors = []
+        with self._lock:
+            for start in range(0, len(texts), self.batch_size):
+                encodings = self._tokenizer.encode_batch(texts[start : start + self.batch_size])
+                input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+                attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+                inputs = {'input_ids': input_ids, 'attention_mask': attention_mask}
+                if 'token_type_ids' in self._input_names:
+                    inputs['token_type_ids'] = np.zeros_like(input_ids)
+                token_embeddings = self._session.run(None, inputs)[0]
+
+                # Mean pooling over real tokens, then L2 normalization (sentence-transformers default)
+                mask = attention_mask[..., None].astype(np.float32)
+                pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+                vectors.extend(pooled.tolist())
+        return vectors
+
+    async def embed_query(self, text: str) -> List[float]:
+        return (await self.embed_documents([text]))[0]
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return await asyncio.to_thread(self._embed_sync, texts)
+
+class BatchingEmbeddings(EmbeddingsProvider):
+    """
+    Micro-batches embed_documents() calls from concurrent callers into shared provider requests.
+
+    Texts are queued until max_batch_size texts are waiting or max_latency seconds have passed since the
+    first one arrived, then sent as one deduplicated batch.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingsProvider,
+        max_batch_size: int = 64,
+        max_latency: float = 0.02,
+        max_concurrent_batches: int = 4,
+    ):
+        self.provider = provider
+        self.model_name = provider.model_name
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.max_concurrent_batches = max_concurrent_batches
+        self._pending: List[tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def embed_query(self, text: str) -> List[float]:
+        # Queries are latency sensitive and some providers embed them differently, so they skip the queue
+        return await self.provider.embed_query(text)
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        self._pending.extend(zip(texts, futures))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_latency, self._flush)
+
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+
+        while self._pending:
+            batch = self._pending[: self.max_batch_size]
+            del self._pending[: self.max_batch_size]
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[tuple[str, asyncio.Future]]) -> None:
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+
+        assert self._semaphore is not None
+        try:
+            async with self._semaphore:
+                vectors = await self.provider.embed_documents(unique_texts)
+            if len(vectors) != len(unique_texts):
+                raise ValueError(f"Embeddings provider returned {len(vectors)} vectors for {len(unique_texts)} texts")
+
+            by_text = dict(zip(unique_texts, vectors))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+        except BaseException as e:
+            # Every caller waiting on this batch has to be released, or its embed_documents call hangs forever
+            for _, future in batch:
+                if not future.done():
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        logger.debug(f'Embedded batch of {len(unique_texts)} texts for {len(batch)} requests')
+
+class EmbeddingCache:
+    """
+    On-disk cache of embeddings keyed by a hash of model name and text, stored as float32 blobs in SQLite.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)')
+        self._db.commit()
+
+    @staticmethod
+    def key(model_name: str, text: str) -> bytes:
+        return hashlib.sha256(f'{model_name}\0{text}'.encode('utf-8', errors='surrogatepass')).digest()
+
+    def get_many(self, keys: List[bytes]) -> dict[bytes, List[float]]:
+        found: dict[bytes, List[float]] = {}
+        with self._lock:
+            # Stay under SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                part = keys[start : start + 500]
+                rows = self._db.execute(
+                    f'SELECT key, vector FROM embeddings WHERE key IN ({",".join("?" * len(part))})', part
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array('f', blob).tolist()
+        return found
+
+    def put_many(self, items: List[tuple[bytes, List[float]]]) -> None:
+        with self._lock:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)',
+                [(key, array('f', vector).tobytes()) for key, vector in items],
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+class CachedEmbeddings(EmbeddingsProvider):
+    """
+    Skips texts that were already embedded with the same model, only cache misses reach the provider.
+
+    Wrap a BatchingEmbeddings to get both: CachedEmbeddings(BatchingEmbeddings(provider), cache_path).
+    """
+
+    def __init__(self, provider: EmbeddingsProvider, cache: EmbeddingCache | str | Path):
+        self.provider = provider
+        self.model_name = provider.model_name
+        self.cache = cache if isinstance(cache, EmbeddingCache) else EmbeddingCache(cache)
+        self.hits = 0
+        self.misses = 0
+
+    async def embed_query(self, text: str) -> List[float]:
+        return await self.provider.embed_query(text)
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        keys = [EmbeddingCache.key(self.model_name, text) for text in texts]
+        cached = await asyncio.to_thread(self.cache.get_many, list(set(keys)))
+
+        missing: dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            vectors = await self.provider.embed_documents(list(missing.values()))
+            fresh = list(zip(missing.keys(), vectors))
+            await asyncio.to_thread(self.cache.put_many, fresh)
+            cached.update(fresh)
+
+        return [cached[key] for key in keys]
@@ -2,10 +2,12 @@
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, Iterator, List, Optional
 
 from aeternus.browser.session import BrowserSession
 from aeternus.dom.markdown_extractor import extract_clean_markdown
+from aeternus.dom.service import DomService
+from aeternus.knowledge.chunking import CHARS_PER_TOKEN, TextChunk, iter_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -17,16 +19,19 @@ class IngestedContent:
     timestamp: datetime
     metadata: dict[str, Any]
     chunks: List[str] = None
+    # Heading path and markdown offsets for each entry in chunks
+    chunk_details: List[TextChunk] = None
 
 class ContentIngestor:
     """
     Handles context-aware content ingestion from browser sessions.
     
-    This class wraps the markdown extraction logic and provides semantic chunking
-    capabilities (initially placeholder) to prepare content for the knowledge layer.
+    This class wraps the markdown extraction logic and splits pages along their
+    structure (headings, paragraphs, lists, tables, code) to prepare content for the knowledge layer.
     """
     
     def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        # Sizes are in characters, converted to the chunker's token budget
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         
@@ -59,43 +64,47 @@ class ContentIngestor:
             # Extract markdown
             content, stats = await extract_clean_markdown(browser_session=browser_session)
             
-            # Perform chunking
-            chunks = self._chunk_content(content)
-            
-            ingested = IngestedContent(
-                url=url,
-                title=title,
-                content=content,
-                timestamp=datetime.now(),
-                metadata=stats,
-                chunks=chunks
-            )
-            
-            logger.info(f"Ingested page '{title}' ({url}) - {len(content)} chars, {len(chunks)} chunks")
+            ingested = self.build_content(url, title, content, stats)
+            logger.info(f"Ingested page '{title}' ({url}) - {len(content)} chars, {len(ingested.chunks)} chunks")
             return ingested
             
         except Exception as e:
             logger.error(f"Failed to ingest page: {e}", exc_info=True)
             return None
-            
-    def _chunk_content(self, content: str) -> List[str]:
+
+    async def ingest_target(self, dom_service: DomService, target_id: str, url: str, title: str) -> Optional[IngestedContent]:
         """
-        Split content into overlapping chunks.
+        Ingest any tab by target id, without touching the agent's focused tab.
         
-        This is a simple character-based splitter. 
-        TODO: Implement semantic splitting using SentenceSplitter or LLM.
+        Raises on extraction errors so background callers can decide whether to retry.
         """
-        if not content:
-            return []
-            
-        chunks = []
-        start = 0
-        content_len = len(content)
-        
-        while start < content_len:
-            end = start + self.chunk_size
-            chunk = content[start:end]
-            chunks.append(chunk)
-            start += self.chunk_size - self.chunk_overlap
+        content, stats = await extract_clean_markdown(dom_service=dom_service, target_id=target_id)
+        ingested = self.build_content(url, title, content, stats)
+        logger.debug(f"Ingested tab '{title}' ({url}) - {len(content)} chars, {len(ingested.chunks)} chunks")
+        return ingested
+
+    def build_content(self, url: str, title: str, content: str, stats: dict[str, Any]) -> IngestedContent:
+        """Chunk extracted markdown into an IngestedContent."""
+        chunk_details = list(self._chunk_content(content))
+        return IngestedContent(
+            url=url,
+            title=title,
+            content=content,
+            timestamp=datetime.now(),
+            metadata=stats,
+            chunks=[chunk.text for chunk in chunk_details],
+            chunk_details=chunk_details
+        )
             
-        return chunks
+    def _chunk_content(self, content: str) -> Iterator[TextChunk]:
+        """
+        Split content into chunks along markdown structure, each under the chunk_size budget.
+        """
+        if not content:
+            return iter(())
+
+        return iter_chunks(
+            content,
+            max_tokens=max(1, self.chunk_size // CHARS_PER_TOKEN),
+            overlap_tokens=self.chunk_overlap // CHARS_PER_TOKEN,
+        )
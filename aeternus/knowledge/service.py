@@ -0,0 +1,233 @@
+"""
+Background ingestion of every page the browser finishes loading into the knowledge store.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from aeternus.browser.events import NavigationCompleteEvent
+from aeternus.browser.session import BrowserSession
+from aeternus.dom.service import DomService
+from aeternus.knowledge.dedup import SimHashIndex, simhash
+from aeternus.knowledge.embeddings import EmbeddingsProvider
+from aeternus.knowledge.ingestion import ContentIngestor
+from aeternus.knowledge.store import VectorStore
+from aeternus.utils import create_task_with_error_handling
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestionJob:
+	target_id: str
+	url: str
+	queued_at: float
+
+
+@dataclass
+class IngestionStats:
+	queued: int = 0
+	ingested: int = 0
+	dropped_queue_full: int = 0
+	skipped_duplicate_url: int = 0
+	skipped_duplicate_content: int = 0
+	skipped_stale: int = 0
+	failed: int = 0
+
+
+class IngestionService:
+	"""
+	Feeds the knowledge store from NavigationCompleteEvent on the session event bus, for every tab.
+
+	The event handler only enqueues, extraction, chunking, embedding and indexing happen on a bounded pool of
+	worker tasks, so agent steps never wait on ingestion. Backpressure: when the queue is full new pages are
+	dropped (they will be picked up on the next visit). Pages on the same domain are spaced by
+	min_domain_interval seconds, and pages are skipped when their URL was ingested within revisit_interval
+	seconds or their content is a near-duplicate (SimHash) of a page ingested under another URL.
+	"""
+
+	def __init__(
+		self,
+		browser_session: BrowserSession,
+		store: VectorStore,
+		embeddings: EmbeddingsProvider,
+		ingestor: ContentIngestor | None = None,
+		max_workers: int = 2,
+		max_queue_size: int = 32,
+		min_domain_interval: float = 2.0,
+		revisit_interval: float = 300.0,
+		settle_delay: float = 1.0,
+		max_tracked_pages: int = 10000,
+	):
+		self.browser_session = browser_session
+		self.store = store
+		self.embeddings = embeddings
+		self.ingestor = ingestor or ContentIngestor()
+		self.max_workers = max_workers
+		self.min_domain_interval = min_domain_interval
+		self.revisit_interval = revisit_interval
+		self.settle_delay = settle_delay
+		self.max_tracked_pages = max_tracked_pages
+		self.stats = IngestionStats()
+
+		self._queue: asyncio.Queue[IngestionJob] = asyncio.Queue(maxsize=max_queue_size)
+		self._workers: list[asyncio.Task] = []
+		self._dom_service: DomService | None = None
+		self._running = False
+		self._pending_urls: set[str] = set()
+		self._domain_next_allowed: dict[str, float] = {}
+		# url -> monotonic time of last ingestion (bounded LRU)
+		self._recent_urls: OrderedDict[str, float] = OrderedDict()
+		# Page fingerprints, keyed by position in _page_urls
+		self._page_index = SimHashIndex()
+		self._page_keys: dict[str, int] = {}
+		self._page_urls: list[str] = []
+		self._registered_bus_ids: set[int] = set()
+
+	def start(self) -> None:
+		"""Subscribe to navigation events and start the workers."""
+		if self._running:
+			return
+		self._running = True
+
+		# BrowserSession.kill() replaces the event bus, register once per bus instance
+		event_bus = self.browser_session.event_bus
+		if id(event_bus) not in self._registered_bus_ids:
+			event_bus.on(NavigationCompleteEvent, self.on_NavigationCompleteEvent)
+			self._registered_bus_ids.add(id(event_bus))
+
+		for i in range(self.max_workers):
+			self._workers.append(
+				create_task_with_error_handling(self._worker(), name=f'knowledge_ingestion_worker_{i}', logger_instance=logger)
+			)
+
+	async def stop(self) -> None:
+		"""Stop the workers, queued pages are discarded."""
+		self._running = False
+		for worker in self._workers:
+			worker.cancel()
+		await asyncio.gather(*self._workers, return_exceptions=True)
+		self._workers.clear()
+		while not self._queue.empty():
+			self._queue.get_nowait()
+		self._pending_urls.clear()
+
+	async def on_NavigationCompleteEvent(self, event: NavigationCompleteEvent) -> None:
+		"""Queue the page for ingestion, never blocks."""
+		if not self._running or event.error_message or not event.url.startswith(('http://', 'https://')):
+			return
+
+		url = event.url
+		if url in self._pending_urls:
+			self.stats.skipped_duplicate_url += 1
+			return
+		last_ingested = self._recent_urls.get(url)
+		if last_ingested is not None and time.monotonic() - last_ingested < self.revisit_interval:
+			self.stats.skipped_duplicate_url += 1
+			return
+
+		try:
+			self._queue.put_nowait(IngestionJob(target_id=event.target_id, url=url, queued_at=time.monotonic()))
+		except asyncio.QueueFull:
+			self.stats.dropped_queue_full += 1
+			logger.debug(f'Ingestion queue full, skipping {url}')
+			return
+		self._pending_urls.add(url)
+		self.stats.queued += 1
+
+	async def _worker(self) -> None:
+		while self._running:
+			job = await self._queue.get()
+			try:
+				# Per-domain rate limit: push the job back until its domain's slot opens, the worker moves on
+				domain = urlparse(job.url).hostname or ''
+				wait = self._domain_next_allowed.get(domain, 0.0) - time.monotonic()
+				if wait > 0:
+					asyncio.get_running_loop().call_later(wait, self._requeue, job)
+					continue
+				self._domain_next_allowed[domain] = time.monotonic() + self.min_domain_interval
+
+				# Give late scripts a moment so the DOM reflects the loaded page
+				settle = self.settle_delay - (time.monotonic() - job.queued_at)
+				if settle > 0:
+					await asyncio.sleep(settle)
+
+				await self._ingest(job)
+			except asyncio.CancelledError:
+				raise
+			except Exception as e:
+				self.stats.failed += 1
+				logger.debug(f'Failed to ingest {job.url}: {type(e).__name__}: {e}')
+				self._pending_urls.discard(job.url)
+			finally:
+				self._queue.task_done()
+
+	def _requeue(self, job: IngestionJob) -> None:
+		if not self._running:
+			self._pending_urls.discard(job.url)
+			return
+		try:
+			self._queue.put_nowait(job)
+		except asyncio.QueueFull:
+			self.stats.dropped_queue_full += 1
+			self._pending_urls.discard(job.url)
+
+	async def _ingest(self, job: IngestionJob) -> None:
+		url = ''
+		try:
+			# The tab may have closed. Otherwise ingest whatever it shows now: the final URL after redirects and
+			# normalization differs from the requested one, and if the tab navigated again this is that newer page
+			target = self.browser_session.session_manager.get_target(job.target_id)
+			url = target.url if target is not None else ''
+			if not url.startswith(('http://', 'https://')):
+				self.stats.skipped_stale += 1
+				return
+			if url != job.url:
+				self._pending_urls.add(url)
+
+			if self._dom_service is None:
+				profile = self.browser_session.browser_profile
+				self._dom_service = DomService(
+					browser_session=self.browser_session,
+					logger=logger,
+					cross_origin_iframes=profile.cross_origin_iframes,
+					paint_order_filtering=profile.paint_order_filtering,
+					max_iframes=profile.max_iframes,
+					max_iframe_depth=profile.max_iframe_depth,
+				)
+
+			ingested = await self.ingestor.ingest_target(self._dom_service, job.target_id, url, target.title)
+			if not ingested or not ingested.chunks:
+				return
+
+			fingerprint = await asyncio.to_thread(simhash, ingested.content)
+			page_key = self._page_keys.get(url)
+			duplicates = self._page_index.find(fingerprint, exclude={page_key} if page_key is not None else None)
+			if duplicates:
+				# Same article under another URL (tracking params, AMP, mirrors), revisits are handled by the store
+				self.stats.skipped_duplicate_content += 1
+				logger.debug(f'Skipping {url}, near-duplicate of {self._page_urls[duplicates[0]]}')
+				return
+
+			await self.store.index_content(ingested, self.embeddings)
+			if page_key is None:
+				page_key = self._page_keys[url] = len(self._page_urls)
+				self._page_urls.append(url)
+			self._page_index.add(page_key, fingerprint)
+			self.stats.ingested += 1
+		finally:
+			# Both the requested and the final URL count as visited, so the redirect target is not queued again
+			now = time.monotonic()
+			for visited_url in {job.url, url} if url else {job.url}:
+				self._pending_urls.discard(visited_url)
+				self._remember(self._recent_urls, visited_url, now)
+
+	def _remember(self, lru: OrderedDict, key, value) -> None:
+		lru[key] = value
+		lru.move_to_end(key)
+		while len(lru) > self.max_tracked_pages:
+			lru.popitem(last=False)
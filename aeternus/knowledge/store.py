@@ -0,0 +1,514 @@
+"""
+Local vector store for ingested page chunks.
+
+Layout of a store directory:
+    vectors.f16 / vectors.f32   memory-mapped embedding matrix, one L2-normalized row per chunk
+    lists.i32                   memory-mapped IVF list id per row (-1 = not assigned yet, -2 = deleted)
+    centroids.npy               IVF centroids, present once the index has been trained
+    metadata.sqlite             url, title, timestamp, chunk offsets, text and SimHash fingerprint per row
+
+Search is exact (blocked matrix-vector products) until the store holds min_train_size chunks, then an
+inverted-file index (spherical k-means centroids) narrows each query to the nprobe closest lists, which keeps
+queries in the low milliseconds at millions of chunks. Rows are only ever appended; deleted rows are masked
+out and their space is reclaimed by rebuilding the store.
+
+index_content() drops chunks that are near-duplicates of chunks already stored for other pages before they are
+embedded, so store size and embedding spend grow with unique content rather than with visits.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from aeternus.knowledge.dedup import SimHashIndex, simhash, to_signed, to_unsigned
+
+try:
+	import numpy as np
+
+	NUMPY_AVAILABLE = True
+except ImportError:
+	NUMPY_AVAILABLE = False
+
+if TYPE_CHECKING:
+	from aeternus.knowledge.embeddings import EmbeddingsProvider
+	from aeternus.knowledge.ingestion import IngestedContent
+
+logger = logging.getLogger(__name__)
+
+UNASSIGNED = -1
+DELETED = -2
+
+# Rows scored per matrix product during exact search, training and list assignment
+_BLOCK_ROWS = 65536
+
+
+@dataclass
+class ChunkRecord:
+	"""Metadata stored alongside each chunk vector."""
+
+	url: str
+	title: str
+	text: str
+	chunk_index: int = 0
+	start_offset: int = 0
+	end_offset: int = 0
+	timestamp: float = 0.0
+	section: str = ''  # heading path, e.g. 'Install > Linux'
+	simhash: int | None = None  # 64-bit SimHash of text, used for near-duplicate detection
+
+
+@dataclass
+class SearchResult:
+	id: int
+	score: float
+	url: str
+	title: str
+	text: str
+	chunk_index: int
+	start_offset: int
+	end_offset: int
+	timestamp: float
+	section: str = ''
+
+
+class VectorStore:
+	"""
+	Memory-mapped embedding matrix with an IVF approximate nearest neighbor index and SQLite metadata.
+
+	Similarity is cosine: vectors are normalized on insert and queries are scored by inner product.
+	All public methods are thread safe and blocking; use the async helpers (index_content, recall) from the event loop.
+	"""
+
+	def __init__(
+		self,
+		path: str | Path,
+		dimension: int,
+		dtype: str = 'float16',
+		nprobe: int = 8,
+		min_train_size: int = 20000,
+		initial_capacity: int = 4096,
+		dedup_max_distance: int | None = 3,
+	):
+		if not NUMPY_AVAILABLE:
+			raise ImportError('VectorStore requires numpy. Please install it with: pip install numpy')
+		if dtype not in ('float16', 'float32'):
+			raise ValueError(f'Unsupported vector dtype {dtype!r}, expected float16 or float32')
+
+		self.path = Path(path).expanduser()
+		self.path.mkdir(parents=True, exist_ok=True)
+		self.nprobe = nprobe
+		self.min_train_size = min_train_size
+		# Chunks within this many SimHash bits of a stored chunk from another page are not stored, None disables
+		self.dedup_max_distance = dedup_max_distance
+		self._dedup_index: SimHashIndex | None = None
+
+		self._lock = threading.RLock()
+		self._db = sqlite3.connect(self.path / 'metadata.sqlite', check_same_thread=False)
+		self._db.execute('PRAGMA journal_mode=WAL')
+		self._db.execute('PRAGMA synchronous=NORMAL')
+		self._db.execute('CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+		self._db.execute(
+			'CREATE TABLE IF NOT EXISTS chunks ('
+			'id INTEGER PRIMARY KEY, url TEXT NOT NULL, title TEXT, text TEXT, chunk_index INTEGER, '
+			'start_offset INTEGER, end_offset INTEGER, timestamp REAL, section TEXT, simhash INTEGER)'
+		)
+		self._db.execute('CREATE INDEX IF NOT EXISTS chunks_url ON chunks (url)')
+
+		settings = dict(self._db.execute('SELECT key, value FROM settings').fetchall())
+		if settings:
+			# An existing store decides its own layout, the constructor arguments only apply to new stores
+			if int(settings['dimension']) != dimension:
+				raise ValueError(f'Store at {self.path} has dimension {settings["dimension"]}, not {dimension}')
+			dtype = settings['dtype']
+		self.dimension = dimension
+		self.dtype = np.dtype(dtype)
+		self._count = int(settings.get('count', 0))
+		self._trained_count = int(settings.get('trained_count', 0))
+		self._save_settings(dimension=dimension, dtype=self.dtype.name)
+
+		self._vectors_path = self.path / f'vectors.{"f16" if self.dtype == np.float16 else "f32"}'
+		self._lists_path = self.path / 'lists.i32'
+		self._capacity = 0
+		self._vectors: Any = None
+		self._lists: Any = None
+		self._map_files(max(initial_capacity, self._count, self._existing_capacity()))
+
+		# IVF index: centroids plus posting lists kept as one id array sorted by list, with pending appends
+		self._centroids: Any = None
+		self._list_order: Any = None
+		self._list_bounds: Any = None
+		self._pending: dict[int, list[int]] = {}
+		self._pending_count = 0
+		centroids_path = self.path / 'centroids.npy'
+		if centroids_path.exists():
+			self._centroids = np.load(centroids_path)
+			self._rebuild_posting_lists()
+
+	# --- Storage -------------------------------------------------------------------------------------------
+
+	def _existing_capacity(self) -> int:
+		if not self._vectors_path.exists():
+			return 0
+		return self._vectors_path.stat().st_size // (self.dimension * self.dtype.itemsize)
+
+	def _map_files(self, capacity: int) -> None:
+		"""(Re)map the vector and list files, growing them to hold capacity rows."""
+		if self._vectors is not None:
+			self._vectors.flush()
+			self._lists.flush()
+		self._vectors = None
+		self._lists = None
+
+		new_file = not self._lists_path.exists()
+		for file_path, row_bytes in (
+			(self._vectors_path, self.dimension * self.dtype.itemsize),
+			(self._lists_path, 4),
+		):
+			with open(file_path, 'ab'):
+				pass
+			if file_path.stat().st_size < capacity * row_bytes:
+				os.truncate(file_path, capacity * row_bytes)
+
+		self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode='r+', shape=(capacity, self.dimension))
+		self._lists = np.memmap(self._lists_path, dtype=np.int32, mode='r+', shape=(capacity,))
+		if new_file or capacity > self._capacity:
+			self._lists[max(self._capacity, self._count) :] = UNASSIGNED
+		self._capacity = capacity
+
+	def _save_settings(self, **values: Any) -> None:
+		self._db.executemany(
+			'INSERT INTO settings (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+			[(key, str(value)) for key, value in values.items()],
+		)
+		self._db.commit()
+
+	def __len__(self) -> int:
+		"""Number of live (not deleted) chunks."""
+		with self._lock:
+			return int(np.count_nonzero(self._lists[: self._count] != DELETED))
+
+	@property
+	def is_trained(self) -> bool:
+		return self._centroids is not None
+
+	def add(self, vectors: Any, records: list[ChunkRecord]) -> list[int]:
+		"""Append a batch of vectors with their metadata, returning the new row ids."""
+		matrix = _normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension))
+		if len(matrix) != len(records):
+			raise ValueError(f'Got {len(matrix)} vectors for {len(records)} records')
+		if not len(records):
+			return []
+
+		with self._lock:
+			start = self._count
+			end = start + len(records)
+			if end > self._capacity:
+				self._map_files(max(end, self._capacity * 2))
+
+			self._vectors[start:end] = matrix
+			if self._centroids is not None:
+				assignments = self._assign(matrix)
+				self._lists[start:end] = assignments
+				for row_id, list_id in zip(range(start, end), assignments.tolist()):
+					self._pending.setdefault(list_id, []).append(row_id)
+				self._pending_count += len(records)
+			else:
+				self._lists[start:end] = UNASSIGNED
+
+			self._db.executemany(
+				'INSERT INTO chunks (id, url, title, text, chunk_index, start_offset, end_offset, timestamp, section, simhash) '
+				'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+				[
+					(
+						row_id,
+						r.url,
+						r.title,
+						r.text,
+						r.chunk_index,
+						r.start_offset,
+						r.end_offset,
+						r.timestamp,
+						r.section,
+						to_signed(r.simhash) if r.simhash is not None else None,
+					)
+					for row_id, r in zip(range(start, end), records)
+				],
+			)
+			if self._dedup_index is not None:
+				for row_id, r in zip(range(start, end), records):
+					if r.simhash is not None:
+						self._dedup_index.add(row_id, r.simhash)
+			self._count = end
+			self._save_settings(count=self._count)
+
+			# Train once there is enough data, retrain when the store has grown well past what the centroids saw
+			if self._centroids is None:
+				if end >= self.min_train_size and len(self) >= self.min_train_size:
+					self.train()
+			elif end >= 8 * self._trained_count:
+				self.train()
+			elif self._pending_count > max(1024, end // 10):
+				self._rebuild_posting_lists()
+
+			return list(range(start, end))
+
+	def delete_by_url(self, url: str) -> int:
+		"""Remove all chunks of a page, returning how many were removed."""
+		with self._lock:
+			ids = [row[0] for row in self._db.execute('SELECT id FROM chunks WHERE url = ?', (url,)).fetchall()]
+			if not ids:
+				return 0
+			self._lists[np.asarray(ids, dtype=np.int64)] = DELETED
+			if self._dedup_index is not None:
+				for row_id in ids:
+					self._dedup_index.remove(row_id)
+			self._db.execute('DELETE FROM chunks WHERE url = ?', (url,))
+			self._db.commit()
+			return len(ids)
+
+	def close(self) -> None:
+		with self._lock:
+			if self._vectors is not None:
+				self._vectors.flush()
+				self._lists.flush()
+			self._db.close()
+
+	# --- Index ---------------------------------------------------------------------------------------------
+
+	def train(self, nlist: int | None = None, iterations: int = 10, seed: int = 0) -> None:
+		"""Fit IVF centroids with spherical k-means on a sample of live rows and assign every row to a list."""
+		with self._lock:
+			live = np.flatnonzero(self._lists[: self._count] != DELETED)
+			if len(live) == 0:
+				return
+			nlist = nlist or int(min(65536, max(16, 4 * math.sqrt(len(live)))))
+			nlist = min(nlist, len(live))
+
+			rng = np.random.default_rng(seed)
+			sample_ids = np.sort(rng.choice(live, size=min(len(live), nlist * 64), replace=False))
+			sample = np.asarray(self._vectors[sample_ids], dtype=np.float32)
+			centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+			for _ in range(iterations):
+				assignments = np.argmax(sample @ centroids.T, axis=1)
+				sums = np.zeros_like(centroids)
+				np.add.at(sums, assignments, sample)
+				counts = np.bincount(assignments, minlength=nlist)
+				empty = counts == 0
+				if empty.any():
+					# Reseed empty lists from random sample points so no list goes unused
+					sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+				centroids = _normalize(sums)
+
+			self._centroids = centroids.astype(np.float32)
+			for block_start in range(0, self._count, _BLOCK_ROWS):
+				block_end = min(block_start + _BLOCK_ROWS, self._count)
+				block_lists = self._lists[block_start:block_end]
+				assignments = self._assign(np.asarray(self._vectors[block_start:block_end], dtype=np.float32))
+				self._lists[block_start:block_end] = np.where(block_lists == DELETED, DELETED, assignments)
+
+			np.save(self.path / 'centroids.npy', self._centroids)
+			self._trained_count = self._count
+			self._save_settings(trained_count=self._trained_count)
+			self._rebuild_posting_lists()
+			logger.debug(f'Trained vector index with {nlist} lists over {len(live)} chunks')
+
+	def _assign(self, matrix: Any) -> Any:
+		return np.argmax(matrix @ self._centroids.T, axis=1).astype(np.int32)
+
+	def _rebuild_posting_lists(self) -> None:
+		"""Group row ids by list so each probe is one contiguous slice."""
+		lists = np.asarray(self._lists[: self._count])
+		self._list_order = np.argsort(lists, kind='stable').astype(np.int64)
+		self._list_bounds = np.searchsorted(lists[self._list_order], np.arange(len(self._centroids) + 1))
+		self._pending = {}
+		self._pending_count = 0
+
+	# --- Search --------------------------------------------------------------------------------------------
+
+	def search(self, query: Any, k: int = 5, nprobe: int | None = None) -> list[SearchResult]:
+		"""Return the k most similar live chunks to the query vector, best first."""
+		q = _normalize(np.asarray(query, dtype=np.float32).reshape(1, self.dimension))[0]
+
+		with self._lock:
+			if self._count == 0:
+				return []
+			if self._centroids is None:
+				ids, scores = self._search_exact(q, k)
+			else:
+				ids, scores = self._search_ivf(q, k, nprobe or self.nprobe)
+			return self._fetch_results(ids, scores)
+
+	def _search_exact(self, q: Any, k: int) -> tuple[Any, Any]:
+		best_ids = np.empty(0, dtype=np.int64)
+		best_scores = np.empty(0, dtype=np.float32)
+		for block_start in range(0, self._count, _BLOCK_ROWS):
+			block_end = min(block_start + _BLOCK_ROWS, self._count)
+			scores = np.asarray(self._vectors[block_start:block_end], dtype=np.float32) @ q
+			scores[self._lists[block_start:block_end] == DELETED] = -np.inf
+			ids = np.arange(block_start, block_end)
+			best_ids, best_scores = _top_k(np.concatenate([best_ids, ids]), np.concatenate([best_scores, scores]), k)
+		keep = np.isfinite(best_scores)
+		return best_ids[keep], best_scores[keep]
+
+	def _search_ivf(self, q: Any, k: int, nprobe: int) -> tuple[Any, Any]:
+		nprobe = min(nprobe, len(self._centroids))
+		probed = np.argpartition(-(self._centroids @ q), nprobe - 1)[:nprobe]
+
+		parts = [self._list_order[self._list_bounds[list_id] : self._list_bounds[list_id + 1]] for list_id in probed]
+		parts.extend(np.asarray(self._pending[list_id], dtype=np.int64) for list_id in probed if list_id in self._pending)
+		candidates = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+		# Posting lists can still hold rows deleted since they were built
+		candidates = candidates[self._lists[candidates] >= 0]
+		if len(candidates) == 0:
+			return candidates, np.empty(0, dtype=np.float32)
+
+		# Sorted ids turn the memmap gather into mostly sequential reads
+		candidates.sort()
+		scores = np.asarray(self._vectors[candidates], dtype=np.float32) @ q
+		return _top_k(candidates, scores, k)
+
+	def _fetch_results(self, ids: Any, scores: Any) -> list[SearchResult]:
+		if len(ids) == 0:
+			return []
+		id_list = ids.tolist()
+		rows = self._db.execute(
+			'SELECT id, url, title, text, chunk_index, start_offset, end_offset, timestamp, section '
+			f'FROM chunks WHERE id IN ({",".join("?" * len(id_list))})',
+			id_list,
+		).fetchall()
+		by_id = {row[0]: row for row in rows}
+		results = []
+		for row_id, score in zip(id_list, scores.tolist()):
+			row = by_id.get(row_id)
+			if row is None:
+				continue
+			results.append(SearchResult(row_id, score, *row[1:]))
+		return results
+
+	# --- Async helpers -------------------------------------------------------------------------------------
+
+	async def index_content(self, content: 'IngestedContent', embeddings: 'EmbeddingsProvider') -> list[int]:
+		"""Embed and store the chunks of an ingested page, replacing any earlier copy of the same URL."""
+		chunks = content.chunks or []
+		if not chunks:
+			return []
+
+		# A revisited page with unchanged content keeps its rows, no embedding or rewrite needed
+		existing = await asyncio.to_thread(self._get_chunk_ids_if_unchanged, content.url, chunks)
+		if existing is not None:
+			return existing
+
+		timestamp = content.timestamp.timestamp() if isinstance(content.timestamp, datetime) else float(content.timestamp)
+		records = []
+		if content.chunk_details and len(content.chunk_details) == len(chunks):
+			for index, detail in enumerate(content.chunk_details):
+				records.append(
+					ChunkRecord(
+						content.url,
+						content.title,
+						detail.text,
+						index,
+						detail.start_offset,
+						detail.end_offset,
+						timestamp,
+						detail.section,
+					)
+				)
+		else:
+			offset = 0
+			for index, chunk in enumerate(chunks):
+				start = content.content.find(chunk, offset)
+				if start < 0:
+					start = offset
+				records.append(ChunkRecord(content.url, content.title, chunk, index, start, start + len(chunk), timestamp))
+				offset = start + 1
+
+		if self.dedup_max_distance is not None:
+			records = await asyncio.to_thread(self._drop_near_duplicates, content.url, records)
+			if not records:
+				logger.debug(f'All chunks of {content.url} are near-duplicates of stored content, nothing to embed')
+				await asyncio.to_thread(self.delete_by_url, content.url)
+				return []
+			if len(records) < len(chunks):
+				# Stored rows of a revisited page are the deduplicated chunks, compare against those
+				existing = await asyncio.to_thread(self._get_chunk_ids_if_unchanged, content.url, [r.text for r in records])
+				if existing is not None:
+					return existing
+
+		vectors = await embeddings.embed_documents([r.text for r in records])
+
+		def _replace() -> list[int]:
+			with self._lock:
+				self.delete_by_url(content.url)
+				return self.add(vectors, records)
+
+		return await asyncio.to_thread(_replace)
+
+	def _get_dedup_index(self) -> SimHashIndex:
+		"""Load chunk fingerprints from the metadata table on first use."""
+		assert self.dedup_max_distance is not None
+		if self._dedup_index is None:
+			index = SimHashIndex(max_distance=self.dedup_max_distance)
+			for row_id, fingerprint in self._db.execute('SELECT id, simhash FROM chunks WHERE simhash IS NOT NULL'):
+				index.add(row_id, to_unsigned(fingerprint))
+			self._dedup_index = index
+		return self._dedup_index
+
+	def _drop_near_duplicates(self, url: str, records: list[ChunkRecord]) -> list[ChunkRecord]:
+		"""Fingerprint records and keep those not already stored for another page or repeated earlier on this one."""
+		assert self.dedup_max_distance is not None
+		for record in records:
+			record.simhash = simhash(record.text)
+
+		with self._lock:
+			index = self._get_dedup_index()
+			# Rows of this URL are about to be replaced and must not count as duplicates
+			own_rows = {row[0] for row in self._db.execute('SELECT id FROM chunks WHERE url = ?', (url,))}
+
+			kept: list[ChunkRecord] = []
+			page_index = SimHashIndex(max_distance=self.dedup_max_distance)
+			for record in records:
+				assert record.simhash is not None
+				if record.simhash and (index.contains_near(record.simhash, own_rows) or page_index.contains_near(record.simhash)):
+					continue
+				page_index.add(len(kept), record.simhash)
+				kept.append(record)
+
+		if len(kept) < len(records):
+			logger.debug(f'Skipping {len(records) - len(kept)}/{len(records)} near-duplicate chunks of {url}')
+		return kept
+
+	def _get_chunk_ids_if_unchanged(self, url: str, chunks: list[str]) -> list[int] | None:
+		with self._lock:
+			rows = self._db.execute('SELECT id, text FROM chunks WHERE url = ? ORDER BY chunk_index', (url,)).fetchall()
+		if [text for _, text in rows] != chunks:
+			return None
+		return [row_id for row_id, _ in rows]
+
+	async def recall(self, query: str, embeddings: 'EmbeddingsProvider', k: int = 5) -> list[SearchResult]:
+		"""Find previously read chunks relevant to a text query."""
+		vector = await embeddings.embed_query(query)
+		return await asyncio.to_thread(self.search, vector, k)
+
+
+def _normalize(matrix: Any) -> Any:
+	norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+	norms[norms == 0] = 1.0
+	return matrix / norms
+
+
+def _top_k(ids: Any, scores: Any, k: int) -> tuple[Any, Any]:
+	"""Best k (id, score) pairs sorted by descending score."""
+	if len(scores) > k:
+		keep = np.argpartition(-scores, k - 1)[:k]
+		ids, scores = ids[keep], scores[keep]
+	order = np.argsort(-scores, kind='stable')
+	return ids[order], scores[order]
@@ -95,6 +95,7 @@ from aeternus.browser import BrowserProfile, BrowserSession
 from aeternus.config import get_default_llm, get_default_profile, load_aeternus_config
 from aeternus.filesystem.file_system import FileSystem
 from aeternus.llm.openai.chat import ChatOpenAI
+from aeternus.mcp.session_pool import BrowserSessionPool
 from aeternus.tools.service import Tools
 
 logger = logging.getLogger(__name__)
@@ -152,6 +153,13 @@ except ImportError:
 from aeternus.telemetry import MCPServerTelemetryEvent, ProductTelemetry
 from aeternus.utils import create_task_with_error_handling, get_aeternus_version
 
+# Added to every direct browser control tool's input schema
+_SESSION_ID_PROPERTY = {
+	'type': 'string',
+	'description': 'Browser session to act on. Omit to use the default session; a new ID starts a separate browser',
+}
+_SESSION_MANAGEMENT_TOOLS = frozenset({'browser_list_sessions', 'browser_close_session', 'browser_close_all'})
+
 
 def get_parent_process_cmdline() -> str | None:
 	"""Get the command line of all parent processes up the chain."""
@@ -187,35 +195,44 @@ def get_parent_process_cmdline() -> str | None:
 class BrowserUseServer:
 	"""MCP Server for browser-use capabilities."""
 
-	def __init__(self, session_timeout_minutes: int = 10):
+	def __init__(self, session_timeout_minutes: int = 10, max_sessions: int = 8, warm_sessions: int = 0):
 		# Ensure all logging goes to stderr (in case new loggers were created)
 		_ensure_all_loggers_use_stderr()
 
 		self.server = Server('browser-use')
 		self.config = load_aeternus_config()
 		self.agent: Agent | None = None
-		self.browser_session: BrowserSession | None = None
 		self.tools: Tools | None = None
 		self.llm: ChatOpenAI | None = None
 		self.file_system: FileSystem | None = None
 		self._telemetry = ProductTelemetry()
 		self._start_time = time.time()
 
-		# Session management
-		self.active_sessions: dict[str, dict[str, Any]] = {}  # session_id -> session info
+		# Session management: browser_* tools run on the session named by their session_id argument
 		self.session_timeout_minutes = session_timeout_minutes
+		self.session_pool = BrowserSessionPool(
+			self._start_browser_session,
+			max_sessions=max_sessions,
+			warm_sessions=warm_sessions,
+			idle_timeout=session_timeout_minutes * 60,
+		)
 		self._cleanup_task: Any = None
 
 		# Setup handlers
 		self._setup_handlers()
 
+	@property
+	def browser_session(self) -> BrowserSession | None:
+		"""The session used by calls without a session_id."""
+		return self.session_pool.default_session
+
 	def _setup_handlers(self):
 		"""Setup MCP server handlers."""
 
 		@self.server.list_tools()
 		async def handle_list_tools() -> list[types.Tool]:
 			"""List all available browser-use tools."""
-			return [
+			tools = [
 				# Agent tools
 				# Direct browser control tools
 				types.Tool(
@@ -406,6 +423,12 @@ class BrowserUseServer:
 				),
 			]
 
+			# Every browser control tool can target its own session, so several browsers can be driven concurrently
+			for tool in tools:
+				if tool.name.startswith('browser_') and tool.name not in _SESSION_MANAGEMENT_TOOLS:
+					tool.inputSchema['properties']['session_id'] = _SESSION_ID_PROPERTY
+			return tools
+
 		@self.server.list_resources()
 		async def handle_list_resources() -> list[types.Resource]:
 			"""List available resources (none for browser-use)."""
@@ -464,52 +487,55 @@ class BrowserUseServer:
 		elif tool_name == 'browser_close_all':
 			return await self._close_all_sessions()
 
+		elif tool_name == 'browser_close':
+			return await self._close_browser(arguments.get('session_id'))
+
 		# Direct browser control tools (require active session)
 		elif tool_name.startswith('browser_'):
-			# Ensure browser session exists
-			if not self.browser_session:
-				await self._init_browser_session()
+			# Starts the session on first use; calls on other sessions are not blocked while this one runs
+			async with self.session_pool.use(arguments.get('session_id')) as entry:
+				return await self._execute_browser_tool(entry.session, tool_name, arguments)
 
-			if tool_name == 'browser_navigate':
-				return await self._navigate(arguments['url'], arguments.get('new_tab', False))
+		return f'Unknown tool: {tool_name}'
 
-			elif tool_name == 'browser_click':
-				return await self._click(arguments['index'], arguments.get('new_tab', False))
+	async def _execute_browser_tool(self, browser_session: BrowserSession, tool_name: str, arguments: dict[str, Any]) -> str:
+		"""Execute a direct browser control tool on one session."""
+		if tool_name == 'browser_navigate':
+			return await self._navigate(browser_session, arguments['url'], arguments.get('new_tab', False))
 
-			elif tool_name == 'browser_type':
-				return await self._type_text(arguments['index'], arguments['text'])
+		elif tool_name == 'browser_click':
+			return await self._click(browser_session, arguments['index'], arguments.get('new_tab', False))
 
-			elif tool_name == 'browser_get_state':
-				return await self._get_browser_state(arguments.get('include_screenshot', False))
+		elif tool_name == 'browser_type':
+			return await self._type_text(browser_session, arguments['index'], arguments['text'])
 
-			elif tool_name == 'browser_extract_content':
-				return await self._extract_content(arguments['query'], arguments.get('extract_links', False))
+		elif tool_name == 'browser_get_state':
+			return await self._get_browser_state(browser_session, arguments.get('include_screenshot', False))
 
-			elif tool_name == 'browser_scroll':
-				return await self._scroll(arguments.get('direction', 'down'))
+		elif tool_name == 'browser_extract_content':
+			return await self._extract_content(browser_session, arguments['query'], arguments.get('extract_links', False))
 
-			elif tool_name == 'browser_go_back':
-				return await self._go_back()
+		elif tool_name == 'browser_scroll':
+			return await self._scroll(browser_session, arguments.get('direction', 'down'))
 
-			elif tool_name == 'browser_close':
-				return await self._close_browser()
+		elif tool_name == 'browser_go_back':
+			return await self._go_back(browser_session)
 
-			elif tool_name == 'browser_list_tabs':
-				return await self._list_tabs()
+		elif tool_name == 'browser_list_tabs':
+			return await self._list_tabs(browser_session)
 
-			elif tool_name == 'browser_switch_tab':
-				return await self._switch_tab(arguments['tab_id'])
+		elif tool_name == 'browser_switch_tab':
+			return await self._switch_tab(browser_session, arguments['tab_id'])
 
-			elif tool_name == 'browser_close_tab':
-				return await self._close_tab(arguments['tab_id'])
+		elif tool_name == 'browser_close_tab':
+			return await self._close_tab(browser_session, arguments['tab_id'])
 
 		return f'Unknown tool: {tool_name}'
 
-	async def _init_browser_session(self, allowed_domains: list[str] | None = None, **kwargs):
-		"""Initialize browser session using config"""
-		if self.browser_session:
-			return
-
+	async def _start_browser_session(
+		self, is_default: bool = True, allowed_domains: list[str] | None = None, **kwargs
+	) -> BrowserSession:
+		"""Start a browser session using config (the session pool's factory)"""
 		# Ensure all logging goes to stderr before browser initialization
 		_ensure_all_loggers_use_stderr()
 
@@ -538,16 +564,26 @@ class BrowserUseServer:
 		for key, value in kwargs.items():
 			profile_data[key] = value
 
+		# A profile directory can only be used by one browser at a time, extra sessions get a fresh temporary one
+		if not is_default:
+			profile_data['user_data_dir'] = None
+
 		# Create browser profile
 		profile = BrowserProfile(**profile_data)
 
 		# Create browser session
-		self.browser_session = BrowserSession(browser_profile=profile)
-		await self.browser_session.start()
+		browser_session = BrowserSession(browser_profile=profile)
+		await browser_session.start()
 
-		# Track the session for management
-		self._track_session(self.browser_session)
+		# Tools, LLM and file system are shared by all sessions
+		if self.tools is None:
+			self._init_shared_resources(profile_config)
 
+		logger.debug('Browser session initialized')
+		return browser_session
+
+	def _init_shared_resources(self, profile_config: dict[str, Any]) -> None:
+		"""Create the tools, LLM and file system used by direct actions on every session"""
 		# Create tools for direct actions
 		self.tools = Tools()
 
@@ -569,8 +605,6 @@ class BrowserUseServer:
 		file_system_path = profile_config.get('file_system_path', '~/.browser-use-mcp')
 		self.file_system = FileSystem(base_dir=Path(file_system_path).expanduser())
 
-		logger.debug('Browser session initialized')
-
 	async def _retry_with_aeternus_agent(
 		self,
 		task: str,
@@ -674,35 +708,23 @@ class BrowserUseServer:
 			# Clean up
 			await agent.close()
 
-	async def _navigate(self, url: str, new_tab: bool = False) -> str:
+	async def _navigate(self, browser_session: BrowserSession, url: str, new_tab: bool = False) -> str:
 		"""Navigate to a URL."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
-		# Update session activity
-		self._update_session_activity(self.browser_session.id)
-
 		from aeternus.browser.events import NavigateToUrlEvent
 
 		if new_tab:
-			event = self.browser_session.event_bus.dispatch(NavigateToUrlEvent(url=url, new_tab=True))
+			event = browser_session.event_bus.dispatch(NavigateToUrlEvent(url=url, new_tab=True))
 			await event
 			return f'Opened new tab with URL: {url}'
 		else:
-			event = self.browser_session.event_bus.dispatch(NavigateToUrlEvent(url=url))
+			event = browser_session.event_bus.dispatch(NavigateToUrlEvent(url=url))
 			await event
 			return f'Navigated to: {url}'
 
-	async def _click(self, index: int, new_tab: bool = False) -> str:
+	async def _click(self, browser_session: BrowserSession, index: int, new_tab: bool = False) -> str:
 		"""Click an element by index."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
-		# Update session activity
-		self._update_session_activity(self.browser_session.id)
-
 		# Get the element
-		element = await self.browser_session.get_dom_element_by_index(index)
+		element = await browser_session.get_dom_element_by_index(index)
 		if not element:
 			return f'Element with index {index} not found'
 
@@ -711,7 +733,7 @@ class BrowserUseServer:
 			href = element.attributes.get('href')
 			if href:
 				# Convert relative href to absolute URL
-				state = await self.browser_session.get_browser_state_summary()
+				state = await browser_session.get_browser_state_summary()
 				current_url = state.url
 				if href.startswith('/'):
 					# Relative URL - construct full URL
@@ -725,7 +747,7 @@ class BrowserUseServer:
 				# Open link in new tab
 				from aeternus.browser.events import NavigateToUrlEvent
 
-				event = self.browser_session.event_bus.dispatch(NavigateToUrlEvent(url=full_url, new_tab=True))
+				event = browser_session.event_bus.dispatch(NavigateToUrlEvent(url=full_url, new_tab=True))
 				await event
 				return f'Clicked element {index} and opened in new tab {full_url[:20]}...'
 			else:
@@ -733,23 +755,20 @@ class BrowserUseServer:
 				# Opening in new tab without href is not reliably supported
 				from aeternus.browser.events import ClickElementEvent
 
-				event = self.browser_session.event_bus.dispatch(ClickElementEvent(node=element))
+				event = browser_session.event_bus.dispatch(ClickElementEvent(node=element))
 				await event
 				return f'Clicked element {index} (new tab not supported for non-link elements)'
 		else:
 			# Normal click
 			from aeternus.browser.events import ClickElementEvent
 
-			event = self.browser_session.event_bus.dispatch(ClickElementEvent(node=element))
+			event = browser_session.event_bus.dispatch(ClickElementEvent(node=element))
 			await event
 			return f'Clicked element {index}'
 
-	async def _type_text(self, index: int, text: str) -> str:
+	async def _type_text(self, browser_session: BrowserSession, index: int, text: str) -> str:
 		"""Type text into an element."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
-		element = await self.browser_session.get_dom_element_by_index(index)
+		element = await browser_session.get_dom_element_by_index(index)
 		if not element:
 			return f'Element with index {index} not found'
 
@@ -777,7 +796,7 @@ class BrowserUseServer:
 			else:
 				sensitive_key_name = 'credential'
 
-		event = self.browser_session.event_bus.dispatch(
+		event = browser_session.event_bus.dispatch(
 			TypeTextEvent(node=element, text=text, is_sensitive=is_potentially_sensitive, sensitive_key_name=sensitive_key_name)
 		)
 		await event
@@ -790,12 +809,9 @@ class BrowserUseServer:
 		else:
 			return f"Typed '{text}' into element {index}"
 
-	async def _get_browser_state(self, include_screenshot: bool = False) -> str:
+	async def _get_browser_state(self, browser_session: BrowserSession, include_screenshot: bool = False) -> str:
 		"""Get current browser state."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
-		state = await self.browser_session.get_browser_state_summary()
+		state = await browser_session.get_browser_state_summary()
 
 		result = {
 			'url': state.url,
@@ -822,7 +838,7 @@ class BrowserUseServer:
 
 		return json.dumps(result, indent=2)
 
-	async def _extract_content(self, query: str, extract_links: bool = False) -> str:
+	async def _extract_content(self, browser_session: BrowserSession, query: str, extract_links: bool = False) -> str:
 		"""Extract content from current page."""
 		if not self.llm:
 			return 'Error: LLM not initialized (set OPENAI_API_KEY)'
@@ -830,13 +846,10 @@ class BrowserUseServer:
 		if not self.file_system:
 			return 'Error: FileSystem not initialized'
 
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
 		if not self.tools:
 			return 'Error: Tools not initialized'
 
-		state = await self.browser_session.get_browser_state_summary()
+		state = await browser_session.get_browser_state_summary()
 
 		# Use the extract action
 		# Create a dynamic action model that matches the tools's expectations
@@ -857,22 +870,19 @@ class BrowserUseServer:
 		)
 		action_result = await self.tools.act(
 			action=action,
-			browser_session=self.browser_session,
+			browser_session=browser_session,
 			page_extraction_llm=self.llm,
 			file_system=self.file_system,
 		)
 
 		return action_result.extracted_content or 'No content extracted'
 
-	async def _scroll(self, direction: str = 'down') -> str:
+	async def _scroll(self, browser_session: BrowserSession, direction: str = 'down') -> str:
 		"""Scroll the page."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
 		from aeternus.browser.events import ScrollEvent
 
 		# Scroll by a standard amount (500 pixels)
-		event = self.browser_session.event_bus.dispatch(
+		event = browser_session.event_bus.dispatch(
 			ScrollEvent(
 				direction=direction,  # type: ignore
 				amount=500,
@@ -881,102 +891,73 @@ class BrowserUseServer:
 		await event
 		return f'Scrolled {direction}'
 
-	async def _go_back(self) -> str:
+	async def _go_back(self, browser_session: BrowserSession) -> str:
 		"""Go back in browser history."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
 		from aeternus.browser.events import GoBackEvent
 
-		event = self.browser_session.event_bus.dispatch(GoBackEvent())
+		event = browser_session.event_bus.dispatch(GoBackEvent())
 		await event
 		return 'Navigated back'
 
-	async def _close_browser(self) -> str:
+	async def _close_browser(self, session_id: str | None = None) -> str:
 		"""Close the browser session."""
-		if self.browser_session:
-			from aeternus.browser.events import BrowserStopEvent
-
-			event = self.browser_session.event_bus.dispatch(BrowserStopEvent())
-			await event
-			self.browser_session = None
-			self.tools = None
+		session_id = session_id or self.session_pool.default_session_id
+		if session_id and await self.session_pool.close(session_id):
 			return 'Browser closed'
 		return 'No browser session to close'
 
-	async def _list_tabs(self) -> str:
+	async def _list_tabs(self, browser_session: BrowserSession) -> str:
 		"""List all open tabs."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
-		tabs_info = await self.browser_session.get_tabs()
+		tabs_info = await browser_session.get_tabs()
 		tabs = []
 		for i, tab in enumerate(tabs_info):
 			tabs.append({'tab_id': tab.target_id[-4:], 'url': tab.url, 'title': tab.title or ''})
 		return json.dumps(tabs, indent=2)
 
-	async def _switch_tab(self, tab_id: str) -> str:
+	async def _switch_tab(self, browser_session: BrowserSession, tab_id: str) -> str:
 		"""Switch to a different tab."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
 		from aeternus.browser.events import SwitchTabEvent
 
-		target_id = await self.browser_session.get_target_id_from_tab_id(tab_id)
-		event = self.browser_session.event_bus.dispatch(SwitchTabEvent(target_id=target_id))
+		target_id = await browser_session.get_target_id_from_tab_id(tab_id)
+		event = browser_session.event_bus.dispatch(SwitchTabEvent(target_id=target_id))
 		await event
-		state = await self.browser_session.get_browser_state_summary()
+		state = await browser_session.get_browser_state_summary()
 		return f'Switched to tab {tab_id}: {state.url}'
 
-	async def _close_tab(self, tab_id: str) -> str:
+	async def _close_tab(self, browser_session: BrowserSession, tab_id: str) -> str:
 		"""Close a specific tab."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
 		from aeternus.browser.events import CloseTabEvent
 
-		target_id = await self.browser_session.get_target_id_from_tab_id(tab_id)
-		event = self.browser_session.event_bus.dispatch(CloseTabEvent(target_id=target_id))
+		target_id = await browser_session.get_target_id_from_tab_id(tab_id)
+		event = browser_session.event_bus.dispatch(CloseTabEvent(target_id=target_id))
 		await event
-		current_url = await self.browser_session.get_current_page_url()
+		current_url = await browser_session.get_current_page_url()
 		return f'Closed tab # {tab_id}, now on {current_url}'
 
-	def _track_session(self, session: BrowserSession) -> None:
-		"""Track a browser session for management."""
-		self.active_sessions[session.id] = {
-			'session': session,
-			'created_at': time.time(),
-			'last_activity': time.time(),
-			'url': getattr(session, 'current_url', None),
-		}
-
-	def _update_session_activity(self, session_id: str) -> None:
-		"""Update the last activity time for a session."""
-		if session_id in self.active_sessions:
-			self.active_sessions[session_id]['last_activity'] = time.time()
-
 	async def _list_sessions(self) -> str:
 		"""List all active browser sessions."""
-		if not self.active_sessions:
+		if not len(self.session_pool):
 			return 'No active browser sessions'
 
 		sessions_info = []
-		for session_id, session_data in self.active_sessions.items():
-			session = session_data['session']
-			created_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(session_data['created_at']))
-			last_activity = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(session_data['last_activity']))
+		for entry in self.session_pool.entries():
+			session = entry.session
+			created_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.created_at))
+			last_activity = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.last_activity))
 
 			# Check if session is still active
 			is_active = hasattr(session, 'cdp_client') and session.cdp_client is not None
 
 			sessions_info.append(
 				{
-					'session_id': session_id,
+					'session_id': entry.session_id,
 					'created_at': created_at,
 					'last_activity': last_activity,
 					'active': is_active,
-					'current_url': session_data.get('url', 'Unknown'),
-					'age_minutes': (time.time() - session_data['created_at']) / 60,
+					'busy': entry.busy,
+					'default': entry.session_id == self.session_pool.default_session_id,
+					'current_url': getattr(session, 'current_url', None),
+					'age_minutes': (time.time() - entry.created_at) / 60,
 				}
 			)
 
@@ -984,52 +965,29 @@ class BrowserUseServer:
 
 	async def _close_session(self, session_id: str) -> str:
 		"""Close a specific browser session."""
-		if session_id not in self.active_sessions:
+		if session_id not in self.session_pool:
 			return f'Session {session_id} not found'
 
-		session_data = self.active_sessions[session_id]
-		session = session_data['session']
-
 		try:
-			# Close the session
-			if hasattr(session, 'kill'):
-				await session.kill()
-			elif hasattr(session, 'close'):
-				await session.close()
-
-			# Remove from tracking
-			del self.active_sessions[session_id]
-
-			# If this was the current session, clear it
-			if self.browser_session and self.browser_session.id == session_id:
-				self.browser_session = None
-				self.tools = None
-
+			await self.session_pool.close(session_id)
 			return f'Successfully closed session {session_id}'
 		except Exception as e:
 			return f'Error closing session {session_id}: {str(e)}'
 
 	async def _close_all_sessions(self) -> str:
 		"""Close all active browser sessions."""
-		if not self.active_sessions:
+		if not len(self.session_pool):
 			return 'No active sessions to close'
 
-		closed_count = 0
-		errors = []
+		session_ids = [entry.session_id for entry in self.session_pool.entries()]
+		results = await asyncio.gather(*(self._close_session(session_id) for session_id in session_ids))
 
-		for session_id in list(self.active_sessions.keys()):
-			try:
-				result = await self._close_session(session_id)
-				if 'Successfully closed' in result:
-					closed_count += 1
-				else:
-					errors.append(f'{session_id}: {result}')
-			except Exception as e:
-				errors.append(f'{session_id}: {str(e)}')
-
-		# Clear current session references
-		self.browser_session = None
-		self.tools = None
+		closed_count = sum(1 for result in results if result.startswith('Successfully closed'))
+		errors = [
+			f'{session_id}: {result}'
+			for session_id, result in zip(session_ids, results)
+			if not result.startswith('Successfully closed')
+		]
 
 		result = f'Closed {closed_count} sessions'
 		if errors:
@@ -1039,21 +997,11 @@ class BrowserUseServer:
 
 	async def _cleanup_expired_sessions(self) -> None:
 		"""Background task to clean up expired sessions."""
-		current_time = time.time()
-		timeout_seconds = self.session_timeout_minutes * 60
-
-		expired_sessions = []
-		for session_id, session_data in self.active_sessions.items():
-			last_activity = session_data['last_activity']
-			if current_time - last_activity > timeout_seconds:
-				expired_sessions.append(session_id)
-
-		for session_id in expired_sessions:
-			try:
-				await self._close_session(session_id)
+		try:
+			for session_id in await self.session_pool.evict_idle():
 				logger.info(f'Auto-closed expired session {session_id}')
-			except Exception as e:
-				logger.error(f'Error auto-closing session {session_id}: {e}')
+		except Exception as e:
+			logger.error(f'Error auto-closing sessions: {e}')
 
 	async def _start_cleanup_task(self) -> None:
 		"""Start the background cleanup task."""
@@ -1074,6 +1022,7 @@ class BrowserUseServer:
 		"""Run the MCP server."""
 		# Start the cleanup task
 		await self._start_cleanup_task()
+		await self.session_pool.start()
 
 		async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
 			await self.server.run(
@@ -1090,12 +1039,14 @@ class BrowserUseServer:
 			)
 
 
-async def main(session_timeout_minutes: int = 10):
+async def main(session_timeout_minutes: int = 10, max_sessions: int = 8, warm_sessions: int = 0):
 	if not MCP_AVAILABLE:
 		print('MCP SDK is required. Install with: pip install mcp', file=sys.stderr)
 		sys.exit(1)
 
-	server = BrowserUseServer(session_timeout_minutes=session_timeout_minutes)
+	server = BrowserUseServer(
+		session_timeout_minutes=session_timeout_minutes, max_sessions=max_sessions, warm_sessions=warm_sessions
+	)
 	server._telemetry.capture(
 		MCPServerTelemetryEvent(
 			version=get_aeternus_version(),
@@ -0,0 +1,189 @@
+"""Pool of browser sessions for the MCP server.
+
+Tools take an optional session_id: calls on different sessions run concurrently, calls on the same session
+are serialized by its lock. Sessions are kept in least-recently-used order, so when the pool is full or a
+session sits idle past the timeout the stalest idle one is closed first. A few pre-started warm sessions
+make a new session_id usable without waiting for a browser launch.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from aeternus.browser import BrowserSession
+from aeternus.utils import create_task_with_error_handling
+
+logger = logging.getLogger(__name__)
+
+# Creates and starts a browser session; the flag is True for the default session
+SessionFactory = Callable[[bool], Awaitable[BrowserSession]]
+
+
+class SessionPoolFullError(Exception):
+	"""Raised when every session in a full pool is busy, so none can be evicted for a new one."""
+
+
+@dataclass(eq=False)
+class PooledSession:
+	session_id: str
+	session: BrowserSession
+	created_at: float = field(default_factory=time.time)
+	last_activity: float = field(default_factory=time.time)
+	lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+	@property
+	def busy(self) -> bool:
+		return self.lock.locked()
+
+
+class BrowserSessionPool:
+	"""Keyed browser sessions with per-session locks, LRU eviction and warm spares."""
+
+	def __init__(
+		self,
+		factory: SessionFactory,
+		max_sessions: int = 8,
+		warm_sessions: int = 0,
+		idle_timeout: float = 600,
+	):
+		"""
+		Args:
+			factory: Starts a new browser session
+			max_sessions: Open sessions (excluding warm spares) before the least recently used idle one is evicted
+			warm_sessions: Started sessions kept ready to hand out to new session ids
+			idle_timeout: Seconds without a call after which evict_idle() closes a session
+		"""
+		self.factory = factory
+		self.max_sessions = max_sessions
+		self.warm_sessions = warm_sessions
+		self.idle_timeout = idle_timeout
+		self.default_session_id: str | None = None
+
+		# Least recently used first
+		self._sessions: OrderedDict[str, PooledSession] = OrderedDict()
+		self._creating: dict[str, asyncio.Task[PooledSession]] = {}
+		self._warm: list[BrowserSession] = []
+		self._warm_task: asyncio.Task | None = None
+
+	def __len__(self) -> int:
+		return len(self._sessions)
+
+	def __contains__(self, session_id: str) -> bool:
+		return session_id in self._sessions
+
+	def entries(self) -> list[PooledSession]:
+		return list(self._sessions.values())
+
+	@property
+	def default_session(self) -> BrowserSession | None:
+		entry = self._sessions.get(self.default_session_id) if self.default_session_id else None
+		return entry.session if entry else None
+
+	@asynccontextmanager
+	async def use(self, session_id: str | None = None) -> AsyncIterator[PooledSession]:
+		"""Hold a session for one call, creating it first if needed. None selects the default session."""
+		while True:
+			entry = await self.get(session_id)
+			async with entry.lock:
+				# Eviction may have closed this session while we waited for its lock, start over with a fresh one
+				if self._sessions.get(entry.session_id) is not entry:
+					continue
+				entry.last_activity = time.time()
+				try:
+					yield entry
+				finally:
+					entry.last_activity = time.time()
+				return
+
+	async def get(self, session_id: str | None = None) -> PooledSession:
+		"""Return the session for session_id, starting one if it does not exist yet."""
+		session_id = session_id or self.default_session_id
+		if session_id is not None and (entry := self._sessions.get(session_id)) is not None:
+			self._sessions.move_to_end(session_id)
+			return entry
+
+		# Concurrent first calls for the same id share one launch
+		key = session_id or '<default>'
+		task = self._creating.get(key)
+		if task is None:
+			# Awaited by every caller below, so failures (e.g. SessionPoolFullError) surface there rather than in the log
+			task = asyncio.create_task(self._create(session_id, is_default=session_id is None), name=f'mcp_session_create_{key}')
+			self._creating[key] = task
+			task.add_done_callback(lambda _: self._creating.pop(key, None))
+		return await asyncio.shield(task)
+
+	async def _create(self, session_id: str | None, is_default: bool) -> PooledSession:
+		await self._make_room()
+
+		# The default session is started from the configured profile, others may take a warm spare
+		session = self._warm.pop() if self._warm and not is_default else await self.factory(is_default)
+		self._schedule_warm_refill()
+
+		entry = PooledSession(session_id=session_id or session.id, session=session)
+		self._sessions[entry.session_id] = entry
+		if is_default:
+			self.default_session_id = entry.session_id
+		logger.debug(f'Started browser session {entry.session_id} ({len(self._sessions)}/{self.max_sessions} open)')
+		return entry
+
+	async def _make_room(self) -> None:
+		while len(self._sessions) + len(self._creating) > self.max_sessions:
+			idle = next((entry for entry in self._sessions.values() if not entry.busy), None)
+			if idle is None:
+				raise SessionPoolFullError(
+					f'All {len(self._sessions)} browser sessions are busy (max_sessions={self.max_sessions}), try again later'
+				)
+			logger.info(f'Evicting least recently used browser session {idle.session_id}')
+			await self.close(idle.session_id)
+
+	def _schedule_warm_refill(self) -> None:
+		if len(self._warm) >= self.warm_sessions or (self._warm_task and not self._warm_task.done()):
+			return
+		self._warm_task = create_task_with_error_handling(
+			self._fill_warm(), name='mcp_session_warm_refill', logger_instance=logger, suppress_exceptions=True
+		)
+
+	async def _fill_warm(self) -> None:
+		while len(self._warm) < self.warm_sessions:
+			self._warm.append(await self.factory(False))
+
+	async def start(self) -> None:
+		"""Start warming spare sessions in the background."""
+		self._schedule_warm_refill()
+
+	async def close(self, session_id: str) -> bool:
+		"""Close and forget a session, waiting for its running call to finish. Returns False if it is unknown."""
+		entry = self._sessions.pop(session_id, None)
+		if entry is None:
+			return False
+		if session_id == self.default_session_id:
+			self.default_session_id = None
+		async with entry.lock:
+			await entry.session.kill()
+		return True
+
+	async def evict_idle(self) -> list[str]:
+		"""Close sessions idle for longer than idle_timeout, skipping ones with a call in progress."""
+		cutoff = time.time() - self.idle_timeout
+		expired = [entry.session_id for entry in self._sessions.values() if entry.last_activity < cutoff and not entry.busy]
+		for session_id in expired:
+			await self.close(session_id)
+		return expired
+
+	async def close_all(self) -> None:
+		"""Close every session, including warm spares."""
+		if self._warm_task:
+			self._warm_task.cancel()
+		warm, self._warm = self._warm, []
+		results = await asyncio.gather(
+			*(self.close(session_id) for session_id in list(self._sessions)),
+			*(session.kill() for session in warm),
+			return_exceptions=True,
+		)
+		for result in results:
+			if isinstance(result, Exception):
+				logger.error(f'Error closing browser session: {result}')
@@ -0,0 +1,195 @@
+"""
+Shared executor for image work (screenshot highlights, resizing, GIF rendering).
+
+PIL decoding, drawing and encoding can take tens to hundreds of milliseconds on large pages. Running it on the
+asyncio loop that also services CDP messages stalls event delivery, so all of it goes through run_image_task().
+
+By default work runs on a small thread pool: Pillow releases the GIL while decoding, resizing and encoding, so
+threads already keep the loop free. Set BROWSER_USE_IMAGE_PROCESS_POOL=true to use a process pool instead, for
+deployments running many agents per process where pure-Python drawing would still contend for the GIL.
+BROWSER_USE_IMAGE_WORKERS sets the number of workers (default: min(4, cpu count)).
+"""
+
+import asyncio
+import base64
+import functools
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from io import BytesIO
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+@dataclass
+class ImageExecutorStats:
+	"""Counters showing how much image work was moved off the event loop.
+
+	worker_seconds is the time the work itself took, i.e. how long the loop would have been blocked had it run
+	inline (before). loop_seconds is the time actually spent on the loop dispatching it (after).
+	"""
+
+	tasks: int = 0
+	worker_seconds: float = 0.0
+	max_worker_seconds: float = 0.0
+	loop_seconds: float = 0.0
+	fallbacks: int = 0
+
+
+_stats = ImageExecutorStats()
+_executor: Executor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_max_workers() -> int:
+	try:
+		return max(1, int(os.getenv('BROWSER_USE_IMAGE_WORKERS', '0')) or min(4, os.cpu_count() or 1))
+	except ValueError:
+		return min(4, os.cpu_count() or 1)
+
+
+def _use_process_pool() -> bool:
+	return os.getenv('BROWSER_USE_IMAGE_PROCESS_POOL', 'false').strip().lower() in {'1', 'true', 'yes'}
+
+
+def get_image_executor() -> Executor:
+	"""Get the process-wide image executor, creating it on first use."""
+	global _executor
+	if _executor is None:
+		with _executor_lock:
+			if _executor is None:
+				if _use_process_pool():
+					# spawn avoids forking a process that is running an event loop and CDP websocket threads
+					_executor = ProcessPoolExecutor(max_workers=_get_max_workers(), mp_context=multiprocessing.get_context('spawn'))
+				else:
+					_executor = ThreadPoolExecutor(max_workers=_get_max_workers(), thread_name_prefix='image_worker')
+	return _executor
+
+
+def shutdown_image_executor(wait: bool = True) -> None:
+	"""Shut down the shared image executor, a new one is created on the next task."""
+	global _executor
+	with _executor_lock:
+		if _executor is not None:
+			_executor.shutdown(wait=wait)
+			_executor = None
+
+
+def get_image_executor_stats() -> ImageExecutorStats:
+	"""Snapshot of the image executor counters."""
+	return replace(_stats)
+
+
+def _timed_call(func: Callable[..., T], *args: Any) -> tuple[T, float]:
+	"""Runs in the worker, returns the result together with how long it took."""
+	start = time.perf_counter()
+	result = func(*args)
+	return result, time.perf_counter() - start
+
+
+def _run_pickled(payload: bytes) -> tuple[Any, float]:
+	"""Runs in a worker process, unpickles the call serialized by run_image_task and times it."""
+	func, args = pickle.loads(payload)
+	return _timed_call(func, *args)
+
+
+async def run_image_task(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+	"""Run a CPU-heavy image function on the shared executor and await its result.
+
+	func and its arguments must be picklable (module-level functions and plain data) so the process pool can be used.
+	"""
+	if kwargs:
+		func = functools.partial(func, **kwargs)
+
+	loop = asyncio.get_running_loop()
+	executor = get_image_executor()
+	future: asyncio.Future[tuple[T, float]] | None = None
+	pool_error: Exception | None = None
+	dispatch_start = time.perf_counter()
+	if isinstance(executor, ProcessPoolExecutor):
+		# Serialize on submit, so an unpicklable call fails here with its own error instead of inside the pool,
+		# where it would be indistinguishable from errors raised by func
+		try:
+			payload = pickle.dumps((func, args), protocol=pickle.HIGHEST_PROTOCOL)
+		except (pickle.PicklingError, TypeError, AttributeError) as e:
+			pool_error = e
+		else:
+			future = loop.run_in_executor(executor, _run_pickled, payload)
+	else:
+		future = loop.run_in_executor(executor, _timed_call, func, *args)
+	_stats.loop_seconds += time.perf_counter() - dispatch_start
+
+	if future is not None:
+		try:
+			result, worker_seconds = await future
+		except BrokenProcessPool as e:
+			shutdown_image_executor(wait=False)
+			pool_error = e
+
+	if pool_error is not None:
+		# A dead worker or unpicklable argument (e.g. an object holding a lock) should never cost us the screenshot,
+		# retry on a thread
+		logger.debug(f'Image process pool unavailable ({type(pool_error).__name__}: {pool_error}), falling back to a thread')
+		_stats.fallbacks += 1
+		result, worker_seconds = await asyncio.to_thread(_timed_call, func, *args)
+
+	_stats.tasks += 1
+	_stats.worker_seconds += worker_seconds
+	_stats.max_worker_seconds = max(_stats.max_worker_seconds, worker_seconds)
+	logger.debug(f'🖼️ {getattr(func, "__name__", "image task")} took {worker_seconds * 1000:.1f}ms off the event loop')
+	return result
+
+
+# --- Image functions (module-level so they can run in worker processes) ---------------------------------------
+
+
+def resize_screenshot_b64(screenshot_b64: str, size: tuple[int, int]) -> str:
+	"""Resize a base64 screenshot to size, returning base64 PNG (or the input if it already has that size)."""
+	from PIL import Image
+
+	with Image.open(BytesIO(base64.b64decode(screenshot_b64))) as img:
+		if img.size == tuple(size):
+			return screenshot_b64
+
+		logger.info(f'🔄 Resizing screenshot from {img.size[0]}x{img.size[1]} to {size[0]}x{size[1]} for LLM')
+		img_resized = img.resize(tuple(size), Image.Resampling.LANCZOS)
+		buffer = BytesIO()
+		img_resized.save(buffer, format='PNG')
+		return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+# Recently resized screenshots, so synchronous prompt building can reuse work already done off the loop
+_RESIZE_CACHE_SIZE = 4
+_resize_cache: OrderedDict[tuple[int, int, tuple[int, int]], tuple[str, str]] = OrderedDict()
+
+
+def get_cached_resized_screenshot(screenshot_b64: str, size: tuple[int, int]) -> str | None:
+	"""Return a resize previously computed by resize_screenshot_async(), if any."""
+	cached = _resize_cache.get((hash(screenshot_b64), len(screenshot_b64), tuple(size)))
+	if cached is not None and cached[0] == screenshot_b64:
+		return cached[1]
+	return None
+
+
+async def resize_screenshot_async(screenshot_b64: str, size: tuple[int, int]) -> str:
+	"""Resize a screenshot on the image executor and remember the result for get_cached_resized_screenshot()."""
+	cached = get_cached_resized_screenshot(screenshot_b64, size)
+	if cached is not None:
+		return cached
+
+	resized = await run_image_task(resize_screenshot_b64, screenshot_b64, tuple(size))
+	_resize_cache[(hash(screenshot_b64), len(screenshot_b64), tuple(size))] = (screenshot_b64, resized)
+	while len(_resize_cache) > _RESIZE_CACHE_SIZE:
+		_resize_cache.popitem(last=False)
+	return resized
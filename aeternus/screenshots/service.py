@@ -2,11 +2,10 @@
 Screenshot storage service for browser-use agents.
 """
 
+import asyncio
 import base64
 from pathlib import Path
 
-import anyio
-
 from aeternus.observability import observe_debug
 
 
@@ -27,11 +26,8 @@ class ScreenshotService:
 		screenshot_filename = f'step_{step_number}.png'
 		screenshot_path = self.screenshots_dir / screenshot_filename
 
-		# Decode base64 and save to disk
-		screenshot_data = base64.b64decode(screenshot_b64)
-
-		async with await anyio.open_file(screenshot_path, 'wb') as f:
-			await f.write(screenshot_data)
+		# Decode base64 and save to disk in a worker thread, large screenshots take a few ms to decode
+		await asyncio.to_thread(lambda: screenshot_path.write_bytes(base64.b64decode(screenshot_b64)))
 
 		return str(screenshot_path)
 
@@ -45,8 +41,5 @@ class ScreenshotService:
 		if not path.exists():
 			return None
 
-		# Load from disk and encode to base64
-		async with await anyio.open_file(path, 'rb') as f:
-			screenshot_data = await f.read()
-
-		return base64.b64encode(screenshot_data).decode('utf-8')
+		# Load from disk and encode to base64 in a worker thread
+		return await asyncio.to_thread(lambda: base64.b64encode(path.read_bytes()).decode('utf-8'))
@@ -0,0 +1,83 @@
+"""
+Pricing table shipped with the package, so costs are available at import time without network or disk I/O.
+
+Covers the default and commonly used models of the bundled chat providers. Prices are per token, keyed by
+LiteLLM model name; TokenCost swaps in the full LiteLLM table when a background refresh succeeds.
+Regenerate from a LiteLLM model_prices_and_context_window.json with compact_pricing_table().
+"""
+
+from typing import Any
+
+PRICING_VERSION = '2025-09-30'
+
+# (input_cost_per_token, output_cost_per_token, cache_read_input_token_cost, cache_creation_input_token_cost,
+#  max_tokens, max_input_tokens, max_output_tokens)
+PricingRow = tuple[float | None, float | None, float | None, float | None, int | None, int | None, int | None]
+
+PRICING_FIELDS = (
+	'input_cost_per_token',
+	'output_cost_per_token',
+	'cache_read_input_token_cost',
+	'cache_creation_input_token_cost',
+	'max_tokens',
+	'max_input_tokens',
+	'max_output_tokens',
+)
+
+_M = 1 / 1_000_000
+
+BUNDLED_MODEL_PRICING: dict[str, PricingRow] = {
+	# OpenAI
+	'gpt-4o': (2.5 * _M, 10 * _M, 1.25 * _M, None, 16384, 128000, 16384),
+	'gpt-4o-mini': (0.15 * _M, 0.6 * _M, 0.075 * _M, None, 16384, 128000, 16384),
+	'gpt-4.1': (2 * _M, 8 * _M, 0.5 * _M, None, 32768, 1047576, 32768),
+	'gpt-4.1-mini': (0.4 * _M, 1.6 * _M, 0.1 * _M, None, 32768, 1047576, 32768),
+	'gpt-4.1-nano': (0.1 * _M, 0.4 * _M, 0.025 * _M, None, 32768, 1047576, 32768),
+	'gpt-5': (1.25 * _M, 10 * _M, 0.125 * _M, None, 128000, 272000, 128000),
+	'gpt-5-mini': (0.25 * _M, 2 * _M, 0.025 * _M, None, 128000, 272000, 128000),
+	'gpt-5-nano': (0.05 * _M, 0.4 * _M, 0.005 * _M, None, 128000, 272000, 128000),
+	'o3': (2 * _M, 8 * _M, 0.5 * _M, None, 100000, 200000, 100000),
+	'o3-mini': (1.1 * _M, 4.4 * _M, 0.55 * _M, None, 100000, 200000, 100000),
+	'o4-mini': (1.1 * _M, 4.4 * _M, 0.275 * _M, None, 100000, 200000, 100000),
+	# Anthropic
+	'claude-opus-4-1-20250805': (15 * _M, 75 * _M, 1.5 * _M, 18.75 * _M, 32000, 200000, 32000),
+	'claude-opus-4-20250514': (15 * _M, 75 * _M, 1.5 * _M, 18.75 * _M, 32000, 200000, 32000),
+	'claude-sonnet-4-5-20250929': (3 * _M, 15 * _M, 0.3 * _M, 3.75 * _M, 64000, 200000, 64000),
+	'claude-sonnet-4-20250514': (3 * _M, 15 * _M, 0.3 * _M, 3.75 * _M, 64000, 200000, 64000),
+	'claude-3-7-sonnet-20250219': (3 * _M, 15 * _M, 0.3 * _M, 3.75 * _M, 64000, 200000, 64000),
+	'claude-3-5-sonnet-20241022': (3 * _M, 15 * _M, 0.3 * _M, 3.75 * _M, 8192, 200000, 8192),
+	'claude-3-5-haiku-20241022': (0.8 * _M, 4 * _M, 0.08 * _M, 1 * _M, 8192, 200000, 8192),
+	'anthropic.claude-3-5-sonnet-20240620-v1:0': (3 * _M, 15 * _M, None, None, 4096, 200000, 4096),
+	# Google
+	'gemini/gemini-2.5-pro': (1.25 * _M, 10 * _M, 0.31 * _M, None, 65535, 1048576, 65535),
+	'gemini/gemini-2.5-flash': (0.3 * _M, 2.5 * _M, 0.075 * _M, None, 65535, 1048576, 65535),
+	'gemini/gemini-flash-latest': (0.3 * _M, 2.5 * _M, 0.075 * _M, None, 65535, 1048576, 65535),
+	'gemini/gemini-2.5-flash-lite': (0.1 * _M, 0.4 * _M, 0.025 * _M, None, 65535, 1048576, 65535),
+	'gemini/gemini-2.0-flash': (0.1 * _M, 0.4 * _M, 0.025 * _M, None, 8192, 1048576, 8192),
+	# DeepSeek
+	'deepseek/deepseek-chat': (0.27 * _M, 1.1 * _M, 0.07 * _M, None, 8192, 65536, 8192),
+	'deepseek/deepseek-reasoner': (0.55 * _M, 2.19 * _M, 0.14 * _M, None, 8192, 65536, 8192),
+	# Groq
+	'groq/llama-3.3-70b-versatile': (0.59 * _M, 0.79 * _M, None, None, 32768, 128000, 32768),
+	'groq/llama-3.1-8b-instant': (0.05 * _M, 0.08 * _M, None, None, 8192, 128000, 8192),
+	'groq/moonshotai/kimi-k2-instruct': (1 * _M, 3 * _M, None, None, 16384, 131072, 16384),
+	'groq/openai/gpt-oss-120b': (0.15 * _M, 0.75 * _M, None, None, 32766, 131072, 32766),
+	# Mistral
+	'mistral/mistral-large-latest': (2 * _M, 6 * _M, None, None, 128000, 128000, 128000),
+	'mistral/mistral-medium-latest': (0.4 * _M, 2 * _M, None, None, 8191, 131072, 8191),
+	'mistral/mistral-small-latest': (0.1 * _M, 0.3 * _M, None, None, 8191, 32000, 8191),
+	# Cerebras
+	'cerebras/llama3.1-8b': (0.1 * _M, 0.1 * _M, None, None, 128000, 128000, 128000),
+}
+
+
+def compact_pricing_table(litellm_data: dict[str, Any]) -> dict[str, PricingRow]:
+	"""Reduce LiteLLM's pricing JSON to PricingRow tuples, skipping entries without any token price"""
+	table: dict[str, PricingRow] = {}
+	for model_name, data in litellm_data.items():
+		if not isinstance(data, dict) or model_name == 'sample_spec':
+			continue
+		if data.get('input_cost_per_token') is None and data.get('output_cost_per_token') is None:
+			continue
+		table[model_name] = tuple(data.get(field) for field in PRICING_FIELDS)  # type: ignore[assignment]
+	return table
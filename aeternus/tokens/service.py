@@ -1,15 +1,25 @@
 """
 Token cost service that tracks LLM token usage and costs.
 
-Fetches pricing data from LiteLLM repository and caches it for 1 day.
+Costs are priced from a bundled pricing table available at import. When cost tracking is enabled, the full
+LiteLLM table is loaded in the background (from a 1 day disk cache, or fetched from the LiteLLM repository)
+and swapped in as a whole, so no agent step ever waits on pricing I/O.
 Automatically tracks token usage when LLMs are registered and invoked.
+
+Usage is aggregated as it is added: running totals per model and per (model, minute) bucket, so summaries
+cost O(models) (plus O(buckets) for time-filtered ones) no matter how many invocations were tracked. Cost is
+linear in the token counts, so it is computed from the aggregates with one memoized pricing lookup per model.
+Only the most recent raw entries are kept, in a bounded ring buffer.
 """
 
+import asyncio
 import logging
 import os
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any
+from typing import Any, ClassVar
 
 import anyio
 import httpx
@@ -17,6 +27,13 @@ from dotenv import load_dotenv
 
 from aeternus.llm.base import BaseChatModel
 from aeternus.llm.views import ChatInvokeUsage
+from aeternus.tokens.bundled_pricing import (
+	BUNDLED_MODEL_PRICING,
+	PRICING_FIELDS,
+	PRICING_VERSION,
+	PricingRow,
+	compact_pricing_table,
+)
 from aeternus.tokens.custom_pricing import CUSTOM_MODEL_PRICING
 from aeternus.tokens.mappings import MODEL_TO_LITELLM
 from aeternus.tokens.views import (
@@ -45,38 +62,147 @@ def xdg_cache_home() -> Path:
 	return default
 
 
+def normalize_model_name(model_name: str) -> str:
+	return model_name.strip().lower()
+
+
+class PricingTable:
+	"""
+	Read-only lookup from model name to PricingRow.
+
+	Keys are normalized but otherwise matched exactly: provider prefixes are never stripped, since the same
+	bare name can belong to several providers at different prices. Names that differ from LiteLLM's go through
+	MODEL_TO_LITELLM. Refreshes build a new table and replace the old one, so readers never see a half-loaded table.
+	"""
+
+	def __init__(self, rows: dict[str, PricingRow], version: str, source: str):
+		self.version = version
+		self.source = source
+		self._rows: dict[str, PricingRow] = {normalize_model_name(name): row for name, row in rows.items()}
+
+	def get(self, model_name: str) -> PricingRow | None:
+		return self._rows.get(normalize_model_name(model_name))
+
+	def __len__(self) -> int:
+		return len(self._rows)
+
+
+BUNDLED_PRICING = PricingTable(BUNDLED_MODEL_PRICING, PRICING_VERSION, 'bundled')
+
+
+@dataclass(slots=True)
+class _UsageTotals:
+	"""Running token counts for a set of usage entries, split the way pricing applies to them"""
+
+	invocations: int = 0
+	prompt_tokens: int = 0
+	prompt_cached_tokens: int = 0
+	prompt_cache_creation_tokens: int = 0
+	completion_tokens: int = 0
+
+	def add(self, usage: ChatInvokeUsage) -> None:
+		self.invocations += 1
+		self.prompt_tokens += usage.prompt_tokens
+		self.prompt_cached_tokens += usage.prompt_cached_tokens or 0
+		self.prompt_cache_creation_tokens += usage.prompt_cache_creation_tokens or 0
+		self.completion_tokens += usage.completion_tokens
+
+	def merge(self, other: '_UsageTotals') -> None:
+		self.invocations += other.invocations
+		self.prompt_tokens += other.prompt_tokens
+		self.prompt_cached_tokens += other.prompt_cached_tokens
+		self.prompt_cache_creation_tokens += other.prompt_cache_creation_tokens
+		self.completion_tokens += other.completion_tokens
+
+	@property
+	def total_tokens(self) -> int:
+		return self.prompt_tokens + self.completion_tokens
+
+
 class TokenCost:
 	"""Service for tracking token usage and calculating costs"""
 
 	CACHE_DIR_NAME = 'aeternus/token_cost'
 	CACHE_DURATION = timedelta(days=1)
 	PRICING_URL = 'https://raw.githubusercontent.com/BerriAI/litellm/main/model_prices_and_context_window.json'
+	# Granularity of the per-model time buckets used for `since` queries
+	BUCKET_SIZE = timedelta(minutes=1)
 
-	def __init__(self, include_cost: bool = False):
-		self.include_cost = include_cost or os.getenv('BROWSER_USE_CALCULATE_COST', 'false').lower() == 'true'
+	# Pricing is shared by all instances and replaced (never mutated) when a background refresh completes
+	_pricing: ClassVar[PricingTable] = BUNDLED_PRICING
+	_pricing_loaded_at: ClassVar[datetime | None] = None
+	_pricing_refresh_task: ClassVar[asyncio.Task | None] = None
 
-		self.usage_history: list[TokenUsageEntry] = []
+	def __init__(self, include_cost: bool = False, max_history_entries: int = 1000, max_buckets: int = 10080):
+		"""
+		Args:
+			include_cost: Calculate costs from LiteLLM pricing data
+			max_history_entries: Raw usage entries kept in usage_history (oldest are dropped, totals are kept)
+			max_buckets: (model, minute) buckets kept for `since` queries, one week of activity by default
+		"""
+		self.include_cost = include_cost or os.getenv('BROWSER_USE_CALCULATE_COST', 'false').lower() == 'true'
+		# Set to false to price with the bundled table only (no cache reads or network fetches)
+		self.refresh_pricing = os.getenv('BROWSER_USE_PRICING_REFRESH', 'true').lower() == 'true'
+
+		self.usage_history: deque[TokenUsageEntry] = deque(maxlen=max_history_entries)
+		# Timestamp of the newest entry the ring buffer dropped, raw entries after it are all still kept
+		self._last_dropped_at: datetime | None = None
+		self.max_buckets = max_buckets
+		self._totals: dict[str, _UsageTotals] = {}
+		self._buckets: OrderedDict[tuple[datetime, str], _UsageTotals] = OrderedDict()
 		self.registered_llms: dict[str, BaseChatModel] = {}
-		self._pricing_data: dict[str, Any] | None = None
+		# Resolved ModelPricing per model name, valid for the pricing table it was resolved from
+		self._model_pricing: dict[str, ModelPricing | None] = {}
+		self._model_pricing_table: PricingTable | None = None
 		self._initialized = False
 		self._cache_dir = xdg_cache_home() / self.CACHE_DIR_NAME
 
+	@property
+	def pricing_version(self) -> str:
+		return f'{TokenCost._pricing.source}:{TokenCost._pricing.version}'
+
 	async def initialize(self) -> None:
-		"""Initialize the service by loading pricing data"""
+		"""Initialize the service. Never waits for pricing data: a refresh is started in the background if due."""
 		if not self._initialized:
 			if self.include_cost:
-				await self._load_pricing_data()
+				self._schedule_pricing_refresh()
 			self._initialized = True
 
-	async def _load_pricing_data(self) -> None:
-		"""Load pricing data from cache or fetch from GitHub"""
-		# Try to find a valid cache file
-		cache_file = await self._find_valid_cache()
+	def _schedule_pricing_refresh(self) -> None:
+		if not self.refresh_pricing:
+			return
+		loaded_at = TokenCost._pricing_loaded_at
+		if loaded_at and datetime.now() - loaded_at < self.CACHE_DURATION:
+			return
+		task = TokenCost._pricing_refresh_task
+		if task is not None and not task.done():
+			return
+		TokenCost._pricing_refresh_task = create_task_with_error_handling(
+			self._refresh_pricing(), name='refresh_token_pricing', suppress_exceptions=True
+		)
 
-		if cache_file:
-			await self._load_from_cache(cache_file)
-		else:
-			await self._fetch_and_cache_pricing_data()
+	async def _refresh_pricing(self, force_fetch: bool = False) -> None:
+		"""Load LiteLLM pricing from the disk cache or the network and swap it in"""
+		data: dict[str, Any] | None = None
+		version = ''
+		if not force_fetch:
+			cache_file = await self._find_valid_cache()
+			if cache_file:
+				cached = await self._load_from_cache(cache_file)
+				if cached:
+					data, version = cached.data, cached.timestamp.strftime('%Y-%m-%d')
+		if not data:
+			data = await self._fetch_and_cache_pricing_data()
+			version = datetime.now().strftime('%Y-%m-%d')
+		if not data:
+			logger.debug(f'Pricing refresh failed, keeping {self.pricing_version}')
+			return
+
+		# Compacting thousands of entries is done off the event loop
+		table = await asyncio.to_thread(lambda: PricingTable(compact_pricing_table(data), version, 'litellm'))
+		TokenCost._pricing = table
+		TokenCost._pricing_loaded_at = datetime.now()
+		logger.debug(f'Loaded pricing for {len(table)} model names ({self.pricing_version})')
 
 	async def _find_valid_cache(self) -> Path | None:
 		"""Find the most recent valid cache file"""
@@ -114,36 +240,32 @@ class TokenCost:
 			if not cache_file.exists():
 				return False
 
-			# Read the cached data
-			cached = CachedPricingData.model_validate_json(await anyio.Path(cache_file).read_text())
-
-			# Check if cache is still valid
-			return datetime.now() - cached.timestamp < self.CACHE_DURATION
+			# Files are written once, so the modification time is the fetch time
+			modified = datetime.fromtimestamp(cache_file.stat().st_mtime)
+			return datetime.now() - modified < self.CACHE_DURATION
 		except Exception:
 			return False
 
-	async def _load_from_cache(self, cache_file: Path) -> None:
+	async def _load_from_cache(self, cache_file: Path) -> CachedPricingData | None:
 		"""Load pricing data from a specific cache file"""
 		try:
 			content = await anyio.Path(cache_file).read_text()
-			cached = CachedPricingData.model_validate_json(content)
-			self._pricing_data = cached.data
+			return await asyncio.to_thread(CachedPricingData.model_validate_json, content)
 		except Exception as e:
 			logger.debug(f'Error loading cached pricing data from {cache_file}: {e}')
-			# Fall back to fetching
-			await self._fetch_and_cache_pricing_data()
+			return None
 
-	async def _fetch_and_cache_pricing_data(self) -> None:
+	async def _fetch_and_cache_pricing_data(self) -> dict[str, Any] | None:
 		"""Fetch pricing data from LiteLLM GitHub and cache it with timestamp"""
 		try:
 			async with httpx.AsyncClient() as client:
 				response = await client.get(self.PRICING_URL, timeout=30)
 				response.raise_for_status()
 
-				self._pricing_data = response.json()
+				data = response.json()
 
 			# Create cache object with timestamp
-			cached = CachedPricingData(timestamp=datetime.now(), data=self._pricing_data or {})
+			cached = CachedPricingData(timestamp=datetime.now(), data=data or {})
 
 			# Ensure cache directory exists
 			self._cache_dir.mkdir(parents=True, exist_ok=True)
@@ -153,10 +275,10 @@ class TokenCost:
 			cache_file = self._cache_dir / f'pricing_{timestamp_str}.json'
 
 			await anyio.Path(cache_file).write_text(cached.model_dump_json(indent=2))
+			return data
 		except Exception as e:
 			logger.debug(f'Error fetching pricing data: {e}')
-			# Fall back to empty pricing data
-			self._pricing_data = {}
+			return None
 
 	async def get_model_pricing(self, model_name: str) -> ModelPricing | None:
 		"""Get pricing information for a specific model"""
@@ -164,36 +286,57 @@ class TokenCost:
 		if not self._initialized:
 			await self.initialize()
 
+		table = TokenCost._pricing
+		if table is not self._model_pricing_table:
+			self._model_pricing = {}
+			self._model_pricing_table = table
+
+		if model_name not in self._model_pricing:
+			self._model_pricing[model_name] = self._resolve_model_pricing(model_name, table)
+		return self._model_pricing[model_name]
+
+	@staticmethod
+	def _resolve_model_pricing(model_name: str, table: PricingTable) -> ModelPricing | None:
 		# Check custom pricing first
 		if model_name in CUSTOM_MODEL_PRICING:
 			data = CUSTOM_MODEL_PRICING[model_name]
-			return ModelPricing(
-				model=model_name,
-				input_cost_per_token=data.get('input_cost_per_token'),
-				output_cost_per_token=data.get('output_cost_per_token'),
-				max_tokens=data.get('max_tokens'),
-				max_input_tokens=data.get('max_input_tokens'),
-				max_output_tokens=data.get('max_output_tokens'),
-				cache_read_input_token_cost=data.get('cache_read_input_token_cost'),
-				cache_creation_input_token_cost=data.get('cache_creation_input_token_cost'),
-			)
+			return ModelPricing(model=model_name, **{field: data.get(field) for field in PRICING_FIELDS})
 
 		# Map model name to LiteLLM model name if needed
 		litellm_model_name = MODEL_TO_LITELLM.get(model_name, model_name)
 
-		if not self._pricing_data or litellm_model_name not in self._pricing_data:
+		row = table.get(litellm_model_name) or table.get(model_name)
+		if row is None:
 			return None
 
-		data = self._pricing_data[litellm_model_name]
-		return ModelPricing(
-			model=model_name,
-			input_cost_per_token=data.get('input_cost_per_token'),
-			output_cost_per_token=data.get('output_cost_per_token'),
-			max_tokens=data.get('max_tokens'),
-			max_input_tokens=data.get('max_input_tokens'),
-			max_output_tokens=data.get('max_output_tokens'),
-			cache_read_input_token_cost=data.get('cache_read_input_token_cost'),
-			cache_creation_input_token_cost=data.get('cache_creation_input_token_cost'),
+		return ModelPricing(model=model_name, **dict(zip(PRICING_FIELDS, row)))
+
+	@staticmethod
+	def _cost_from_tokens(
+		data: ModelPricing,
+		prompt_tokens: int,
+		prompt_cached_tokens: int | None,
+		prompt_cache_creation_tokens: int | None,
+		completion_tokens: int,
+	) -> TokenCostCalculated:
+		uncached_prompt_tokens = prompt_tokens - (prompt_cached_tokens or 0)
+
+		return TokenCostCalculated(
+			new_prompt_tokens=prompt_tokens,
+			new_prompt_cost=uncached_prompt_tokens * (data.input_cost_per_token or 0),
+			# Cached tokens
+			prompt_read_cached_tokens=prompt_cached_tokens,
+			prompt_read_cached_cost=prompt_cached_tokens * data.cache_read_input_token_cost
+			if prompt_cached_tokens and data.cache_read_input_token_cost
+			else None,
+			# Cache creation tokens
+			prompt_cached_creation_tokens=prompt_cache_creation_tokens,
+			prompt_cache_creation_cost=prompt_cache_creation_tokens * data.cache_creation_input_token_cost
+			if data.cache_creation_input_token_cost and prompt_cache_creation_tokens
+			else None,
+			# Completion tokens
+			completion_tokens=completion_tokens,
+			completion_cost=completion_tokens * float(data.output_cost_per_token or 0),
 		)
 
 	async def calculate_cost(self, model: str, usage: ChatInvokeUsage) -> TokenCostCalculated | None:
@@ -204,36 +347,55 @@ class TokenCost:
 		if data is None:
 			return None
 
-		uncached_prompt_tokens = usage.prompt_tokens - (usage.prompt_cached_tokens or 0)
+		return self._cost_from_tokens(
+			data, usage.prompt_tokens, usage.prompt_cached_tokens, usage.prompt_cache_creation_tokens, usage.completion_tokens
+		)
 
-		return TokenCostCalculated(
-			new_prompt_tokens=usage.prompt_tokens,
-			new_prompt_cost=uncached_prompt_tokens * (data.input_cost_per_token or 0),
-			# Cached tokens
-			prompt_read_cached_tokens=usage.prompt_cached_tokens,
-			prompt_read_cached_cost=usage.prompt_cached_tokens * data.cache_read_input_token_cost
-			if usage.prompt_cached_tokens and data.cache_read_input_token_cost
-			else None,
-			# Cache creation tokens
-			prompt_cached_creation_tokens=usage.prompt_cache_creation_tokens,
-			prompt_cache_creation_cost=usage.prompt_cache_creation_tokens * data.cache_creation_input_token_cost
-			if data.cache_creation_input_token_cost and usage.prompt_cache_creation_tokens
-			else None,
-			# Completion tokens
-			completion_tokens=usage.completion_tokens,
-			completion_cost=usage.completion_tokens * float(data.output_cost_per_token or 0),
+	async def _calculate_totals_cost(self, model: str, totals: _UsageTotals) -> TokenCostCalculated | None:
+		"""Cost of aggregated usage; equal to the sum of per-entry costs since pricing is linear in tokens"""
+		if not self.include_cost:
+			return None
+
+		data = await self.get_model_pricing(model)
+		if data is None:
+			return None
+
+		return self._cost_from_tokens(
+			data,
+			totals.prompt_tokens,
+			totals.prompt_cached_tokens,
+			totals.prompt_cache_creation_tokens,
+			totals.completion_tokens,
 		)
 
+	def _bucket_start(self, timestamp: datetime) -> datetime:
+		bucket_seconds = self.BUCKET_SIZE.total_seconds()
+		return datetime.fromtimestamp(timestamp.timestamp() // bucket_seconds * bucket_seconds)
+
 	def add_usage(self, model: str, usage: ChatInvokeUsage) -> TokenUsageEntry:
-		"""Add token usage entry to history (without calculating cost)"""
+		"""Add token usage entry to history and the running totals (without calculating cost)"""
 		entry = TokenUsageEntry(
 			model=model,
 			timestamp=datetime.now(),
 			usage=usage,
 		)
 
+		if self.usage_history and len(self.usage_history) == self.usage_history.maxlen:
+			self._last_dropped_at = self.usage_history[0].timestamp
 		self.usage_history.append(entry)
 
+		if model not in self._totals:
+			self._totals[model] = _UsageTotals()
+		self._totals[model].add(usage)
+
+		key = (self._bucket_start(entry.timestamp), model)
+		bucket = self._buckets.get(key)
+		if bucket is None:
+			bucket = self._buckets[key] = _UsageTotals()
+			while len(self._buckets) > self.max_buckets:
+				self._buckets.popitem(last=False)
+		bucket.add(usage)
+
 		return entry
 
 	# async def _log_non_usage_llm(self, llm: BaseChatModel) -> None:
@@ -364,27 +526,58 @@ class TokenCost:
 
 	def get_usage_tokens_for_model(self, model: str) -> ModelUsageTokens:
 		"""Get usage tokens for a specific model"""
-		filtered_usage = [u for u in self.usage_history if u.model == model]
+		totals = self._totals.get(model) or _UsageTotals()
 
 		return ModelUsageTokens(
 			model=model,
-			prompt_tokens=sum(u.usage.prompt_tokens for u in filtered_usage),
-			prompt_cached_tokens=sum(u.usage.prompt_cached_tokens or 0 for u in filtered_usage),
-			completion_tokens=sum(u.usage.completion_tokens for u in filtered_usage),
-			total_tokens=sum(u.usage.prompt_tokens + u.usage.completion_tokens for u in filtered_usage),
+			prompt_tokens=totals.prompt_tokens,
+			prompt_cached_tokens=totals.prompt_cached_tokens,
+			completion_tokens=totals.completion_tokens,
+			total_tokens=totals.total_tokens,
 		)
 
-	async def get_usage_summary(self, model: str | None = None, since: datetime | None = None) -> UsageSummary:
-		"""Get summary of token usage and costs (costs calculated on-the-fly)"""
-		filtered_usage = self.usage_history
+	def _totals_since(self, since: datetime, model: str | None = None) -> dict[str, _UsageTotals]:
+		"""
+		Per-model totals of usage at or after `since`, from the time buckets.
 
-		if model:
-			filtered_usage = [u for u in filtered_usage if u.model == model]
+		The bucket containing `since` is counted exactly from the raw entries while the ring buffer still holds all of
+		that bucket's entries (none were dropped from it), otherwise it is counted whole. Usage older than the oldest
+		kept bucket is not included.
+		"""
+		first_bucket = self._bucket_start(since)
+		boundary_exact = self._last_dropped_at is None or self._last_dropped_at < first_bucket
+
+		result: dict[str, _UsageTotals] = {}
+		# Buckets are created in time order, so scan from the newest backwards
+		for (bucket_start, bucket_model), bucket in reversed(self._buckets.items()):
+			if bucket_start < first_bucket:
+				break
+			if model and bucket_model != model:
+				continue
+			if bucket_start == first_bucket and boundary_exact:
+				continue
+			result.setdefault(bucket_model, _UsageTotals()).merge(bucket)
+
+		if boundary_exact:
+			bucket_end = first_bucket + self.BUCKET_SIZE
+			for entry in reversed(self.usage_history):
+				if entry.timestamp < since:
+					break
+				if entry.timestamp < bucket_end and (not model or entry.model == model):
+					result.setdefault(entry.model, _UsageTotals()).add(entry.usage)
+
+		return result
 
+	async def get_usage_summary(self, model: str | None = None, since: datetime | None = None) -> UsageSummary:
+		"""Get summary of token usage and costs (costs calculated on-the-fly from the running totals)"""
 		if since:
-			filtered_usage = [u for u in filtered_usage if u.timestamp >= since]
+			totals_by_model = self._totals_since(since, model)
+		elif model:
+			totals_by_model = {model: self._totals[model]} if model in self._totals else {}
+		else:
+			totals_by_model = self._totals
 
-		if not filtered_usage:
+		if not totals_by_model:
 			return UsageSummary(
 				total_prompt_tokens=0,
 				total_prompt_cost=0.0,
@@ -397,42 +590,37 @@ class TokenCost:
 				entry_count=0,
 			)
 
-		# Calculate totals
-		total_prompt = sum(u.usage.prompt_tokens for u in filtered_usage)
-		total_completion = sum(u.usage.completion_tokens for u in filtered_usage)
-		total_tokens = total_prompt + total_completion
-		total_prompt_cached = sum(u.usage.prompt_cached_tokens or 0 for u in filtered_usage)
-		models = list({u.model for u in filtered_usage})
-
-		# Calculate per-model stats with record-by-record cost calculation
 		model_stats: dict[str, ModelUsageStats] = {}
+		total_prompt = 0
+		total_completion = 0
+		total_prompt_cached = 0
 		total_prompt_cost = 0.0
 		total_completion_cost = 0.0
 		total_prompt_cached_cost = 0.0
+		entry_count = 0
 
-		for entry in filtered_usage:
-			if entry.model not in model_stats:
-				model_stats[entry.model] = ModelUsageStats(model=entry.model)
+		for model_name, totals in totals_by_model.items():
+			stats = ModelUsageStats(
+				model=model_name,
+				prompt_tokens=totals.prompt_tokens,
+				completion_tokens=totals.completion_tokens,
+				total_tokens=totals.total_tokens,
+				invocations=totals.invocations,
+				average_tokens_per_invocation=totals.total_tokens / totals.invocations if totals.invocations else 0.0,
+			)
+			model_stats[model_name] = stats
 
-			stats = model_stats[entry.model]
-			stats.prompt_tokens += entry.usage.prompt_tokens
-			stats.completion_tokens += entry.usage.completion_tokens
-			stats.total_tokens += entry.usage.prompt_tokens + entry.usage.completion_tokens
-			stats.invocations += 1
+			total_prompt += totals.prompt_tokens
+			total_completion += totals.completion_tokens
+			total_prompt_cached += totals.prompt_cached_tokens
+			entry_count += totals.invocations
 
-			if self.include_cost:
-				# Calculate cost record by record using the updated calculate_cost function
-				cost = await self.calculate_cost(entry.model, entry.usage)
-				if cost:
-					stats.cost += cost.total_cost
-					total_prompt_cost += cost.prompt_cost
-					total_completion_cost += cost.completion_cost
-					total_prompt_cached_cost += cost.prompt_read_cached_cost or 0
-
-		# Calculate averages
-		for stats in model_stats.values():
-			if stats.invocations > 0:
-				stats.average_tokens_per_invocation = stats.total_tokens / stats.invocations
+			cost = await self._calculate_totals_cost(model_name, totals)
+			if cost:
+				stats.cost = cost.total_cost
+				total_prompt_cost += cost.prompt_cost
+				total_completion_cost += cost.completion_cost
+				total_prompt_cached_cost += cost.prompt_read_cached_cost or 0
 
 		return UsageSummary(
 			total_prompt_tokens=total_prompt,
@@ -441,9 +629,10 @@ class TokenCost:
 			total_prompt_cached_cost=total_prompt_cached_cost,
 			total_completion_tokens=total_completion,
 			total_completion_cost=total_completion_cost,
-			total_tokens=total_tokens,
-			total_cost=total_prompt_cost + total_completion_cost + total_prompt_cached_cost,
-			entry_count=len(filtered_usage),
+			total_tokens=total_prompt + total_completion,
+			# prompt cost already includes the cached-read part
+			total_cost=total_prompt_cost + total_completion_cost,
+			entry_count=entry_count,
 			by_model=model_stats,
 		)
 
@@ -459,7 +648,7 @@ class TokenCost:
 
 	async def log_usage_summary(self) -> None:
 		"""Log a comprehensive usage summary per model with colors and nice formatting"""
-		if not self.usage_history:
+		if not self._totals:
 			return
 
 		summary = await self.get_usage_summary()
@@ -506,19 +695,10 @@ class TokenCost:
 
 			# Format cost display (only if cost tracking is enabled)
 			if self.include_cost:
-				# Calculate per-model costs on-the-fly
-				total_model_cost = 0.0
-				model_prompt_cost = 0.0
-				model_completion_cost = 0.0
-
-				# Calculate costs for this model
-				for entry in self.usage_history:
-					if entry.model == model:
-						cost = await self.calculate_cost(entry.model, entry.usage)
-						if cost:
-							model_prompt_cost += cost.prompt_cost
-							model_completion_cost += cost.completion_cost
-
+				# Calculate per-model costs from the running totals
+				cost = await self._calculate_totals_cost(model, self._totals[model])
+				model_prompt_cost = cost.prompt_cost if cost else 0.0
+				model_completion_cost = cost.completion_cost if cost else 0.0
 				total_model_cost = model_prompt_cost + model_completion_cost
 
 				if total_model_cost > 0:
@@ -546,13 +726,16 @@ class TokenCost:
 		return summary.by_model
 
 	def clear_history(self) -> None:
-		"""Clear usage history"""
-		self.usage_history = []
+		"""Clear usage history and the running totals"""
+		self.usage_history.clear()
+		self._last_dropped_at = None
+		self._totals.clear()
+		self._buckets.clear()
 
 	async def refresh_pricing_data(self) -> None:
-		"""Force refresh of pricing data from GitHub"""
+		"""Force refresh of pricing data from GitHub (awaits the fetch)"""
 		if self.include_cost:
-			await self._fetch_and_cache_pricing_data()
+			await self._refresh_pricing(force_fetch=True)
 
 	async def clean_old_caches(self, keep_count: int = 3) -> None:
 		"""Clean up old cache files, keeping only the most recent ones"""
@@ -578,5 +761,5 @@ class TokenCost:
 	async def ensure_pricing_loaded(self) -> None:
 		"""Ensure pricing data is loaded in the background. Call this after creating the service."""
 		if not self._initialized and self.include_cost:
-			# This will run in the background and won't block
+			# Returns immediately, the bundled table is used until the refresh completes
 			await self.initialize()
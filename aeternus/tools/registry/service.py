@@ -22,7 +22,7 @@ from aeternus.tools.registry.views import (
 	RegisteredAction,
 	SpecialActionParameters,
 )
-from aeternus.utils import is_new_tab_page, match_url_with_domain_pattern, time_execution_async
+from aeternus.utils import compile_domain_patterns, is_new_tab_page, time_execution_async
 
 Context = TypeVar('Context')
 
@@ -37,6 +37,9 @@ class Registry(Generic[Context]):
 		self.telemetry = ProductTelemetry()
 		# Create a new list to avoid mutable default argument issues
 		self.exclude_actions = list(exclude_actions) if exclude_actions is not None else []
+		# create_action_model results by (include_actions, available action names), for registry version _action_models_version
+		self._action_models: dict[tuple[tuple[str, ...] | None, tuple[str, ...]], type[ActionModel]] = {}
+		self._action_models_version = -1
 
 	def exclude_action(self, action_name: str) -> None:
 		"""Exclude an action from the registry after initialization.
@@ -49,8 +52,7 @@ class Registry(Generic[Context]):
 			self.exclude_actions.append(action_name)
 
 		# Remove from registry if already registered
-		if action_name in self.registry.actions:
-			del self.registry.actions[action_name]
+		if self.registry.remove(action_name):
 			logger.debug(f'Excluded action "{action_name}" from registry')
 
 	def _get_special_param_types(self) -> dict[str, type | UnionType | None]:
@@ -315,7 +317,7 @@ class Registry(Generic[Context]):
 				param_model=actual_param_model,
 				domains=final_domains,
 			)
-			self.registry.actions[func.__name__] = action
+			self.registry.register(action)
 
 			# Return the normalized function so it can be called with kwargs
 			return normalized_func
@@ -434,14 +436,18 @@ class Registry(Generic[Context]):
 		# Process sensitive data based on format and current URL
 		applicable_secrets = {}
 
+		# it's a real url, check it using our custom allowed_domains scheme://*.example.com glob matching
+		matching_domains: set[str] = set()
+		if current_url and not is_new_tab_page(current_url):
+			domain_patterns = tuple(key for key, content in sensitive_data.items() if isinstance(content, dict))
+			matching_domains = compile_domain_patterns(domain_patterns).matching_patterns(current_url)
+
 		for domain_or_key, content in sensitive_data.items():
 			if isinstance(content, dict):
 				# New format: {domain_pattern: {key: value}}
 				# Only include secrets for domains that match the current URL
-				if current_url and not is_new_tab_page(current_url):
-					# it's a real url, check it using our custom allowed_domains scheme://*.example.com glob matching
-					if match_url_with_domain_pattern(current_url, domain_or_key):
-						applicable_secrets.update(content)
+				if domain_or_key in matching_domains:
+					applicable_secrets.update(content)
 			else:
 				# Old format: {key: value}, expose to all domains (only allowed for legacy reasons)
 				applicable_secrets[domain_or_key] = content
@@ -495,9 +501,10 @@ class Registry(Generic[Context]):
 
 		Each action model contains only the specific action being used,
 		rather than all actions with most set to None.
-		"""
-		from typing import Union
 
+		Models are cached until actions are registered or excluded, so pages enabling the same actions get the
+		same model class back.
+		"""
 		# Filter actions based on page_url if provided:
 		#   if page_url is None, only include actions with no filters
 		#   if page_url is provided, only include actions that match the URL
@@ -520,6 +527,19 @@ class Registry(Generic[Context]):
 			if domain_is_allowed:
 				available_actions[name] = action
 
+		if self._action_models_version != self.registry.version:
+			self._action_models.clear()
+			self._action_models_version = self.registry.version
+		cache_key = (tuple(include_actions) if include_actions is not None else None, tuple(available_actions))
+		cached_model = self._action_models.get(cache_key)
+		if cached_model is not None:
+			return cached_model
+
+		result_model = self._build_action_model(available_actions)
+		self._action_models[cache_key] = result_model
+		return result_model
+
+	def _build_action_model(self, available_actions: dict[str, RegisteredAction]) -> type[ActionModel]:
 		# Create individual action models for each action
 		individual_action_models: list[type[BaseModel]] = []
 
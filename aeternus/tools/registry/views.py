@@ -1,7 +1,7 @@
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from aeternus.browser import BrowserSession
 from aeternus.filesystem.file_system import FileSystem
@@ -24,8 +24,16 @@ class RegisteredAction(BaseModel):
 
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
+	# Generating the JSON schema is the expensive part, and an action does not change once registered
+	_prompt_description: str | None = PrivateAttr(default=None)
+
 	def prompt_description(self) -> str:
 		"""Get a description of the action for the prompt in unstructured format"""
+		if self._prompt_description is None:
+			self._prompt_description = self._build_prompt_description()
+		return self._prompt_description
+
+	def _build_prompt_description(self) -> str:
 		schema = self.param_model.model_json_schema()
 		params = []
 
@@ -89,6 +97,31 @@ class ActionRegistry(BaseModel):
 
 	actions: dict[str, RegisteredAction] = {}
 
+	# Bumped whenever actions are registered or removed, so caches built from the actions can tell they are stale
+	_version: int = PrivateAttr(default=0)
+	# Prompt descriptions memoized by the names of the actions they describe
+	_descriptions: dict[tuple[str, ...], str] = PrivateAttr(default_factory=dict)
+
+	@property
+	def version(self) -> int:
+		return self._version
+
+	def register(self, action: RegisteredAction) -> None:
+		"""Add an action, replacing any action with the same name"""
+		self.actions[action.name] = action
+		self._invalidate()
+
+	def remove(self, action_name: str) -> bool:
+		"""Remove an action by name, returning whether it was registered"""
+		if self.actions.pop(action_name, None) is None:
+			return False
+		self._invalidate()
+		return True
+
+	def _invalidate(self) -> None:
+		self._version += 1
+		self._descriptions.clear()
+
 	@staticmethod
 	def _match_domains(domains: list[str] | None, url: str) -> bool:
 		"""
@@ -105,13 +138,10 @@ class ActionRegistry(BaseModel):
 		if domains is None or not url:
 			return True
 
-		# Use the centralized URL matching logic from utils
-		from aeternus.utils import match_url_with_domain_pattern
+		# Use the centralized URL matching logic from utils, compiled once per distinct domains list
+		from aeternus.utils import compile_domain_patterns
 
-		for domain_pattern in domains:
-			if match_url_with_domain_pattern(url, domain_pattern):
-				return True
-		return False
+		return compile_domain_patterns(tuple(domains)).matches(url)
 
 	def get_prompt_description(self, page_url: str | None = None) -> str:
 		"""Get a description of all actions for the prompt
@@ -126,20 +156,20 @@ class ActionRegistry(BaseModel):
 		"""
 		if page_url is None:
 			# For system prompt (no URL provided), include only actions with no filters
-			return '\n'.join(action.prompt_description() for action in self.actions.values() if action.domains is None)
-
-		# only include filtered actions for the current page URL
-		filtered_actions = []
-		for action in self.actions.values():
-			if not action.domains:
-				# skip actions with no filters, they are already included in the system prompt
-				continue
-
-			# Check domain filter
-			if self._match_domains(action.domains, page_url):
-				filtered_actions.append(action)
-
-		return '\n'.join(action.prompt_description() for action in filtered_actions)
+			names = tuple(name for name, action in self.actions.items() if action.domains is None)
+		else:
+			# only include filtered actions for the current page URL,
+			# actions with no filters are already included in the system prompt
+			names = tuple(
+				name for name, action in self.actions.items() if action.domains and self._match_domains(action.domains, page_url)
+			)
+
+		# Pages whose domains enable the same actions share one description, identical from step to step
+		description = self._descriptions.get(names)
+		if description is None:
+			description = '\n'.join(self.actions[name].prompt_description() for name in names)
+			self._descriptions[names] = description
+		return description
 
 
 class SpecialActionParameters(BaseModel):
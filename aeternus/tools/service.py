@@ -450,7 +450,8 @@ class Tools(Generic[Context]):
 						# The path should be just the filename for FileSystem files
 						file_obj = file_system.get_file(params.path)
 						if file_obj:
-							# File is managed by FileSystem, construct the full path
+							# File is managed by FileSystem, construct the full path (after writing buffered changes)
+							await file_system.flush()
 							file_system_path = str(file_system.get_dir() / params.path)
 							params = UploadFileAction(index=params.index, path=file_system_path)
 						else:
@@ -1321,6 +1322,8 @@ Validated Code (after quote fixing):
 							if file_content:
 								attachments.append(file_name)
 
+				# Attachments are read from disk
+				await file_system.flush()
 				attachments = [str(file_system.get_dir() / file_name) for file_name in attachments]
 
 				return ActionResult(
@@ -1362,8 +1365,7 @@ Validated Code (after quote fixing):
 	def _register_click_action(self) -> None:
 		"""Register the click action with or without coordinate support based on current setting."""
 		# Remove existing click action if present
-		if 'click' in self.registry.registry.actions:
-			del self.registry.registry.actions['click']
+		self.registry.registry.remove('click')
 
 		if self._coordinate_clicking_enabled:
 			# Register click action WITH coordinate support
@@ -1643,6 +1645,9 @@ class CodeAgentTools(Tools[Context]):
 						elif os.path.exists(file_name):
 							attachments.append(file_name)
 
+			# Attachments are read from disk
+			await file_system.flush()
+
 			# Convert relative paths to absolute paths - handle both FileSystem-managed and regular files
 			resolved_attachments = []
 			for file_name in attachments:
@@ -1696,7 +1701,8 @@ class CodeAgentTools(Tools[Context]):
 							# The path should be just the filename for FileSystem files
 							file_obj = file_system.get_file(params.path)
 							if file_obj:
-								# File is managed by FileSystem, construct the full path
+								# File is managed by FileSystem, construct the full path (after writing buffered changes)
+								await file_system.flush()
 								file_system_path = str(file_system.get_dir() / params.path)
 								params = UploadFileAction(index=params.index, path=file_system_path)
 							else:
@@ -5,9 +5,9 @@ import platform
 import re
 import signal
 import time
-from collections.abc import Callable, Coroutine
-from fnmatch import fnmatch
-from functools import cache, wraps
+from collections.abc import Callable, Coroutine, Iterable
+from fnmatch import fnmatch, translate
+from functools import cache, lru_cache, wraps
 from pathlib import Path
 from sys import stderr
 from typing import Any, ParamSpec, TypeVar
@@ -555,6 +555,236 @@ def match_url_with_domain_pattern(url: str, domain_pattern: str, log_warnings: b
 		return False
 
 
+class DomainMatcher:
+	"""Precompiled matcher for a large set of domain / URL patterns.
+
+	Patterns are sorted into the cheapest structure that can answer them:
+	- exact hostnames go into a hash set
+	- ``*.example.com`` style suffix patterns go into a trie keyed by reversed domain labels
+	- any remaining globs are folded into one combined regex per match target (host, origin or full URL)
+	- plain URL prefixes are folded into one combined regex as well
+
+	Host patterns are grouped by the scheme glob they apply to, so a lookup costs one URL parse, one set lookup,
+	a walk of at most (number of labels in the host) trie nodes, and at most a few regex searches,
+	regardless of how many patterns were compiled.
+
+	Use :meth:`from_domain_patterns` for the ``match_url_with_domain_pattern`` semantics (Registry action
+	domains, sensitive data scoping). SecurityWatchdog builds its own matcher with navigation semantics
+	using the ``add_*`` builder methods.
+	"""
+
+	_TERMINAL = None  # trie key marking the end of a suffix pattern, can never collide with a label
+
+	def __init__(self) -> None:
+		# scheme glob -> host structures
+		self._exact_hosts: dict[str, dict[str, list[str]]] = {}
+		self._suffix_tries: dict[str, dict[str | None, Any]] = {}
+		self._host_globs: dict[str, list[tuple[str, str]]] = {}
+		self._any_host: dict[str, list[str]] = {}
+		# scheme-independent targets
+		self._origin_globs: list[tuple[str, str]] = []
+		self._url_globs: list[tuple[str, str]] = []
+		self._url_prefixes: list[tuple[str, str]] = []
+
+		self._compiled = False
+		self._host_regexes: dict[str, re.Pattern[str]] = {}
+		self._origin_regex: re.Pattern[str] | None = None
+		self._url_regex: re.Pattern[str] | None = None
+		self._schemes_cache: dict[str, list[str]] = {}
+
+	# --- Builder -----------------------------------------------------------------
+
+	def add_exact_host(self, host: str, source: str, scheme_glob: str = '*') -> None:
+		self._exact_hosts.setdefault(scheme_glob, {}).setdefault(host, []).append(source)
+		self._compiled = False
+
+	def add_host_suffix(self, domain: str, source: str, scheme_glob: str = '*') -> None:
+		"""Match ``domain`` itself and every subdomain of it."""
+		node = self._suffix_tries.setdefault(scheme_glob, {})
+		for label in reversed(domain.split('.')):
+			node = node.setdefault(label, {})
+		node.setdefault(self._TERMINAL, []).append(source)
+		self._compiled = False
+
+	def add_host_glob(self, glob: str, source: str, scheme_glob: str = '*') -> None:
+		if glob == '*':
+			self._any_host.setdefault(scheme_glob, []).append(source)
+		else:
+			self._host_globs.setdefault(scheme_glob, []).append((glob, source))
+		self._compiled = False
+
+	def add_origin_glob(self, glob: str, source: str) -> None:
+		"""Glob matched against ``scheme://host``."""
+		self._origin_globs.append((glob, source))
+		self._compiled = False
+
+	def add_url_glob(self, glob: str, source: str) -> None:
+		"""Glob matched against the full URL."""
+		self._url_globs.append((glob, source))
+		self._compiled = False
+
+	def add_url_prefix(self, prefix: str, source: str) -> None:
+		self._url_prefixes.append((prefix, source))
+		self._compiled = False
+
+	@staticmethod
+	def _combine(alternatives: list[str]) -> re.Pattern[str] | None:
+		if not alternatives:
+			return None
+		return re.compile('|'.join(f'(?:{alternative})' for alternative in alternatives))
+
+	def compile(self) -> 'DomainMatcher':
+		"""Build the combined regexes, called automatically on first lookup."""
+		self._host_regexes = {}
+		for scheme_glob, globs in self._host_globs.items():
+			regex = self._combine([translate(glob) for glob, _ in globs])
+			if regex is not None:
+				self._host_regexes[scheme_glob] = regex
+		self._origin_regex = self._combine([translate(glob) for glob, _ in self._origin_globs])
+		self._url_regex = self._combine(
+			[translate(glob) for glob, _ in self._url_globs] + [re.escape(prefix) for prefix, _ in self._url_prefixes]
+		)
+		self._schemes_cache = {}
+		self._compiled = True
+		return self
+
+	# --- Lookup ------------------------------------------------------------------
+
+	def _scheme_globs_for(self, scheme: str) -> list[str]:
+		"""Scheme globs that accept ``scheme``, cached since there are only a handful of distinct schemes."""
+		scheme_globs = self._schemes_cache.get(scheme)
+		if scheme_globs is None:
+			all_globs = set(self._exact_hosts) | set(self._suffix_tries) | set(self._host_globs) | set(self._any_host)
+			scheme_globs = [scheme_glob for scheme_glob in all_globs if fnmatch(scheme, scheme_glob)]
+			self._schemes_cache[scheme] = scheme_globs
+		return scheme_globs
+
+	def _iter_suffix_matches(self, trie: dict[str | None, Any], host: str):
+		node = trie
+		for label in reversed(host.split('.')):
+			node = node.get(label)
+			if node is None:
+				return
+			if self._TERMINAL in node:
+				yield from node[self._TERMINAL]
+
+	def _iter_matches(self, url: str, scheme: str, host: str, first_only: bool):
+		"""Yield the source patterns matching the URL; with first_only, stop at the first hit of each structure."""
+		if not self._compiled:
+			self.compile()
+
+		for scheme_glob in self._scheme_globs_for(scheme):
+			if scheme_glob in self._any_host:
+				yield from self._any_host[scheme_glob]
+			exact = self._exact_hosts.get(scheme_glob)
+			if exact and host in exact:
+				yield from exact[host]
+			trie = self._suffix_tries.get(scheme_glob)
+			if trie:
+				yield from self._iter_suffix_matches(trie, host)
+			regex = self._host_regexes.get(scheme_glob)
+			if regex is not None and regex.fullmatch(host):
+				if first_only:
+					yield scheme_glob
+				else:
+					yield from (source for glob, source in self._host_globs[scheme_glob] if fnmatch(host, glob))
+
+		if self._origin_regex is not None and self._origin_regex.fullmatch(origin := f'{scheme}://{host}'):
+			if first_only:
+				yield origin
+			else:
+				yield from (source for glob, source in self._origin_globs if fnmatch(origin, glob))
+
+		if self._url_regex is not None and self._url_regex.match(url):
+			if first_only:
+				yield url
+			else:
+				yield from (source for glob, source in self._url_globs if fnmatch(url, glob))
+				yield from (source for prefix, source in self._url_prefixes if url.startswith(prefix))
+
+	def matches_parts(self, url: str, scheme: str, host: str) -> bool:
+		"""Check an already parsed URL, for callers that need the parsed components anyway."""
+		return next(self._iter_matches(url, scheme, host, first_only=True), None) is not None
+
+	def matches(self, url: str) -> bool:
+		"""True if any compiled pattern matches the URL."""
+		parsed = self._parse(url)
+		return parsed is not None and self.matches_parts(url, *parsed)
+
+	def matching_patterns(self, url: str) -> set[str]:
+		"""All original patterns that match the URL, e.g. to pick which sensitive_data domains apply."""
+		parsed = self._parse(url)
+		if parsed is None:
+			return set()
+		return set(self._iter_matches(url, *parsed, first_only=False))
+
+	@staticmethod
+	def _parse(url: str) -> tuple[str, str] | None:
+		if is_new_tab_page(url):
+			return None
+		try:
+			parsed_url = urlparse(url)
+		except Exception:
+			return None
+		scheme = parsed_url.scheme.lower() if parsed_url.scheme else ''
+		host = parsed_url.hostname.lower() if parsed_url.hostname else ''
+		if not scheme or not host:
+			return None
+		return scheme, host
+
+	# --- Constructors --------------------------------------------------------------
+
+	@classmethod
+	def from_domain_patterns(cls, domain_patterns: Iterable[str], log_warnings: bool = False) -> 'DomainMatcher':
+		"""Compile patterns with exactly the semantics of :func:`match_url_with_domain_pattern`."""
+		matcher = cls()
+		for source in domain_patterns:
+			domain_pattern = source.lower()
+
+			if '://' in domain_pattern:
+				pattern_scheme, pattern_domain = domain_pattern.split('://', 1)
+			else:
+				pattern_scheme = 'https'  # Default to matching only https for security
+				pattern_domain = domain_pattern
+
+			if ':' in pattern_domain and not pattern_domain.startswith(':'):
+				pattern_domain = pattern_domain.split(':', 1)[0]
+
+			if pattern_domain == '*':
+				matcher.add_host_glob('*', source, pattern_scheme)
+				continue
+
+			if '*' not in pattern_domain:
+				matcher.add_exact_host(pattern_domain, source, pattern_scheme)
+				continue
+
+			# Same unsafe pattern rules as match_url_with_domain_pattern, these never match
+			if (
+				pattern_domain.count('*.') > 1
+				or pattern_domain.count('.*') > 1
+				or pattern_domain.endswith('.*')
+				or '*' in pattern_domain.replace('*.', '')
+			):
+				if log_warnings:
+					logger.error(f'⛔️ Unsupported wildcard pattern=[{source}] will never match')
+				continue
+
+			if pattern_domain.startswith('*.') and not any(c in pattern_domain for c in '?[]'):
+				# *.google.com matches google.com and all of its subdomains
+				matcher.add_host_suffix(pattern_domain[2:], source, pattern_scheme)
+			else:
+				if pattern_domain.startswith('*.'):
+					matcher.add_host_glob(pattern_domain[2:], source, pattern_scheme)
+				matcher.add_host_glob(pattern_domain, source, pattern_scheme)
+		return matcher.compile()
+
+
+@lru_cache(maxsize=256)
+def compile_domain_patterns(domain_patterns: tuple[str, ...], log_warnings: bool = False) -> DomainMatcher:
+	"""Cached :meth:`DomainMatcher.from_domain_patterns`, so each distinct pattern list is compiled once."""
+	return DomainMatcher.from_domain_patterns(domain_patterns, log_warnings=log_warnings)
+
+
 def merge_dicts(a: dict, b: dict, path: tuple[str, ...] = ()):
 	for key in b:
 		if key in a:
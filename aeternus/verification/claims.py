@@ -0,0 +1,280 @@
+"""
+Claim cross-checking against the local knowledge store.
+
+Pipeline: extract check-worthy claims from content, retrieve evidence chunks for each claim from the VectorStore
+(excluding the page the claims came from), and score support or contradiction with a pluggable ClaimScorer.
+Claims are checked concurrently with bounded parallelism, and verdicts are cached by (claim hash, evidence set
+hash) so re-verifying an already seen page costs a few cache lookups.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, Field
+
+from aeternus.llm.base import BaseChatModel
+from aeternus.llm.messages import SystemMessage, UserMessage
+
+if TYPE_CHECKING:
+	from aeternus.knowledge.embeddings import EmbeddingsProvider
+	from aeternus.knowledge.store import SearchResult, VectorStore
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"“(])')
+_WORD_RE = re.compile(r'\w+')
+_NUMBER_RE = re.compile(r'\d')
+_CAPITALIZED_RE = re.compile(r'(?<!^)(?<![.!?]\s)\b[A-Z][a-z]+')
+# Statements of fact usually carry a copula or a reporting / quantity verb
+_FACT_VERB_RE = re.compile(
+	r'\b(is|are|was|were|has|have|had|will|became|founded|released|announced|reported|contains|costs|reached|'
+	r'increased|decreased|won|lost|born|died|located|invented|discovered|acquired|launched|said|says)\b',
+	re.IGNORECASE,
+)
+_HEDGE_RE = re.compile(r'\b(I think|we think|maybe|perhaps|might|could|click|subscribe|sign up|cookie|log in)\b', re.IGNORECASE)
+_NEGATION_RE = re.compile(r"\b(not|no|never|none|neither|nor|without|n't|false|incorrect|denied|untrue)\b", re.IGNORECASE)
+_STOPWORDS = frozenset(
+	'a an the and or but of to in on at for with by from as is are was were be been being it its this that these those '
+	'he she they we you i his her their our your has have had do does did will would can could should may might'.split()
+)
+
+
+class ClaimLabel(str, Enum):
+	SUPPORTED = 'supported'
+	CONTRADICTED = 'contradicted'
+	UNVERIFIED = 'unverified'
+
+
+@dataclass
+class Evidence:
+	url: str
+	title: str
+	text: str
+	score: float
+
+
+@dataclass
+class ClaimVerdict:
+	claim: str
+	label: ClaimLabel
+	confidence: float
+	rationale: str = ''
+	evidence: list[Evidence] = field(default_factory=list)
+	cached: bool = False
+
+	def to_dict(self) -> dict:
+		return {
+			'claim': self.claim,
+			'label': self.label.value,
+			'confidence': self.confidence,
+			'rationale': self.rationale,
+			'evidence': [{'url': e.url, 'title': e.title, 'text': e.text, 'score': e.score} for e in self.evidence],
+			'cached': self.cached,
+		}
+
+
+def extract_claims(content: str, max_claims: int = 20, min_words: int = 6, max_words: int = 60) -> list[str]:
+	"""Pick declarative, check-worthy sentences: ones stating facts with numbers, names or fact verbs."""
+	candidates: list[tuple[int, int, str]] = []
+	seen: set[str] = set()
+	for line in content.splitlines():
+		line = line.strip().lstrip('#>-*|').strip()
+		if not line or line.startswith(('```', '![', '[')):
+			continue
+		for sentence in _SENTENCE_SPLIT_RE.split(line):
+			sentence = sentence.strip()
+			words = _WORD_RE.findall(sentence)
+			if not min_words <= len(words) <= max_words or sentence.endswith('?') or _HEDGE_RE.search(sentence):
+				continue
+			key = ' '.join(w.lower() for w in words)
+			if key in seen:
+				continue
+			seen.add(key)
+
+			score = 0
+			score += 2 if _NUMBER_RE.search(sentence) else 0
+			score += min(2, len(_CAPITALIZED_RE.findall(sentence)))
+			score += 1 if _FACT_VERB_RE.search(sentence) else 0
+			if score >= 2:
+				candidates.append((score, -len(candidates), sentence))
+
+	# Highest scoring claims, reported in document order
+	best = sorted(candidates, reverse=True)[:max_claims]
+	return [sentence for _, _, sentence in sorted(best, key=lambda c: -c[1])]
+
+
+def _content_words(text: str) -> set[str]:
+	return {w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS}
+
+
+class ClaimScorer(ABC):
+	"""Decides whether evidence supports or contradicts a claim."""
+
+	# Part of the verdict cache key, so verdicts from different scorers never mix
+	name: str = 'scorer'
+
+	@abstractmethod
+	async def score(self, claim: str, evidence: list[Evidence]) -> ClaimVerdict: ...
+
+
+class LexicalClaimScorer(ClaimScorer):
+	"""
+	Dependency-free scorer: content-word overlap with each evidence passage, with a negation mismatch read as contradiction.
+
+	Coarse, but fast and local. Plug in LLMClaimScorer or a local NLI model for real entailment judgements.
+	"""
+
+	name = 'lexical'
+
+	def __init__(self, support_threshold: float = 0.6):
+		self.support_threshold = support_threshold
+
+	async def score(self, claim: str, evidence: list[Evidence]) -> ClaimVerdict:
+		claim_words = _content_words(claim)
+		if not claim_words or not evidence:
+			return ClaimVerdict(claim, ClaimLabel.UNVERIFIED, 0.0, 'No evidence found in the knowledge store', evidence)
+
+		claim_negated = bool(_NEGATION_RE.search(claim))
+		best_overlap, best_contradiction = 0.0, 0.0
+		for item in evidence:
+			for sentence in _SENTENCE_SPLIT_RE.split(item.text):
+				overlap = len(claim_words & _content_words(sentence)) / len(claim_words)
+				if overlap < self.support_threshold:
+					continue
+				if bool(_NEGATION_RE.search(sentence)) != claim_negated:
+					best_contradiction = max(best_contradiction, overlap)
+				else:
+					best_overlap = max(best_overlap, overlap)
+
+		if best_contradiction > best_overlap:
+			return ClaimVerdict(claim, ClaimLabel.CONTRADICTED, round(best_contradiction, 3), 'Matching passage with opposite polarity', evidence)
+		if best_overlap:
+			return ClaimVerdict(claim, ClaimLabel.SUPPORTED, round(best_overlap, 3), 'Matching passage found', evidence)
+		return ClaimVerdict(claim, ClaimLabel.UNVERIFIED, 0.0, 'No passage states this claim', evidence)
+
+
+class _LLMVerdict(BaseModel):
+	label: ClaimLabel
+	confidence: float = Field(ge=0.0, le=1.0)
+	rationale: str
+
+
+class LLMClaimScorer(ClaimScorer):
+	"""Asks the LLM for a structured verdict given the claim and numbered evidence passages."""
+
+	SYSTEM_PROMPT = (
+		'You check factual claims against evidence passages collected from previously visited web pages. '
+		'Answer "supported" only if a passage states the claim, "contradicted" only if a passage states something '
+		'incompatible with it, otherwise "unverified". Do not use outside knowledge. Keep the rationale to one sentence.'
+	)
+
+	def __init__(self, llm: BaseChatModel):
+		self.llm = llm
+		self.name = f'llm:{llm.provider}:{llm.model}'
+
+	async def score(self, claim: str, evidence: list[Evidence]) -> ClaimVerdict:
+		if not evidence:
+			return ClaimVerdict(claim, ClaimLabel.UNVERIFIED, 0.0, 'No evidence found in the knowledge store', evidence)
+
+		passages = '\n\n'.join(f'[{i + 1}] ({e.url})\n{e.text}' for i, e in enumerate(evidence))
+		response = await self.llm.ainvoke(
+			[SystemMessage(content=self.SYSTEM_PROMPT), UserMessage(content=f'Claim: {claim}\n\nEvidence:\n{passages}')],
+			output_format=_LLMVerdict,
+		)
+		verdict = response.completion
+		return ClaimVerdict(claim, verdict.label, verdict.confidence, verdict.rationale, evidence)
+
+
+class ClaimVerifier:
+	"""Runs the extract -> retrieve -> score pipeline with bounded concurrency and a verdict cache."""
+
+	def __init__(
+		self,
+		store: 'VectorStore',
+		embeddings: 'EmbeddingsProvider',
+		scorer: ClaimScorer | None = None,
+		evidence_k: int = 4,
+		min_evidence_score: float = 0.3,
+		max_concurrency: int = 4,
+		cache_size: int = 4096,
+	):
+		self.store = store
+		self.embeddings = embeddings
+		self.scorer = scorer or LexicalClaimScorer()
+		self.evidence_k = evidence_k
+		self.min_evidence_score = min_evidence_score
+		self.max_concurrency = max_concurrency
+		self.cache_size = cache_size
+		self._verdicts: OrderedDict[tuple[str, str, str], ClaimVerdict] = OrderedDict()
+		# Claim embeddings are reused across re-verifications even when the evidence set changes
+		self._query_vectors: OrderedDict[str, list[float]] = OrderedDict()
+
+	@staticmethod
+	def _claim_hash(claim: str) -> str:
+		return hashlib.sha256(' '.join(_WORD_RE.findall(claim.lower())).encode()).hexdigest()
+
+	@staticmethod
+	def _evidence_hash(evidence: list[Evidence]) -> str:
+		digest = hashlib.sha256()
+		for item in sorted(evidence, key=lambda e: (e.url, e.text)):
+			digest.update(item.url.encode())
+			digest.update(b'\0')
+			digest.update(item.text.encode())
+			digest.update(b'\0')
+		return digest.hexdigest()
+
+	def _remember(self, cache: OrderedDict, key, value) -> None:
+		cache[key] = value
+		cache.move_to_end(key)
+		while len(cache) > self.cache_size:
+			cache.popitem(last=False)
+
+	async def _retrieve(self, claim: str, claim_hash: str, source_url: str | None) -> list[Evidence]:
+		vector = self._query_vectors.get(claim_hash)
+		if vector is None:
+			vector = await self.embeddings.embed_query(claim)
+			self._remember(self._query_vectors, claim_hash, vector)
+
+		# Over-fetch so excluding the source page still leaves evidence_k results
+		results: list[SearchResult] = await asyncio.to_thread(self.store.search, vector, self.evidence_k * 3)
+		evidence = [
+			Evidence(r.url, r.title, r.text, r.score)
+			for r in results
+			if r.url != source_url and r.score >= self.min_evidence_score
+		]
+		return evidence[: self.evidence_k]
+
+	async def verify_claim(self, claim: str, source_url: str | None = None) -> ClaimVerdict:
+		claim_hash = self._claim_hash(claim)
+		evidence = await self._retrieve(claim, claim_hash, source_url)
+
+		key = (self.scorer.name, claim_hash, self._evidence_hash(evidence))
+		cached = self._verdicts.get(key)
+		if cached is not None:
+			self._verdicts.move_to_end(key)
+			return ClaimVerdict(claim, cached.label, cached.confidence, cached.rationale, evidence, cached=True)
+
+		verdict = await self.scorer.score(claim, evidence)
+		self._remember(self._verdicts, key, verdict)
+		return verdict
+
+	async def verify(self, claims: list[str], source_url: str | None = None) -> list[ClaimVerdict]:
+		"""Check independent claims concurrently, at most max_concurrency at a time, in input order."""
+		semaphore = asyncio.Semaphore(self.max_concurrency)
+
+		async def _bounded(claim: str) -> ClaimVerdict:
+			async with semaphore:
+				try:
+					return await self.verify_claim(claim, source_url)
+				except Exception as e:
+					logger.debug(f'Failed to verify claim {claim[:60]!r}: {type(e).__name__}: {e}')
+					return ClaimVerdict(claim, ClaimLabel.UNVERIFIED, 0.0, f'Verification failed: {type(e).__name__}')
+
+		return list(await asyncio.gather(*(_bounded(claim) for claim in claims)))
@@ -0,0 +1,317 @@
+"""
+Domain reputation lookups against large allowlists and blocklists.
+
+List files may be plain domain lists, hosts files (``0.0.0.0 tracker.example``) or adblock-style domain rules
+(``||tracker.example^``). Entries cover the domain and all of its subdomains, matching whole labels, so
+``wikipedia.org`` covers ``en.wikipedia.org`` but not ``evil-wikipedia.org.example``.
+
+Domains are stored as sorted packed arrays of 64-bit hashes (8 bytes per entry), and a lookup checks each
+suffix of the host from most to least specific, so it costs O(number of labels) hash probes regardless of list size.
+"""
+
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Suffixes under which anyone can register a name, used when no public suffix list file is configured.
+# Trusting one of these would trust every site hosted below it.
+DEFAULT_PUBLIC_SUFFIXES = (
+	'ac.uk', 'co.uk', 'gov.uk', 'ltd.uk', 'me.uk', 'net.uk', 'org.uk', 'plc.uk', 'sch.uk',
+	'com.au', 'edu.au', 'gov.au', 'net.au', 'org.au',
+	'co.jp', 'ne.jp', 'or.jp', 'ac.jp', 'go.jp',
+	'co.nz', 'org.nz', 'net.nz', 'co.za', 'org.za', 'co.in', 'net.in', 'org.in', 'gov.in', 'ac.in',
+	'com.br', 'net.br', 'org.br', 'gov.br', 'com.cn', 'net.cn', 'org.cn', 'gov.cn', 'com.mx', 'org.mx',
+	'com.tr', 'com.tw', 'com.hk', 'com.sg', 'com.ar', 'co.kr', 'or.kr', 'co.il', 'com.ua', 'com.pl',
+	'github.io', 'gitlab.io', 'blogspot.com', 'herokuapp.com', 'netlify.app', 'vercel.app', 'pages.dev',
+	'workers.dev', 'web.app', 'firebaseapp.com', 'appspot.com', 'azurewebsites.net', 'cloudfront.net',
+	's3.amazonaws.com', 'wordpress.com', 'glitch.me', 'repl.co', 'onrender.com', 'fly.dev', 'ngrok.io',
+)  # fmt: skip
+
+
+def _hash_domain(domain: str) -> int:
+	# Python's string hash is salted per process, fine since the arrays are rebuilt from the lists on every start
+	return hash(domain) & 0xFFFFFFFFFFFFFFFF
+
+
+def iter_suffixes(host: str) -> Iterable[str]:
+	"""a.b.example.com, b.example.com, example.com, com"""
+	yield host
+	dot = host.find('.')
+	while dot != -1:
+		yield host[dot + 1 :]
+		dot = host.find('.', dot + 1)
+
+
+def normalize_domain(domain: str) -> str:
+	domain = domain.strip().strip('.').lower()
+	if not domain.isascii():
+		try:
+			domain = domain.encode('idna').decode('ascii')
+		except UnicodeError:
+			pass
+	return domain
+
+
+class DomainSet:
+	"""Immutable set of domains as a sorted array of 64-bit hashes.
+
+	A bitmap over the low hash bits (about 4 bytes per entry) answers most misses without the binary search.
+	"""
+
+	def __init__(self, domains: Iterable[str] = ()):
+		self._hashes = array('Q', sorted({_hash_domain(domain) for domain in domains}))
+		filter_bits = max(1 << 16, 1 << (len(self._hashes) * 32 - 1).bit_length())
+		self._filter_mask = filter_bits - 1
+		self._filter = bytearray(filter_bits // 8)
+		for value in self._hashes:
+			bit = value & self._filter_mask
+			self._filter[bit >> 3] |= 1 << (bit & 7)
+
+	def __len__(self) -> int:
+		return len(self._hashes)
+
+	def __contains__(self, domain: str) -> bool:
+		value = _hash_domain(domain)
+		bit = value & self._filter_mask
+		if not self._filter[bit >> 3] & (1 << (bit & 7)):
+			return False
+		i = bisect_left(self._hashes, value)
+		return i < len(self._hashes) and self._hashes[i] == value
+
+
+class PublicSuffixList:
+	"""Public suffix rules (https://publicsuffix.org/list/), including wildcard and exception rules."""
+
+	def __init__(self, rules: Iterable[str] = DEFAULT_PUBLIC_SUFFIXES):
+		self._rules: set[str] = set()
+		self._wildcards: set[str] = set()
+		self._exceptions: set[str] = set()
+		for rule in rules:
+			rule = rule.strip().lower()
+			if not rule or rule.startswith('//'):
+				continue
+			rule = rule.split()[0]
+			if rule.startswith('!'):
+				self._exceptions.add(rule[1:])
+			elif rule.startswith('*.'):
+				self._wildcards.add(rule[2:])
+			else:
+				self._rules.add(rule)
+
+	@classmethod
+	def from_file(cls, path: str | Path) -> 'PublicSuffixList':
+		with open(path, encoding='utf-8') as f:
+			return cls(f)
+
+	def public_suffix(self, host: str) -> str:
+		"""Longest public suffix of host (the last label when no rule matches)."""
+		candidate = None
+		for candidate in iter_suffixes(host):
+			if candidate in self._exceptions:
+				return candidate.split('.', 1)[1] if '.' in candidate else candidate
+			if candidate in self._rules:
+				return candidate
+			if '.' in candidate and candidate.split('.', 1)[1] in self._wildcards:
+				return candidate
+		return candidate or host
+
+	def registrable_domain(self, host: str) -> str | None:
+		"""The public suffix plus one label (e.g. bbc.co.uk for news.bbc.co.uk), None if host is a public suffix."""
+		suffix = self.public_suffix(host)
+		if host == suffix:
+			return None
+		prefix = host[: -len(suffix) - 1]
+		return f'{prefix.rsplit(".", 1)[-1]}.{suffix}'
+
+	def is_public_suffix(self, host: str) -> bool:
+		return self.public_suffix(host) == host
+
+
+def parse_domain_list(lines: Iterable[str]) -> Iterable[str]:
+	"""Yield domains from plain, hosts-file or adblock-style list lines, skipping comments and blanks."""
+	for line in lines:
+		line = line.split('#', 1)[0].strip()
+		if not line or line.startswith('!') or line.startswith('['):
+			continue
+		if line.startswith('||'):
+			# Adblock domain rule, only the plain ||domain^ form describes a whole domain
+			line = line[2:].split('^', 1)[0]
+			if '/' in line or '*' in line:
+				continue
+		else:
+			parts = line.split()
+			# hosts file: "<ip> <host> [aliases...]"
+			if len(parts) > 1 and (parts[0][:1].isdigit() or ':' in parts[0]):
+				parts = parts[1:]
+			line = parts[0]
+		domain = normalize_domain(line)
+		if domain and domain not in ('localhost', 'localhost.localdomain', 'broadcasthost', '0.0.0.0'):
+			yield domain
+
+
+@dataclass
+class ReputationResult:
+	status: str  # 'trusted' | 'flagged' | 'neutral'
+	reason: str
+	host: str = ''
+	registrable_domain: str | None = None
+	matched: str | None = None  # the list entry that matched
+
+	def to_dict(self) -> dict:
+		return {
+			'status': self.status,
+			'reason': self.reason,
+			'host': self.host,
+			'registrable_domain': self.registrable_domain,
+			'matched': self.matched,
+		}
+
+
+class ReputationEngine:
+	"""
+	Scores hosts against allow and block lists, reloading list files when they change on disk.
+
+	The most specific matching entry wins, so blocking ``evil.github.com`` overrides trusting ``github.com``.
+	On an equally specific match the blocklist wins. Allowlist entries that are public suffixes are ignored.
+	"""
+
+	def __init__(
+		self,
+		trusted: Iterable[str] = (),
+		flagged: Iterable[str] = (),
+		allowlist_files: Iterable[str | Path] = (),
+		blocklist_files: Iterable[str | Path] = (),
+		public_suffix_file: str | Path | None = None,
+		reload_interval: float = 30.0,
+	):
+		self._trusted_inline = [normalize_domain(d) for d in trusted]
+		self._flagged_inline = [normalize_domain(d) for d in flagged]
+		self.allowlist_files = [Path(p).expanduser() for p in allowlist_files]
+		self.blocklist_files = [Path(p).expanduser() for p in blocklist_files]
+		self.public_suffix_file = Path(public_suffix_file).expanduser() if public_suffix_file else None
+		self.reload_interval = reload_interval
+
+		self._reload_lock = threading.Lock()
+		self._reloading = False
+		self._last_reload_check = time.monotonic()
+		self._mtimes = self._current_mtimes()
+		self._suffixes, self._trusted, self._flagged = self._build()
+
+	def _current_mtimes(self) -> dict[Path, float]:
+		mtimes = {}
+		for path in [*self.allowlist_files, *self.blocklist_files, *([self.public_suffix_file] if self.public_suffix_file else [])]:
+			try:
+				mtimes[path] = os.stat(path).st_mtime
+			except OSError:
+				mtimes[path] = 0.0
+		return mtimes
+
+	def _read_lists(self, paths: list[Path]) -> list[str]:
+		domains: list[str] = []
+		for path in paths:
+			try:
+				with open(path, encoding='utf-8', errors='replace') as f:
+					domains.extend(parse_domain_list(f))
+			except OSError as e:
+				logger.warning(f'Could not read domain list {path}: {e}')
+		return domains
+
+	def _build(self) -> tuple[PublicSuffixList, DomainSet, DomainSet]:
+		start = time.perf_counter()
+		suffixes = PublicSuffixList()
+		if self.public_suffix_file:
+			try:
+				suffixes = PublicSuffixList.from_file(self.public_suffix_file)
+			except OSError as e:
+				logger.warning(f'Could not read public suffix list {self.public_suffix_file}: {e}, using built-in suffixes')
+
+		trusted_domains = self._trusted_inline + self._read_lists(self.allowlist_files)
+		rejected = [d for d in trusted_domains if suffixes.is_public_suffix(d)]
+		if rejected:
+			logger.warning(f'Ignoring {len(rejected)} allowlist entries that are public suffixes, e.g. {rejected[0]}')
+			trusted_domains = [d for d in trusted_domains if not suffixes.is_public_suffix(d)]
+
+		trusted = DomainSet(trusted_domains)
+		flagged = DomainSet(self._flagged_inline + self._read_lists(self.blocklist_files))
+		logger.debug(
+			f'Loaded reputation lists: {len(trusted)} trusted, {len(flagged)} flagged in {time.perf_counter() - start:.2f}s'
+		)
+		return suffixes, trusted, flagged
+
+	def reload(self) -> None:
+		"""Re-read all list files now."""
+		with self._reload_lock:
+			mtimes = self._current_mtimes()
+			# Swap all three together so lookups never see a half-built state
+			self._suffixes, self._trusted, self._flagged = self._build()
+			self._mtimes = mtimes
+
+	def _maybe_reload(self) -> None:
+		"""Rebuild in a background thread when a list file changed, lookups keep using the old lists meanwhile."""
+		now = time.monotonic()
+		if self._reloading or now - self._last_reload_check < self.reload_interval:
+			return
+		self._last_reload_check = now
+		if self._current_mtimes() == self._mtimes:
+			return
+
+		def _reload_in_background() -> None:
+			try:
+				self.reload()
+				logger.info('Reloaded domain reputation lists')
+			except Exception as e:
+				logger.warning(f'Failed to reload domain reputation lists: {type(e).__name__}: {e}')
+			finally:
+				self._reloading = False
+
+		self._reloading = True
+		threading.Thread(target=_reload_in_background, name='reputation_reload', daemon=True).start()
+
+	def check_host(self, host: str) -> ReputationResult:
+		if self.allowlist_files or self.blocklist_files or self.public_suffix_file:
+			self._maybe_reload()
+
+		host = normalize_domain(host)
+		suffixes, trusted, flagged = self._suffixes, self._trusted, self._flagged
+		registrable = suffixes.registrable_domain(host) if host else None
+		if not host:
+			return ReputationResult('neutral', 'No domain in URL')
+
+		# Most specific suffix first, so a deeper entry overrides its parent domain
+		for candidate in iter_suffixes(host):
+			if candidate in flagged:
+				return ReputationResult('flagged', f'Domain {candidate} is in flagged list', host, registrable, candidate)
+			if candidate in trusted:
+				return ReputationResult('trusted', f'Domain {candidate} is in trusted list', host, registrable, candidate)
+		return ReputationResult('neutral', 'Domain not in explicit lists', host, registrable)
+
+	def check_url(self, url: str) -> ReputationResult:
+		try:
+			host = urlparse(url).hostname or ''
+		except ValueError:
+			host = ''
+		return self.check_host(host)
+
+	def check_urls(self, urls: Iterable[str]) -> list[ReputationResult]:
+		"""Score many URLs at once, hosts repeated across the batch (links on one page) are looked up once."""
+		by_host: dict[str, ReputationResult] = {}
+		results = []
+		for url in urls:
+			try:
+				host = urlparse(url).hostname or ''
+			except ValueError:
+				host = ''
+			result = by_host.get(host)
+			if result is None:
+				result = by_host[host] = self.check_host(host)
+			results.append(result)
+		return results
@@ -1,6 +1,13 @@
 
 import logging
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
+
+from aeternus.verification.claims import ClaimLabel, ClaimScorer, ClaimVerifier, extract_claims
+from aeternus.verification.reputation import ReputationEngine
+
+if TYPE_CHECKING:
+    from aeternus.knowledge.embeddings import EmbeddingsProvider
+    from aeternus.knowledge.store import VectorStore
 
 logger = logging.getLogger(__name__)
 
@@ -9,7 +16,16 @@ class VerificationService:
     Service for verifying the trustworthiness of web sources and content.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        allowlist_files: Optional[List[str]] = None,
+        blocklist_files: Optional[List[str]] = None,
+        public_suffix_file: Optional[str] = None,
+        knowledge_store: Optional["VectorStore"] = None,
+        embeddings: Optional["EmbeddingsProvider"] = None,
+        scorer: Optional[ClaimScorer] = None,
+        max_concurrency: int = 4,
+    ):
         # Placeholder for trusted domains
         self.trusted_domains = [
             "wikipedia.org",
@@ -25,47 +41,93 @@ class VerificationService:
             "malware-example.com",
             "fake-news-example.com"
         ]
+
+        # Large lists (hosts files, allowlists) are loaded from disk and hot-reloaded when they change
+        self.reputation = ReputationEngine(
+            trusted=self.trusted_domains,
+            flagged=self.flagged_domains,
+            allowlist_files=allowlist_files or [],
+            blocklist_files=blocklist_files or [],
+            public_suffix_file=public_suffix_file,
+        )
+
+        # Claims are cross-checked against pages already ingested into the knowledge store
+        self.scorer = scorer
+        self.max_concurrency = max_concurrency
+        self.claim_verifier: Optional[ClaimVerifier] = None
+        if knowledge_store is not None and embeddings is not None:
+            self.configure_knowledge(knowledge_store, embeddings)
+
+    def configure_knowledge(self, knowledge_store: "VectorStore", embeddings: "EmbeddingsProvider") -> None:
+        """
+        Cross-check claims against knowledge_store from now on.
+        
+        The verifier (and its verdict cache) is only replaced when the store or embeddings change.
+        """
+        verifier = self.claim_verifier
+        if verifier is not None and verifier.store is knowledge_store and verifier.embeddings is embeddings:
+            return
+        self.claim_verifier = ClaimVerifier(
+            knowledge_store, embeddings, scorer=self.scorer, max_concurrency=self.max_concurrency
+        )
         
     def verify_source(self, url: str) -> dict:
         """
         Check if the source URL is trusted, flagged, or neutral.
         
+        Matches whole domain labels, so subdomains of a listed domain match but look-alikes
+        such as evil-wikipedia.org.example do not.
+        
         Returns:
-            dict: { "status": "trusted"|"flagged"|"neutral", "reason": str }
+            dict: { "status": "trusted"|"flagged"|"neutral", "reason": str, "host": str,
+                    "registrable_domain": str|None, "matched": str|None }
         """
-        domain = self._extract_domain(url)
-        
-        for trusted in self.trusted_domains:
-            if trusted in domain:
-                return {"status": "trusted", "reason": f"Domain {trusted} is in trusted list"}
-                
-        for flagged in self.flagged_domains:
-            if flagged in domain:
-                 return {"status": "flagged", "reason": f"Domain {flagged} is in flagged list"}
-                 
-        return {"status": "neutral", "reason": "Domain not in explicit lists"}
+        return self.reputation.check_url(url).to_dict()
 
-    def validate_content(self, content: str, claims: List[str] = None) -> dict:
+    def verify_sources(self, urls: List[str]) -> List[dict]:
+        """Check many URLs at once (e.g. every link on a page), same result format as verify_source."""
+        return [result.to_dict() for result in self.reputation.check_urls(urls)]
+
+    async def validate_content(
+        self, content: str, claims: Optional[List[str]] = None, source_url: Optional[str] = None, max_claims: int = 20
+    ) -> dict:
         """
         Validate specific claims against the content or external sources.
         
+        Claims (extracted from the content when not given) are checked against evidence from other pages in
+        the knowledge store; source_url is excluded so a page cannot confirm itself.
+        
         Args:
             content: The content to check
             claims: Optional list of claims to verify
+            source_url: URL the content came from
+            max_claims: Upper bound on claims extracted from the content
             
         Returns:
-            dict: Validation results
+            dict: { "verified": bool, "confidence": float, "message": str, "claims": [ClaimVerdict dicts] }
         """
-        # Placeholder for cross-referencing logic
+        if self.claim_verifier is None:
+            return {
+                "verified": False,
+                "confidence": 0.0,
+                "message": "No knowledge store configured for claim verification",
+                "claims": [],
+            }
+
+        claims = claims if claims is not None else extract_claims(content, max_claims=max_claims)
+        if not claims:
+            return {"verified": False, "confidence": 0.0, "message": "No checkable claims found", "claims": []}
+
+        verdicts = await self.claim_verifier.verify(claims, source_url=source_url)
+        supported = [v for v in verdicts if v.label == ClaimLabel.SUPPORTED]
+        contradicted = [v for v in verdicts if v.label == ClaimLabel.CONTRADICTED]
+
+        # Share of claims with supporting evidence, each weighted by the scorer's confidence
+        confidence = sum(v.confidence for v in supported) / len(verdicts)
         return {
-            "verified": False,
-            "confidence": 0.0,
-            "message": "Content validation not yet implemented"
+            "verified": bool(supported) and not contradicted,
+            "confidence": round(confidence, 3),
+            "message": f"{len(supported)} supported, {len(contradicted)} contradicted, "
+            f"{len(verdicts) - len(supported) - len(contradicted)} unverified of {len(verdicts)} claims",
+            "claims": [v.to_dict() for v in verdicts],
         }
-
-    def _extract_domain(self, url: str) -> str:
-        from urllib.parse import urlparse
-        try:
-            return urlparse(url).netloc
-        except:
-            return ""
@@ -1,9 +1,13 @@
 import sys
 import os
 import asyncio
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
 import httpx
 import uvicorn
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import json
@@ -16,10 +20,30 @@ load_dotenv()
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from aeternus import Agent, Browser, ChatBrowserUse
+from cdp_use import CDPClient
+from websockets.protocol import State
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
 
 # Unique CDP port for Aeternus - must match electron/main.ts
 AETERNUS_CDP_PORT = 9333
 
+# Agents running at the same time, further tasks wait in the queue.
+# Every agent attaches to the same single BrowserView page, so running more than one
+# at once makes them drive the same tab; only raise this once agents get their own targets.
+MAX_CONCURRENT_AGENTS = int(os.getenv("AETERNUS_MAX_CONCURRENT_AGENTS", "1"))
+# Queued + running tasks, new submissions are rejected beyond this
+MAX_PENDING_TASKS = int(os.getenv("AETERNUS_MAX_PENDING_TASKS", "16"))
+# Finished tasks kept around for late observers and /tasks
+MAX_FINISHED_TASKS = 100
+# Pending messages per UI client before droppable ones are discarded
+CLIENT_QUEUE_SIZE = int(os.getenv("AETERNUS_CLIENT_QUEUE_SIZE", "64"))
+
 app = FastAPI()
 
 app.add_middleware(
@@ -33,10 +57,6 @@ app.add_middleware(
 class AgentRequest(BaseModel):
     task: str
 
-@app.get("/health")
-def health():
-    return {"status": "ok", "service": "Aeternus Agent", "cdp_port": AETERNUS_CDP_PORT}
-
 async def verify_aeternus_connection() -> tuple[str | None, str | None]:
     """Verify we're connecting to the Aeternus Electron app and return the BrowserView's WebSocket URL.
     
@@ -112,90 +132,488 @@ async def verify_aeternus_connection() -> tuple[str | None, str | None]:
     except Exception as e:
         return None, f"Connection error: {str(e)}"
 
+class CDPEndpointCache:
+    """Caches the result of verify_aeternus_connection until the browser's targets change.
+
+    A browser-level CDP connection with target discovery enabled invalidates the cache on
+    targetCreated / targetDestroyed / targetInfoChanged, so repeated tasks skip the two HTTP
+    round trips. While that watcher is not connected, results expire after fallback_ttl seconds.
+    """
+
+    def __init__(self, fallback_ttl: float = 2.0):
+        self.fallback_ttl = fallback_ttl
+        self._result: tuple[str | None, str | None] | None = None
+        self._resolved_at = 0.0
+        self._lock = asyncio.Lock()
+        self._watcher: CDPClient | None = None
+
+    def invalidate(self, *_args) -> None:
+        self._result = None
+
+    def _watcher_alive(self) -> bool:
+        # Judged from the public websocket; anything unexpected counts as dead so the TTL applies
+        ws = getattr(self._watcher, "ws", None) if self._watcher else None
+        try:
+            return ws is not None and ws.state is State.OPEN
+        except AttributeError:
+            return False
+
+    async def _start_watcher(self) -> None:
+        await self._stop_watcher()
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                response = await client.get(f"http://localhost:{AETERNUS_CDP_PORT}/json/version")
+                browser_ws_url = response.json()["webSocketDebuggerUrl"]
+            watcher = CDPClient(browser_ws_url)
+            await watcher.start()
+            watcher.register.Target.targetCreated(self.invalidate)
+            watcher.register.Target.targetDestroyed(self.invalidate)
+            watcher.register.Target.targetInfoChanged(self.invalidate)
+            await watcher.send.Target.setDiscoverTargets(params={"discover": True})
+            self._watcher = watcher
+            print("[CDP] Watching target changes")
+        except Exception as e:
+            print(f"[CDP] Target watcher unavailable, falling back to {self.fallback_ttl}s cache: {e}")
+
+    async def _stop_watcher(self) -> None:
+        if self._watcher is not None:
+            try:
+                await self._watcher.stop()
+            except Exception:
+                pass
+            self._watcher = None
+
+    async def get(self) -> tuple[str | None, str | None]:
+        async with self._lock:
+            watching = self._watcher_alive()
+            if self._result is not None and (watching or time.monotonic() - self._resolved_at < self.fallback_ttl):
+                return self._result
+
+            result = await verify_aeternus_connection()
+            ws_url, _ = result
+            if ws_url and not watching:
+                await self._start_watcher()
+            # Errors are not cached, the app may be starting up
+            self._result = result if ws_url else None
+            self._resolved_at = time.monotonic()
+            return result
+
+    async def close(self) -> None:
+        await self._stop_watcher()
+        self._result = None
+
+
+class ClientChannel:
+    """Bounded outgoing event queue for one UI client, drained by its own writer task.
+
+    The agent publishes without awaiting, so a slow client only ever delays itself:
+    - "step" and "screenshot" events are coalesced per task, only the latest pending one is sent
+    - when the queue is full the oldest droppable event (thoughts, recommendations, info) is discarded,
+      the pending "step"/"screenshot" slots are kept so the latest one always arrives
+    - final events ("done", "success", "error") and direct replies are never dropped
+    Clients can restrict event types and ask for msgpack binary frames instead of JSON text.
+    """
+
+    COALESCED = {"step", "screenshot"}
+    CRITICAL = {"done", "success", "error", "tasks"}
+    # Sent unless a client asks for specific types, screenshots are large and opt-in
+    DEFAULT_EXCLUDED = {"screenshot"}
+
+    def __init__(self, websocket: WebSocket, max_queue: int = CLIENT_QUEUE_SIZE):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.event_types: set[str] | None = None
+        self.binary = False
+        self.dropped = 0
+        self.coalesced = 0
+        self._queue: deque[list[dict]] = deque()
+        # (task_id, type) -> the queued slot, replaced in place while still pending
+        self._pending: dict[tuple, list[dict]] = {}
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._writer = asyncio.create_task(self._write_loop(), name="ui_client_writer")
+
+    def configure(self, event_types: list[str] | None = None, message_format: str | None = None) -> str:
+        """Select event types (None for the defaults) and "json" or "msgpack" framing, returns the framing in use."""
+        self.event_types = set(event_types) if event_types else None
+        if message_format is not None:
+            self.binary = message_format == "msgpack" and MSGPACK_AVAILABLE
+        return "msgpack" if self.binary else "json"
+
+    def wants(self, event_type: str) -> bool:
+        if event_type in self.CRITICAL:
+            return True
+        if self.event_types is None:
+            return event_type not in self.DEFAULT_EXCLUDED
+        return event_type in self.event_types
+
+    def publish(self, message: dict) -> None:
+        if self._closed:
+            return
+        event_type = message.get("type", "")
+        if not self.wants(event_type):
+            return
+
+        key = (message.get("task_id"), event_type) if event_type in self.COALESCED else None
+        if key is not None and key in self._pending:
+            self._pending[key][0] = message
+            self.coalesced += 1
+            return
+
+        if len(self._queue) >= self.max_queue and event_type not in self.CRITICAL:
+            # Coalesced slots are never evicted, there is at most one per (task, type) already
+            for index, slot in enumerate(self._queue):
+                if slot[0].get("type") not in self.CRITICAL and slot[0].get("type") not in self.COALESCED:
+                    del self._queue[index]
+                    self.dropped += 1
+                    break
+            else:
+                if key is None:
+                    self.dropped += 1
+                    return
+
+        slot = [message]
+        self._queue.append(slot)
+        if key is not None:
+            self._pending[key] = slot
+        self._wakeup.set()
+
+    def _forget(self, slot: list[dict]) -> None:
+        message = slot[0]
+        key = (message.get("task_id"), message.get("type"))
+        if self._pending.get(key) is slot:
+            del self._pending[key]
+
+    async def _write_loop(self) -> None:
+        while not self._closed:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            slot = self._queue.popleft()
+            self._forget(slot)
+            try:
+                if self.binary:
+                    await self.websocket.send_bytes(msgpack.packb(slot[0], use_bin_type=True))
+                else:
+                    await self.websocket.send_json(slot[0])
+            except Exception:
+                # Client went away, stop queueing for it
+                self._closed = True
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def close(self) -> None:
+        self._closed = True
+        self._writer.cancel()
+        await asyncio.gather(self._writer, return_exceptions=True)
+
+
+@dataclass
+class AgentTask:
+    id: str
+    task: str
+    status: str = "queued"  # queued | running | completed | failed | cancelled
+    result: str | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    subscribers: set[ClientChannel] = field(default_factory=set)
+    # Everything sent to subscribers, replayed to clients that subscribe late
+    events: list[dict] = field(default_factory=list)
+    # Screenshots are only kept as the latest one, not in the replay log
+    latest_screenshot: dict | None = None
+    runner: asyncio.Task | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": self.id,
+            "task": self.task,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class AgentTaskManager:
+    """Runs agent tasks in the background with bounded concurrency.
+
+    Each task gets an ID; its messages go to every subscribed client channel, so several UI
+    panels or clients can start and observe agents in parallel. At most max_concurrent
+    agents run at once, the rest wait in FIFO order, and at most max_pending tasks can be
+    queued or running.
+    """
+
+    def __init__(self, endpoints: CDPEndpointCache, max_concurrent: int = MAX_CONCURRENT_AGENTS, max_pending: int = MAX_PENDING_TASKS):
+        self.endpoints = endpoints
+        self.max_pending = max_pending
+        self.tasks: dict[str, AgentTask] = {}
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._llm: ChatBrowserUse | None = None
+
+    @property
+    def llm(self) -> ChatBrowserUse:
+        # One client for all tasks, uses BROWSER_USE_API_KEY from env
+        if self._llm is None:
+            self._llm = ChatBrowserUse()
+        return self._llm
+
+    def pending_count(self) -> int:
+        return sum(1 for t in self.tasks.values() if t.status in ("queued", "running"))
+
+    def submit(self, task: str, subscriber: ClientChannel | None = None) -> AgentTask:
+        if self.pending_count() >= self.max_pending:
+            raise RuntimeError(f"Too many tasks in progress (limit {self.max_pending}), try again later")
+
+        agent_task = AgentTask(id=uuid.uuid4().hex[:12], task=task)
+        if subscriber is not None:
+            agent_task.subscribers.add(subscriber)
+        self.tasks[agent_task.id] = agent_task
+        agent_task.runner = asyncio.create_task(self._run(agent_task), name=f"agent_task_{agent_task.id}")
+        self._prune()
+        return agent_task
+
+    async def cancel(self, task_id: str) -> bool:
+        agent_task = self.tasks.get(task_id)
+        if agent_task is None or agent_task.runner is None or agent_task.runner.done():
+            return False
+        agent_task.runner.cancel()
+        await asyncio.gather(agent_task.runner, return_exceptions=True)
+        return True
+
+    def subscribe(self, task_id: str, channel: ClientChannel) -> bool:
+        agent_task = self.tasks.get(task_id)
+        if agent_task is None:
+            return False
+        agent_task.subscribers.add(channel)
+        for message in agent_task.events:
+            channel.publish(message)
+        if agent_task.latest_screenshot is not None:
+            channel.publish(agent_task.latest_screenshot)
+        return True
+
+    def unsubscribe_all(self, channel: ClientChannel) -> None:
+        for agent_task in self.tasks.values():
+            agent_task.subscribers.discard(channel)
+
+    async def shutdown(self) -> None:
+        runners = [t.runner for t in self.tasks.values() if t.runner and not t.runner.done()]
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+
+    def publish(self, agent_task: AgentTask, message: dict) -> None:
+        """Queue a message for every subscriber, never waits on clients."""
+        message = {**message, "task_id": agent_task.id}
+        if message["type"] == "screenshot":
+            agent_task.latest_screenshot = message
+        else:
+            agent_task.events.append(message)
+        for channel in list(agent_task.subscribers):
+            if channel.closed:
+                # Client went away, the task keeps running for the others
+                agent_task.subscribers.discard(channel)
+            else:
+                channel.publish(message)
+
+    def _prune(self) -> None:
+        finished = [t for t in self.tasks.values() if t.finished_at is not None]
+        for agent_task in sorted(finished, key=lambda t: t.finished_at)[: max(0, len(finished) - MAX_FINISHED_TASKS)]:
+            del self.tasks[agent_task.id]
+
+    async def _run(self, agent_task: AgentTask) -> None:
+        try:
+            self.publish(agent_task, {"type": "info", "message": f"Received: {agent_task.task}"})
+            async with self._slots:
+                agent_task.status = "running"
+                await self._run_agent(agent_task)
+                agent_task.status = "completed"
+        except asyncio.CancelledError:
+            agent_task.status = "cancelled"
+            # Sent as an error so clients stop waiting for "done"
+            self.publish(agent_task, {"type": "error", "message": "Task cancelled", "cancelled": True})
+        except Exception as e:
+            print(f"[Agent] Error in task {agent_task.id}: {e}")
+            import traceback
+            traceback.print_exc()
+            agent_task.status = "failed"
+            agent_task.error = str(e)
+            self.publish(agent_task, {"type": "error", "message": str(e)})
+        finally:
+            agent_task.finished_at = time.time()
+
+    async def _run_agent(self, agent_task: AgentTask) -> None:
+        # Verify connection to Aeternus and get WebSocket URL (cached until targets change)
+        ws_url, error = await self.endpoints.get()
+        if error:
+            raise RuntimeError(error)
+
+        self.publish(agent_task, {"type": "info", "message": "Connected to browser"})
+
+        # Connect to the verified BrowserView, each agent gets its own session and event bus
+        browser = Browser(cdp_url=ws_url)
+
+        # Define step callback for real-time updates
+        async def on_step(browser_state, model_output, step_number):
+            try:
+                # Send thought process
+                if hasattr(model_output, 'thinking') and model_output.thinking:
+                    self.publish(agent_task, {"type": "thought", "message": model_output.thinking})
+
+                # Send action recommendations
+                if hasattr(model_output, 'recommendations') and model_output.recommendations:
+                    self.publish(agent_task, {
+                        "type": "recommendations",
+                        "actions": model_output.recommendations
+                    })
+
+                # Send general step info
+                self.publish(agent_task, {
+                    "type": "step",
+                    "step": step_number,
+                    "url": browser_state.url if hasattr(browser_state, 'url') else None
+                })
+
+                # Only clients that subscribed to screenshots receive them, coalesced to the latest
+                screenshot = getattr(browser_state, 'screenshot', None)
+                if screenshot:
+                    self.publish(agent_task, {"type": "screenshot", "step": step_number, "data": screenshot})
+            except Exception as step_e:
+                print(f"[Agent] Error in step callback: {step_e}")
+
+        agent = Agent(
+            task=agent_task.task,
+            llm=self.llm,
+            browser=browser,
+            max_actions_per_step=10,
+            register_new_step_callback=on_step
+        )
+
+        self.publish(agent_task, {"type": "info", "message": "Agent running..."})
+
+        try:
+            history = await agent.run()
+        except asyncio.CancelledError:
+            agent.stop()
+            await agent.close()
+            raise
+
+        # Get the final result
+        result_text = history.final_result() if hasattr(history, 'final_result') else str(history)
+        agent_task.result = result_text
+
+        self.publish(agent_task, {"type": "success", "message": f"Done: {result_text}"})
+        self.publish(agent_task, {"type": "done", "result": result_text})
+
+
+endpoint_cache = CDPEndpointCache()
+task_manager = AgentTaskManager(endpoint_cache)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await task_manager.shutdown()
+    await endpoint_cache.close()
+
+
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "service": "Aeternus Agent",
+        "cdp_port": AETERNUS_CDP_PORT,
+        "pending_tasks": task_manager.pending_count(),
+    }
+
+
+@app.get("/tasks")
+def list_tasks():
+    return [t.to_dict() for t in task_manager.tasks.values()]
+
+
+@app.post("/tasks")
+def create_task(request: AgentRequest):
+    try:
+        return task_manager.submit(request.task).to_dict()
+    except RuntimeError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+@app.get("/tasks/{task_id}")
+def get_task(task_id: str):
+    agent_task = task_manager.tasks.get(task_id)
+    if agent_task is None:
+        raise HTTPException(status_code=404, detail="Unknown task")
+    return agent_task.to_dict()
+
+
+@app.delete("/tasks/{task_id}")
+async def cancel_task(task_id: str):
+    if not await task_manager.cancel(task_id):
+        raise HTTPException(status_code=404, detail="Unknown or finished task")
+    return task_manager.tasks[task_id].to_dict()
+
+
 @app.websocket("/ws/agent")
 async def websocket_endpoint(websocket: WebSocket):
+    """Messages from the client:
+        {"task": "..."}                            start a task, its updates are sent here
+        {"type": "cancel", "task_id": "..."}       cancel a queued or running task
+        {"type": "subscribe", "task_id": "..."}    observe a task started elsewhere (replays past updates)
+        {"type": "list"}                           list known tasks
+        {"type": "configure", "events": [...], "format": "json"|"msgpack"}
+                                                   receive only these event types (final results always
+                                                   arrive), optionally as msgpack binary frames
+    Every update carries the task_id it belongs to. The same settings can be passed as query
+    parameters when connecting: /ws/agent?events=step,done&format=msgpack
+    """
     await websocket.accept()
     print("[WS] UI Connected")
-    
+
+    channel = ClientChannel(websocket)
+    events = websocket.query_params.get("events")
+    channel.configure(events.split(",") if events else None, websocket.query_params.get("format"))
+
     try:
         while True:
             data = await websocket.receive_text()
             request = json.loads(data)
-            task = request.get("task")
-            
-            if not task:
-                continue
-                
-            await websocket.send_json({"type": "info", "message": f"Received: {task}"})
-            
-            try:
-                # Verify connection to Aeternus and get WebSocket URL
-                ws_url, error = await verify_aeternus_connection()
-                
-                if error:
-                    await websocket.send_json({"type": "error", "message": error})
-                    continue
-                
-                await websocket.send_json({"type": "info", "message": "Connected to browser"})
-                
-                # Connect to the verified BrowserView
-                browser = Browser(cdp_url=ws_url)
-                
-                # Use ChatBrowserUse with BROWSER_USE_API_KEY from env
-                llm = ChatBrowserUse()
-
-                # Define step callback for real-time updates
-                async def on_step(browser_state, model_output, step_number):
-                    try:
-                        # Send thought process
-                        if hasattr(model_output, 'thinking') and model_output.thinking:
-                            await websocket.send_json({"type": "thought", "message": model_output.thinking})
-                        
-                        # Send action recommendations
-                        if hasattr(model_output, 'recommendations') and model_output.recommendations:
-                            await websocket.send_json({
-                                "type": "recommendations", 
-                                "actions": model_output.recommendations
-                            })
-                            
-                        # Send general step info
-                        await websocket.send_json({
-                            "type": "step", 
-                            "step": step_number,
-                            "url": browser_state.url if hasattr(browser_state, 'url') else None
-                        })
-                    except Exception as step_e:
-                        print(f"[Agent] Error in step callback: {step_e}")
-
-                agent = Agent(
-                    task=task,
-                    llm=llm,
-                    browser=browser,
-                    max_actions_per_step=10,
-                    register_new_step_callback=on_step
-                )
-                
-                await websocket.send_json({"type": "info", "message": "Agent running..."})
-                
-                history = await agent.run()
-                
-                # Get the final result
-                result_text = history.final_result() if hasattr(history, 'final_result') else str(history)
-                
-                await websocket.send_json({"type": "success", "message": f"Done: {result_text}"})
-                await websocket.send_json({"type": "done", "result": result_text})
+            message_type = request.get("type", "task")
+            task_id = request.get("task_id")
 
-            except Exception as e:
-                print(f"[Agent] Error: {e}")
-                import traceback
-                traceback.print_exc()
+            if message_type == "cancel":
+                cancelled = await task_manager.cancel(task_id)
+                if not cancelled:
+                    channel.publish({"type": "error", "task_id": task_id, "message": "Unknown or finished task"})
+            elif message_type == "subscribe":
+                if not task_manager.subscribe(task_id, channel):
+                    channel.publish({"type": "error", "task_id": task_id, "message": "Unknown task"})
+            elif message_type == "list":
+                channel.publish({"type": "tasks", "tasks": [t.to_dict() for t in task_manager.tasks.values()]})
+            elif message_type == "configure":
+                message_format = channel.configure(request.get("events"), request.get("format"))
+                channel.publish({"type": "info", "message": f"Streaming {sorted(channel.event_types) if channel.event_types else 'default'} events as {message_format}"})
+            else:
+                task = request.get("task")
+                if not task:
+                    continue
                 try:
-                    await websocket.send_json({"type": "error", "message": str(e)})
-                except:
-                    pass  # Client may have disconnected
+                    agent_task = task_manager.submit(task, subscriber=channel)
+                except RuntimeError as e:
+                    channel.publish({"type": "error", "message": str(e)})
+                    continue
+                channel.publish({"type": "info", "task_id": agent_task.id, "message": f"Task {agent_task.id} queued"})
 
     except WebSocketDisconnect:
         print("[WS] Client disconnected")
+    finally:
+        # Tasks keep running for other subscribers (and can be re-subscribed to)
+        task_manager.unsubscribe_all(channel)
+        await channel.close()
 
 if __name__ == "__main__":
     print(f"[Aeternus Backend] Starting on port 8000, expecting CDP on port {AETERNUS_CDP_PORT}")